@@ -1,7 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """Restore the SQLite FTS triggers dropped when a migration rebuilds annonces_ad."""
+    from django.db import connections
+    from .search import ensure_sqlite_index
+    
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and 'annonces_ad' in connection.introspection.table_names():
+        ensure_sqlite_index(connection)
 
 
 class AnnoncesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.annonces'
     verbose_name = 'Annonces'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -0,0 +1,63 @@
+"""
+Async DRF views.
+
+DRF dispatches synchronously. AsyncViewMixin gives APIView and ViewSet
+classes an async `dispatch`: authentication, permissions and throttling
+(which read the database or the cache) run in a thread, then the handler is
+awaited if it is a coroutine, or run in a thread otherwise.
+
+Served by the ASGI application (SERVER_MODE=asgi), such a view leaves the
+worker's event loop free while it waits on the database, the storage or the
+email backend. Under WSGI, Django runs it to completion in the request's
+thread, as before.
+"""
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+
+class AsyncViewMixin:
+    """Async dispatch for APIView, generic views and viewsets; handlers may be `async def`."""
+    
+    view_is_async = True
+    
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # ViewSetMixin.as_view does not mark its view as async itself
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+    
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def serialize(serializer):
+    """`serializer.data`, computed in a thread since it may load related rows."""
+    return await sync_to_async(lambda: serializer.data)()
+
+
+def call_view(view, request, **kwargs):
+    """Call a view function from sync code, whether it is async or not."""
+    if iscoroutinefunction(view):
+        return async_to_sync(view)(request, **kwargs)
+    return view(request, **kwargs)
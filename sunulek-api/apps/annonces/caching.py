@@ -0,0 +1,231 @@
+"""
+Response cache for anonymous public reads.
+
+Entries are keyed on the path, the normalized query string and the current
+version of every namespace the response depends on. Signals (signals.py)
+bump namespace versions when Ad, AdImage, Category or Favorite rows change,
+so stale entries are never read again and simply expire.
+
+Cached responses carry ETag and Last-Modified headers and answer
+conditional requests with 304 Not Modified.
+
+A hit reads the namespace versions and the entry: two round trips to a
+memory cache (Redis, Memcached), but several SQL queries to DatabaseCache,
+more than most responses cost to build. The cache is off on
+SLOW_BACKENDS. Hit/miss counts are kept in memory by each process and
+published to the cache every STATS_FLUSH_INTERVAL seconds.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+KEY_PREFIX = 'resp'
+STATS_WORKERS_KEY = f'{KEY_PREFIX}:stats:workers'
+STATS_FLUSH_INTERVAL = 10   # Seconds
+STATS_TIMEOUT = 300         # Snapshots of processes that stopped publishing expire
+
+# Cache backends on which the response cache is off
+SLOW_BACKENDS = {'django.core.cache.backends.db.DatabaseCache'}
+
+# Namespaces
+ADS = 'ads'                # Listings: featured, recent, list, category ads
+CATEGORIES = 'categories'  # Category list and detail (with ads counts)
+
+
+# Names of the cached endpoints, for get_stats()
+ENDPOINTS = set()
+
+
+def ad_namespace(ad_id):
+    return f'ad:{ad_id}'
+
+
+def category_namespace(category_id):
+    return f'category:{category_id}'
+
+
+def get_timeout():
+    return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def is_enabled():
+    return settings.CACHES['default']['BACKEND'] not in SLOW_BACKENDS
+
+
+def get_versions(namespaces):
+    keys = [f'{KEY_PREFIX}:ns:{name}' for name in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock so a version evicted from the cache is never reused
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    if not is_enabled():
+        return
+    for name in namespaces:
+        key = f'{KEY_PREFIX}:ns:{name}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+class ProcessStats:
+    """Hit/miss counts of the current process, as {(endpoint, outcome): count}."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._last_flush = time.monotonic()
+        self.key = f'{KEY_PREFIX}:stats:worker:{os.getpid()}'
+    
+    def record(self, name, outcome):
+        with self._lock:
+            self._counts[(name, outcome)] += 1
+            due = time.monotonic() - self._last_flush >= STATS_FLUSH_INTERVAL
+        if due:
+            self.publish()
+    
+    def publish(self):
+        """Store this process's counts in the cache and register it."""
+        self._last_flush = time.monotonic()
+        with self._lock:
+            snapshot = [[name, outcome, count] for (name, outcome), count in self._counts.items()]
+        cache.set(self.key, snapshot, STATS_TIMEOUT)
+        workers = cache.get(STATS_WORKERS_KEY) or []
+        if self.key not in workers:
+            cache.set(STATS_WORKERS_KEY, [*workers, self.key], None)
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_process_stats():
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = ProcessStats()
+    return _stats
+
+
+def record(name, outcome):
+    get_process_stats().record(name, outcome)
+
+
+def get_stats(names):
+    """Hit/miss counts per endpoint, summed over every live process."""
+    get_process_stats().publish()
+    workers = cache.get(STATS_WORKERS_KEY) or []
+    snapshots = cache.get_many(workers)
+    live = [key for key in workers if key in snapshots]
+    if len(live) != len(workers):
+        cache.set(STATS_WORKERS_KEY, live, None)
+    counts = Counter()
+    for snapshot in snapshots.values():
+        for name, outcome, count in snapshot:
+            counts[(name, outcome)] += count
+    
+    stats = {}
+    for name in names:
+        hits = counts[(name, 'hit')]
+        misses = counts[(name, 'miss')]
+        total = hits + misses
+        stats[name] = {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 3) if total else None}
+    return stats
+
+
+def build_key(request, namespaces):
+    """Key for this request: host, path, sorted non-empty query params and namespace versions."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    raw = json.dumps([request.get_host(), request.path, params, get_versions(namespaces)])
+    return f'{KEY_PREFIX}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def is_cacheable(request):
+    return is_enabled() and request.method == 'GET' and not request.user.is_authenticated
+
+
+def not_modified(request, entry):
+    etag = request.META.get('HTTP_IF_NONE_MATCH')
+    if etag:
+        return entry['etag'] in [tag.strip() for tag in etag.split(',')]
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and since >= entry['last_modified']
+
+
+def cached_response(request, name, namespaces, build):
+    """
+    Return the cached response for `request`, building it with `build()` on a miss.
+    
+    `build` returns a Response; only 200 responses are stored.
+    """
+    key = build_key(request, namespaces)
+    entry = cache.get(key)
+    if entry is None:
+        record(name, 'miss')
+        response = build()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        body = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {
+            'data': response.data,
+            'etag': quote_etag(hashlib.md5(body.encode()).hexdigest()),
+            'last_modified': int(time.time()),
+        }
+        cache.set(key, entry, get_timeout())
+    else:
+        record(name, 'hit')
+        response = Response(entry['data'])
+    
+    if not_modified(request, entry):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+def cache_response(*namespaces):
+    """
+    Cache an anonymous GET viewset method under `namespaces`.
+    
+    A namespace may be a callable, called with the view and the method's
+    arguments, for namespaces that depend on the object being served.
+    """
+    def decorator(method):
+        name = method.__qualname__
+        ENDPOINTS.add(name)
+        
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not is_cacheable(request):
+                return method(self, request, *args, **kwargs)
+            names = [ns(self, *args, **kwargs) if callable(ns) else ns for ns in namespaces]
+            return cached_response(
+                request, name, names, lambda: method(self, request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+"""
+Buffered view counter for ads.
+
+Ad detail hits are recorded in a backend instead of updating the ad row on
+every request. Views are deduplicated per viewer and per time window, then
+flushed in bulk with atomic F() updates, every minute by the `run_tasks`
+worker (see TASKS['PERIODIC']) or on demand with `manage.py flush_ad_views`.
+"""
+
+import atexit
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+from .models import Ad, AdViewHit
+
+
+def get_options():
+    return {
+        'BACKEND': 'apps.annonces.counters.DatabaseViewsBackend',
+        'WINDOW': 1800,
+        'FLUSH_INTERVAL': 60,
+        'MAX_PENDING': 1000,
+        **getattr(settings, 'AD_VIEWS', {}),
+    }
+
+
+def current_window(window_seconds):
+    """Index of the deduplication window containing now."""
+    return int(time.time() // window_seconds)
+
+
+def viewer_key(request):
+    """Identify a viewer: user id when logged in, hashed client IP + user agent otherwise."""
+    if request.user.is_authenticated:
+        return f'u:{request.user.id}'
+    # Same client IP as the throttles: X-Forwarded-For is only trusted up to NUM_PROXIES
+    ip = BaseThrottle().get_ident(request)
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    digest = hashlib.sha1(f'{ip}|{agent}'.encode()).hexdigest()[:32]
+    return f'a:{digest}'
+
+
+def apply_increments(counts):
+    """
+    Add pending views to ads with one UPDATE per distinct increment.
+    
+    `counts` maps ad ids to the number of views to add. Returns the total
+    number of views written.
+    """
+    by_increment = defaultdict(list)
+    for ad_id, increment in counts.items():
+        if increment:
+            by_increment[increment].append(ad_id)
+    
+    with transaction.atomic():
+        for increment, ad_ids in by_increment.items():
+            Ad.objects.filter(pk__in=ad_ids).update(views_count=F('views_count') + increment)
+    return sum(increment * len(ad_ids) for increment, ad_ids in by_increment.items())
+
+
+class BaseViewsBackend:
+    """Interface for view counter backends."""
+    
+    def __init__(self, options):
+        self.window = options['WINDOW']
+        self.flush_interval = options['FLUSH_INTERVAL']
+        self.max_pending = options['MAX_PENDING']
+    
+    def record(self, ad_id, viewer):
+        """Record a view. Repeated views by the same viewer in a window are ignored."""
+        raise NotImplementedError
+    
+    def flush(self):
+        """Write pending views to the ads. Returns the number of views written."""
+        raise NotImplementedError
+
+
+class DatabaseViewsBackend(BaseViewsBackend):
+    """
+    Stores hits in the AdViewHit table.
+    
+    Works without any external service and shares state between gunicorn
+    workers. Hits are written by flush_views(), run periodically by the
+    `run_tasks` worker.
+    """
+    
+    batch_size = 10000
+    
+    def record(self, ad_id, viewer):
+        AdViewHit.objects.bulk_create(
+            [AdViewHit(ad_id=ad_id, viewer=viewer, window=current_window(self.window))],
+            ignore_conflicts=True,
+        )
+    
+    def flush(self):
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    AdViewHit.objects.filter(flushed=False)
+                    .select_for_update(skip_locked=True)
+                    .values_list('id', flat=True)[:self.batch_size]
+                )
+                if not ids:
+                    break
+                counts = dict(
+                    AdViewHit.objects.filter(id__in=ids)
+                    .values_list('ad_id')
+                    .annotate(total=Count('id'))
+                    .order_by()
+                )
+                total += apply_increments(counts)
+                AdViewHit.objects.filter(id__in=ids).update(flushed=True)
+        
+        # Hits from past windows are no longer needed for deduplication
+        AdViewHit.objects.filter(
+            flushed=True, window__lt=current_window(self.window)
+        ).delete()
+        return total
+
+
+class MemoryViewsBackend(BaseViewsBackend):
+    """
+    Keeps hits in process memory and flushes them itself.
+    
+    Pending views are written when the buffer reaches MAX_PENDING ads, every
+    FLUSH_INTERVAL seconds, and when the process exits. Deduplication is per
+    process only.
+    """
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._seen = {}
+        self._last_flush = time.monotonic()
+        atexit.register(self.flush)
+    
+    def record(self, ad_id, viewer):
+        window = current_window(self.window)
+        with self._lock:
+            if self._seen.get((ad_id, viewer)) == window:
+                return
+            self._seen[(ad_id, viewer)] = window
+            self._pending[ad_id] += 1
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+    
+    def flush(self):
+        window = current_window(self.window)
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._seen = {key: seen for key, seen in self._seen.items() if seen == window}
+            self._last_flush = time.monotonic()
+        return apply_increments(pending)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                options = get_options()
+                _backend = import_string(options['BACKEND'])(options)
+    return _backend
+
+
+def flush_views():
+    """Write the pending views of the configured backend. Periodic task of the worker."""
+    return get_backend().flush()
+
+
+def record_view(request, ad):
+    """Count a view of `ad` by the requesting client."""
+    get_backend().record(ad.pk, viewer_key(request))
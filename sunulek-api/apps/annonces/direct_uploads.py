@@ -0,0 +1,99 @@
+"""
+Direct-to-storage photo uploads.
+
+1. POST /annonces/upload_urls/ returns one presigned form per photo; the
+   client POSTs the file to `url` with `fields` (S3 "POST Object" protocol).
+2. POST /annonces/<slug>/register_images/ with the returned keys attaches the
+   stored objects to the ad (see uploads.attach_images).
+
+With S3Storage the form targets the bucket, so photo bytes never go through
+the API. Other storages get a form targeting LocalUploadView, a stand-in
+that speaks the same protocol with a signed URL instead of a policy.
+"""
+
+import re
+import uuid
+
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from rest_framework import serializers
+
+from .uploads import get_limits
+
+PENDING_PREFIX = 'ads/incoming'
+SIGNING_SALT = 'annonces.direct_uploads'
+
+CONTENT_TYPES = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+}
+
+
+def is_s3(storage):
+    return storage.__class__.__name__ == 'S3Storage'
+
+
+def pending_key(user, content_type):
+    return f'{PENDING_PREFIX}/{user.pk}/{uuid.uuid4().hex}{CONTENT_TYPES[content_type]}'
+
+
+def presign(request, content_type):
+    """Presigned upload form for one photo of `request.user`."""
+    limits = get_limits()
+    key = pending_key(request.user, content_type)
+    
+    if is_s3(default_storage):
+        client = default_storage.connection.meta.client
+        post = client.generate_presigned_post(
+            default_storage.bucket_name,
+            default_storage._normalize_name(key),
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, limits['MAX_FILE_SIZE']],
+            ],
+            ExpiresIn=limits['UPLOAD_EXPIRY'],
+        )
+        url, fields = post['url'], post['fields']
+    else:
+        token = signing.dumps({'key': key, 'type': content_type}, salt=SIGNING_SALT)
+        url = request.build_absolute_uri(reverse('ad-direct-upload', args=[token]))
+        fields = {'Content-Type': content_type}
+    
+    return {'key': key, 'url': url, 'fields': fields, 'expires_in': limits['UPLOAD_EXPIRY']}
+
+
+def load_upload_token(token):
+    """Key and content type of a LocalUploadView token, or None if invalid or expired."""
+    try:
+        return signing.loads(token, salt=SIGNING_SALT, max_age=get_limits()['UPLOAD_EXPIRY'])
+    except signing.BadSignature:
+        return None
+
+
+def validate_keys(user, keys, existing=0):
+    """Check that `keys` are uploads of `user` present in storage, within the limits."""
+    from .models import AdImage
+    
+    limits = get_limits()
+    if existing + len(keys) > limits['MAX_PER_AD']:
+        raise serializers.ValidationError(
+            f"Une annonce ne peut pas avoir plus de {limits['MAX_PER_AD']} images."
+        )
+    if len(set(keys)) != len(keys):
+        raise serializers.ValidationError('Fichier envoyé plusieurs fois.')
+    
+    pattern = re.compile(rf'^{PENDING_PREFIX}/{user.pk}/[0-9a-f]{{32}}\.(jpg|png|webp)$')
+    for key in keys:
+        if not pattern.match(key):
+            raise serializers.ValidationError(f'Fichier inconnu : {key}')
+        if not default_storage.exists(key):
+            raise serializers.ValidationError(f"{key} n'a pas été envoyé.")
+        if default_storage.size(key) > limits['MAX_FILE_SIZE']:
+            raise serializers.ValidationError(f'{key} dépasse la taille maximale.')
+    
+    if AdImage.objects.filter(image__in=keys).exists():
+        raise serializers.ValidationError('Fichier déjà associé à une annonce.')
+    return keys
@@ -0,0 +1,85 @@
+"""
+Facet counts for the ads search.
+
+Counts are computed on the queryset filtered by the list's own filter
+backends (AdFilter, search), so they always describe the current results.
+Price buckets are the values of AdFilter's `price_range` filter. Regions
+and departments are grouped on the reference place the ad is linked to
+(location_region, location_department), the key of AdFilter's `region`
+and `department` filters; `value` is the reference name, which those
+filters resolve to the same place. Ads whose location matched nothing are
+only in the total.
+"""
+
+from django.db.models import Count, Q
+
+# Bucket key -> (min inclusive, max exclusive), in FCFA
+PRICE_BUCKETS = {
+    '0-10000': (None, 10000),
+    '10000-50000': (10000, 50000),
+    '50000-100000': (50000, 100000),
+    '100000-500000': (100000, 500000),
+    '500000-1000000': (500000, 1000000),
+    '1000000-5000000': (1000000, 5000000),
+    '5000000-': (5000000, None),
+}
+
+
+def price_bucket_q(key):
+    low, high = PRICE_BUCKETS[key]
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def group_counts(queryset, *fields):
+    return list(
+        queryset.order_by().values(*fields).annotate(count=Count('pk')).order_by('-count', *fields)
+    )
+
+
+def compute_facets(queryset):
+    """Total and counts per category, region, department and price bucket."""
+    queryset = queryset.order_by()
+    
+    totals = queryset.aggregate(
+        total=Count('pk'),
+        **{key: Count('pk', filter=price_bucket_q(key)) for key in PRICE_BUCKETS},
+    )
+    categories = group_counts(
+        queryset.filter(category__isnull=False), 'category__slug', 'category__name'
+    )
+    
+    return {
+        'total': totals['total'],
+        'category': [
+            {'value': row['category__slug'], 'label': row['category__name'], 'count': row['count']}
+            for row in categories
+        ],
+        'region': [
+            {'value': row['location_region__name'], 'id': row['location_region'], 'count': row['count']}
+            for row in group_counts(
+                queryset.filter(location_region__isnull=False), 'location_region', 'location_region__name'
+            )
+        ],
+        'department': [
+            {
+                'value': row['location_department__name'],
+                'id': row['location_department'],
+                'region': row['location_department__region__name'],
+                'count': row['count'],
+            }
+            for row in group_counts(
+                queryset.filter(location_department__isnull=False),
+                'location_department', 'location_department__name', 'location_department__region__name',
+            )
+        ],
+        'price': [
+            {'value': key, 'min': low, 'max': high, 'count': totals[key]}
+            for key, (low, high) in PRICE_BUCKETS.items()
+            if totals[key]
+        ],
+    }
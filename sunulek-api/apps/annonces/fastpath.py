@@ -0,0 +1,226 @@
+"""
+Fast representation for read-heavy serializers.
+
+DRF's Serializer.to_representation resolves every field of every object
+through Field.get_attribute (source traversal, callable checks, exception
+handling) and the field's to_representation. For a page of objects that
+work is the same each time, so FastRepresentationMixin compiles it once per
+serializer instance into a plan: a direct attribute getter and converter per
+field, falling back to DRF's own code path wherever the shortcut would not
+give the exact same output. A ListSerializer shares one child, so a page is
+compiled once.
+
+`check_serializers` verifies byte for byte that the fast path renders the
+same JSON as the reference implementation.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+SKIP = object()
+
+# Per thread / task: reference_mode() must not switch other requests
+enabled = ContextVar('fastpath', default=True)
+
+# DRF fields whose to_representation is equivalent to a builtin conversion
+# for values read from the matching model field
+CONVERTERS = {
+    serializers.CharField: str,
+    serializers.SlugField: str,
+    serializers.EmailField: str,
+    serializers.URLField: str,
+    serializers.IntegerField: int,
+    serializers.BooleanField: bool,
+    serializers.ReadOnlyField: None,
+}
+
+
+@contextmanager
+def reference_mode():
+    """Represent with DRF's own Serializer.to_representation (contract checks)."""
+    token = enabled.set(False)
+    try:
+        yield
+    finally:
+        enabled.reset(token)
+
+
+def resolves_directly(model, attrs):
+    """True when every attribute of `attrs` is a model field, forward relation or property."""
+    for i, attr in enumerate(attrs):
+        if model is None:
+            return False
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            if not isinstance(getattr(model, attr, None), property) or i != len(attrs) - 1:
+                return False
+            continue
+        if field.many_to_many or field.one_to_many or (field.is_relation and not field.concrete):
+            return False
+        model = field.related_model if field.is_relation else None
+    return True
+
+
+def reference_step(field):
+    """Serializer.to_representation for a single field."""
+    def step(instance):
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            return SKIP
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        if check_for_none is None:
+            return None
+        return field.to_representation(attribute)
+    return step
+
+
+def compile_step(field, model):
+    if isinstance(field, serializers.SerializerMethodField):
+        # Its source is '*': the instance is never None
+        return getattr(field.parent, field.method_name)
+    
+    reference = reference_step(field)
+    if (
+        field.source == '*'
+        or isinstance(field, serializers.RelatedField)
+        or model is None
+        or not resolves_directly(model, field.source_attrs)
+    ):
+        return reference
+    
+    convert = CONVERTERS.get(type(field), field.to_representation)
+    get = attrgetter('.'.join(field.source_attrs))
+    
+    def step(instance):
+        try:
+            value = get(instance)
+        except (AttributeError, ObjectDoesNotExist):
+            # Missing relation: DRF skips the field or returns None
+            return reference(instance)
+        if value is None or convert is None:
+            return value
+        return convert(value)
+    return step
+
+
+def compile_plan(serializer):
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    steps = [(field.field_name, compile_step(field, model)) for field in serializer._readable_fields]
+    
+    def represent(instance):
+        ret = {}
+        for name, step in steps:
+            value = step(instance)
+            if value is not SKIP:
+                ret[name] = value
+        return ret
+    return represent
+
+
+class FastRepresentationMixin:
+    """Represent instances through a plan compiled on first use."""
+    
+    def to_representation(self, instance):
+        if not enabled.get():
+            return super().to_representation(instance)
+        plan = self.__dict__.get('_fast_plan')
+        if plan is None:
+            plan = self._fast_plan = compile_plan(self)
+        return plan(instance)
+
+
+def get_contracts(user):
+    """(name, view, path, kwargs) of the responses built with the fast serializers."""
+    from apps.annonces.models import Ad
+    from apps.annonces.views import AdViewSet
+    from apps.categories.views import CategoryViewSet
+    from apps.favorites.views import FavoriteViewSet
+    from django.db.models import Q
+    
+    from apps.messages.models import Conversation
+    from apps.messages.views import ConversationViewSet
+    
+    contracts = [
+        ('ads.list', AdViewSet.as_view({'get': 'list'}), '/', {}),
+        ('ads.list cursor', AdViewSet.as_view({'get': 'list'}), '/?pagination=cursor', {}),
+        ('ads.my_ads', AdViewSet.as_view({'get': 'my_ads'}), '/my_ads/', {}),
+        ('favorites.list', FavoriteViewSet.as_view({'get': 'list'}), '/', {}),
+        ('conversations.list', ConversationViewSet.as_view({'get': 'list'}), '/', {}),
+    ]
+    ad = Ad.objects.public().select_related('category').order_by('-created_at').first()
+    if ad is not None:
+        contracts.append(('ads.detail', AdViewSet.as_view({'get': 'retrieve'}), f'/{ad.slug}/', {'slug': ad.slug}))
+        contracts.append((
+            'categories.ads', CategoryViewSet.as_view({'get': 'ads'}),
+            f'/{ad.category.slug}/ads/', {'slug': ad.category.slug},
+        ))
+    conversation = Conversation.objects.filter(
+        Q(initiator=user) | Q(recipient=user)
+    ).order_by('-last_message_at').first()
+    if conversation is not None:
+        contracts.append((
+            'conversations.detail', ConversationViewSet.as_view({'get': 'retrieve'}),
+            f'/{conversation.pk}/', {'pk': conversation.pk},
+        ))
+    return contracts
+
+
+def first_difference(a, b):
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return min(len(a), len(b))
+
+
+def check_contracts(user):
+    """
+    Render every contract with the fast path and with DRF's reference path.
+    
+    Returns [{'name', 'identical', 'size', 'offset', 'fast', 'reference'}],
+    `offset` being the first differing byte. Requests are authenticated as
+    `user` (the response cache is bypassed) and run in a rolled back
+    transaction; each view is called once beforehand so side effects such
+    as marking messages read do not differ between the two renderings.
+    """
+    from django.db import transaction
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import force_authenticate
+    
+    from .async_views import call_view
+    from .query_audit import request_factory
+    from .renderers import FastJSONRenderer
+    
+    factory = request_factory()
+    
+    def call(view, path, kwargs):
+        request = factory.get(path)
+        force_authenticate(request, user=user)
+        return call_view(view, request, **kwargs).data
+    
+    results = []
+    with transaction.atomic():
+        for name, view, path, kwargs in get_contracts(user):
+            call(view, path, kwargs)
+            fast = FastJSONRenderer().render(call(view, path, kwargs))
+            with reference_mode():
+                reference = JSONRenderer().render(call(view, path, kwargs))
+            identical = fast == reference
+            offset = None if identical else first_difference(fast, reference)
+            results.append({
+                'name': name,
+                'identical': identical,
+                'size': len(reference),
+                'offset': offset,
+                'fast': None if identical else fast[max(offset - 80, 0):offset + 80],
+                'reference': None if identical else reference[max(offset - 80, 0):offset + 80],
+            })
+        transaction.set_rollback(True)
+    return results
@@ -1,5 +1,9 @@
 import django_filters
+from rest_framework.exceptions import ValidationError
+from apps.locations.geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM
+from apps.locations.matching import get_index
 from .models import Ad
+from .facets import PRICE_BUCKETS, price_bucket_q
 
 
 class AdFilter(django_filters.FilterSet):
@@ -8,10 +12,52 @@ class AdFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
     max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
     category = django_filters.CharFilter(field_name='category__slug')
-    region = django_filters.CharFilter(lookup_expr='iexact')
-    department = django_filters.CharFilter(lookup_expr='iexact')
+    region = django_filters.CharFilter(method='filter_region')
+    department = django_filters.CharFilter(method='filter_department')
+    near = django_filters.CharFilter(
+        method='filter_near', help_text='latitude,longitude : annonces à moins de `radius` km, les plus proches d\'abord.',
+    )
+    radius = django_filters.NumberFilter(
+        method='filter_radius', help_text=f'Rayon de `near` en km (défaut : {DEFAULT_RADIUS_KM}, max : {MAX_RADIUS_KM}).',
+    )
     user = django_filters.NumberFilter(field_name='user__id')
+    price_range = django_filters.ChoiceFilter(
+        choices=[(key, key) for key in PRICE_BUCKETS],
+        method='filter_price_range',
+    )
     
     class Meta:
         model = Ad
         fields = ['category', 'region', 'department', 'is_negotiable', 'is_featured', 'user']
+    
+    def filter_price_range(self, queryset, name, value):
+        # Same buckets as the `price` facet
+        return queryset.filter(price_bucket_q(value))
+    
+    def filter_region(self, queryset, name, value):
+        region = get_index().regions.find(value)
+        if region is None:
+            # Only ads whose location matched nothing can still have this text
+            return queryset.filter(location_region__isnull=True, region__iexact=value)
+        return queryset.filter(location_region_id=region.id)
+    
+    def filter_department(self, queryset, name, value):
+        department = get_index().departments.find(value)
+        if department is None:
+            return queryset.filter(location_department__isnull=True, department__iexact=value)
+        return queryset.filter(location_department_id=department.id)
+    
+    def filter_near(self, queryset, name, value):
+        try:
+            latitude, longitude = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError({'near': 'Format attendu : latitude,longitude.'})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'near': 'Coordonnées hors limites.'})
+        radius = self.form.cleaned_data.get('radius')
+        radius = min(float(radius), MAX_RADIUS_KM) if radius and radius > 0 else DEFAULT_RADIUS_KM
+        return queryset.near(latitude, longitude, radius)
+    
+    def filter_radius(self, queryset, name, value):
+        # Read by filter_near
+        return queryset
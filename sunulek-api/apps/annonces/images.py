@@ -0,0 +1,92 @@
+"""
+Image variants for ad photos.
+
+Each uploaded AdImage is decoded once, rotated according to its EXIF
+orientation, then re-encoded without metadata into fixed-size variants in
+WebP and JPEG. The paths are recorded in AdImage.variants and the raw upload
+is replaced by the `full` JPEG, so no original (and its GPS data) is served.
+"""
+
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels
+VARIANT_SIZES = {
+    'thumbnail': 200,
+    'card': 480,
+    'full': 1600,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def open_normalized(file, max_size):
+    """Decode an upload as an upright RGB image, no larger than needed."""
+    with Image.open(file) as img:
+        # Let the JPEG decoder downscale by a power of two while loading
+        img.draft('RGB', (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, 'white')
+            background.paste(img, mask=img.getchannel('A'))
+            return background
+        return img.convert('RGB')
+
+
+def encode(img, image_format, options):
+    buffer = io.BytesIO()
+    # No exif= argument: metadata is dropped
+    img.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def variant_url(ad_image, name, ext='webp'):
+    """Storage URL of a variant, or None if the image has not been processed."""
+    path = ad_image.variants.get(name, {}).get(ext)
+    return ad_image.image.storage.url(path) if path else None
+
+
+def process_ad_image(ad_image):
+    """Generate and record the variants of an AdImage. Returns False if the file is unreadable."""
+    storage = ad_image.image.storage
+    original = ad_image.image.name
+    
+    try:
+        with storage.open(original, 'rb') as file:
+            source = open_normalized(file, max(VARIANT_SIZES.values()))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning('Image illisible pour AdImage %s : %s', ad_image.pk, original)
+        return False
+    
+    base = f'ads/variants/{ad_image.ad_id}/{ad_image.pk}'
+    variants = {}
+    for name, max_size in VARIANT_SIZES.items():
+        img = source.copy()
+        img.thumbnail((max_size, max_size), Image.LANCZOS)
+        variants[name] = {'width': img.width, 'height': img.height}
+        for ext, (image_format, options) in FORMATS.items():
+            content = ContentFile(encode(img, image_format, options))
+            variants[name][ext] = storage.save(f'{base}/{name}.{ext}', content)
+    
+    ad_image.image.name = variants['full']['jpeg']
+    ad_image.variants = variants
+    ad_image.save(update_fields=['image', 'variants'])
+    storage.delete(original)
+    return True
+
+
+def delete_variants(ad_image):
+    storage = ad_image.image.storage
+    for variant in ad_image.variants.values():
+        for ext in FORMATS:
+            if variant.get(ext):
+                storage.delete(variant[ext])
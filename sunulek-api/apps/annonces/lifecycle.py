@@ -0,0 +1,98 @@
+"""
+Ad lifecycle sweeper.
+
+Active ads get an `expires_at` when they go live (see signals.set_expiry).
+sweep(), run every hour by the `run_tasks` worker (see TASKS['PERIODIC'])
+or on demand with `manage.py sweep_ads`, then, in bounded batches, each in
+its own transaction:
+
+- moves due active ads to EXPIRED, using the partial index on expires_at;
+- permanently deletes ads soft-deleted more than PURGE_AFTER_DAYS ago.
+
+Batches select rows by state, not by position, so an interrupted run is
+simply resumed by the next one and running twice changes nothing.
+Expiry is a bulk UPDATE that sends no post_save: the `ads_expired` signal
+lets the category counters and the response cache follow.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from apps.categories.counts import COUNT_FIELDS
+
+from .models import Ad
+
+# Sent inside each expiry batch's transaction, with `ads`: the expired Ad
+# instances as they were before the update (COUNT_FIELDS loaded)
+ads_expired = Signal()
+
+
+def get_options():
+    return {
+        'DURATION_DAYS': 60,
+        'PURGE_AFTER_DAYS': 30,
+        'BATCH_SIZE': 500,
+        **getattr(settings, 'AD_LIFECYCLE', {}),
+    }
+
+
+def expiry_date(start=None):
+    return (start or timezone.now()) + timedelta(days=get_options()['DURATION_DAYS'])
+
+
+def expire_batch(now, batch_size):
+    """Expire up to `batch_size` due ads. Returns the number expired."""
+    with transaction.atomic():
+        ads = list(
+            Ad.objects.select_for_update(skip_locked=True).filter(
+                status=Ad.Status.ACTIVE, expires_at__lte=now
+            ).order_by('expires_at').only('id', *COUNT_FIELDS)[:batch_size]
+        )
+        if not ads:
+            return 0
+        Ad.objects.filter(pk__in=[ad.pk for ad in ads], status=Ad.Status.ACTIVE).update(
+            status=Ad.Status.EXPIRED, updated_at=now
+        )
+        ads_expired.send(sender=Ad, ads=ads)
+    return len(ads)
+
+
+def purge_batch(cutoff, batch_size):
+    """Delete up to `batch_size` ads soft-deleted before `cutoff`. Returns the number deleted."""
+    with transaction.atomic():
+        ids = list(
+            Ad.objects.select_for_update(skip_locked=True).filter(
+                deleted_at__lt=cutoff
+            ).order_by('deleted_at').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        # Sends post_delete per ad and image: files, counters and caches are cleaned up
+        Ad.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def run_batches(step, max_batches=None):
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        done = step()
+        total += done
+        batches += 1
+        if not done:
+            break
+    return total
+
+
+def sweep(now=None, batch_size=None, max_batches=None):
+    """Expire due ads and purge old soft-deleted ones. Returns (expired, purged)."""
+    options = get_options()
+    now = now or timezone.now()
+    batch_size = batch_size or options['BATCH_SIZE']
+    cutoff = now - timedelta(days=options['PURGE_AFTER_DAYS'])
+    expired = run_batches(lambda: expire_batch(now, batch_size), max_batches)
+    purged = run_batches(lambda: purge_batch(cutoff, batch_size), max_batches)
+    return expired, purged
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.annonces.query_audit import audit
+
+
+class Command(BaseCommand):
+    help = 'Affiche le plan d\'exécution des requêtes de lecture de l\'API et signale les parcours complets.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Code de sortie 1 si une requête parcourt une grande table.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Affiche aussi le SQL et le plan complet.')
+    
+    def handle(self, *args, **options):
+        user = get_user_model().objects.order_by('pk').first()
+        if user is None:
+            raise CommandError('Aucun utilisateur : créez-en un pour exécuter les requêtes authentifiées.')
+        
+        results = audit(user)
+        flagged = [result for result in results if result['full_scans']]
+        for result in results:
+            status = self.style.ERROR('PARCOURS ' + ', '.join(result['full_scans'])) if result['full_scans'] else 'index'
+            self.stdout.write(f"{result['name']:<32} {status}")
+            if options['verbose_plans'] or result['full_scans']:
+                self.stdout.write(f"    {result['sql']}")
+                for line in result['plan']:
+                    self.stdout.write(f'      {line}')
+        
+        if flagged and options['check']:
+            raise CommandError(f'{len(flagged)} requête(s) sans index.')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} requête(s) analysée(s), {len(flagged)} sans index.'))
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from apps.annonces.fastpath import check_contracts
+
+
+class Command(BaseCommand):
+    help = 'Vérifie que les sérialiseurs rapides produisent exactement le même JSON que DRF.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email de l\'utilisateur (défaut : celui qui a le plus de conversations).')
+        parser.add_argument('--check', action='store_true', help='Code de sortie 1 si une réponse diffère.')
+    
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['user']:
+            user = users.filter(email=options['user']).first()
+        else:
+            user = users.annotate(total=Count('initiated_conversations')).order_by('-total', 'pk').first()
+        if user is None:
+            raise CommandError('Aucun utilisateur trouvé.')
+        
+        results = check_contracts(user)
+        different = [result for result in results if not result['identical']]
+        for result in results:
+            if result['identical']:
+                self.stdout.write(f"{result['name']:<24} identique ({result['size']} octets)")
+                continue
+            self.stdout.write(self.style.ERROR(f"{result['name']:<24} DIFFÉRENT à l'octet {result['offset']}"))
+            self.stdout.write(f"    rapide    : {result['fast']!r}")
+            self.stdout.write(f"    référence : {result['reference']!r}")
+        
+        if different and options['check']:
+            raise CommandError(f'{len(different)} réponse(s) différente(s).')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} réponse(s) comparée(s), {len(different)} différente(s).'))
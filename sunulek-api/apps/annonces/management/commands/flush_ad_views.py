@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.annonces.counters import flush_views
+
+
+class Command(BaseCommand):
+    help = 'Écrit les vues d\'annonces en attente dans views_count.'
+    
+    def handle(self, *args, **options):
+        total = flush_views()
+        self.stdout.write(self.style.SUCCESS(f'{total} vue(s) enregistrée(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.annonces.images import process_ad_image
+from apps.annonces.models import AdImage
+
+
+class Command(BaseCommand):
+    help = 'Génère les variantes (miniature, carte, plein écran) des images d\'annonces existantes.'
+    
+    def handle(self, *args, **options):
+        processed = failed = 0
+        for ad_image in AdImage.objects.filter(variants={}).iterator(chunk_size=200):
+            if process_ad_image(ad_image):
+                processed += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(f'{processed} image(s) traitée(s), {failed} en échec.'))
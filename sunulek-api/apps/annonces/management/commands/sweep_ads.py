@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.annonces.lifecycle import sweep
+
+
+class Command(BaseCommand):
+    help = 'Expire les annonces arrivées à échéance et purge la corbeille ancienne, par lots.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Annonces par lot (défaut : AD_LIFECYCLE).')
+        parser.add_argument('--max-batches', type=int, default=None, help='Nombre maximal de lots par étape.')
+    
+    def handle(self, *args, **options):
+        expired, purged = sweep(batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f'{expired} annonce(s) expirée(s), {purged} purgée(s).'))
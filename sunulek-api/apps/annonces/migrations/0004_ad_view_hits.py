@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0003_add_deleted_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AdViewHit",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("viewer", models.CharField(max_length=64, verbose_name="Visiteur")),
+                ("window", models.PositiveIntegerField(verbose_name="Fenêtre")),
+                (
+                    "flushed",
+                    models.BooleanField(default=False, verbose_name="Comptabilisée"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "ad",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_hits",
+                        to="annonces.ad",
+                        verbose_name="Annonce",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Vue d'annonce",
+                "verbose_name_plural": "Vues d'annonces",
+                "indexes": [
+                    models.Index(
+                        fields=["flushed", "window"],
+                        name="annonces_ad_flushed_fc4c4e_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ad", "viewer", "window"),
+                        name="unique_ad_view_per_window",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0005_ad_search_index"),
+        ("categories", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["created_at", "id"], name="annonces_ad_created_2b5504_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["price", "id"], name="annonces_ad_price_cb0994_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["views_count", "id"], name="annonces_ad_views_c_9578bb_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0006_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="adimage",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict, verbose_name="Variantes"),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_expires_at(apps, schema_editor):
+    # Live ads get a full period from now rather than expiring all at once
+    Ad = apps.get_model('annonces', 'Ad')
+    days = getattr(settings, 'AD_LIFECYCLE', {}).get('DURATION_DAYS', 60)
+    Ad.objects.filter(status='active', expires_at__isnull=True).update(
+        expires_at=timezone.now() + timedelta(days=days)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0007_ad_image_variants"),
+        ("categories", "0002_category_ad_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["expires_at"],
+                name="annonces_ad_expiry_due_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+    ]
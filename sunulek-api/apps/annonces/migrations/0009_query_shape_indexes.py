@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:11
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0008_ad_expiry"),
+        ("categories", "0002_category_ad_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_status_46f64e_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_categor_318d18_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_created_2b5504_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_price_cb0994_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_views_c_9578bb_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["created_at", "id"],
+                name="annonces_ad_public_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["price", "id"],
+                name="annonces_ad_public_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["views_count", "id"],
+                name="annonces_ad_public_views_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["category", "created_at"],
+                name="annonces_ad_public_cat_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                    ("is_featured", True),
+                ),
+                fields=["created_at"],
+                name="annonces_ad_public_feat_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                django.db.models.functions.text.Upper("region"),
+                django.db.models.functions.text.Upper("department"),
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                name="annonces_ad_public_region_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                fields=["user", "-created_at"], name="annonces_ad_user_id_25fbc6_idx"
+            ),
+        ),
+    ]
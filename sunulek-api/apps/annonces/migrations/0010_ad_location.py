@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+import django.db.models.deletion
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_locations(apps, schema_editor):
+    from apps.locations.matching import LocationIndex, match_ads
+
+    index = LocationIndex.load(
+        apps.get_model('locations', 'Region'),
+        apps.get_model('locations', 'Department'),
+        apps.get_model('locations', 'Neighborhood'),
+    )
+    # The typed text is kept: category counts are unchanged until they are
+    # keyed on the reference region (categories 0003)
+    match_ads(apps.get_model('annonces', 'Ad').objects.all(), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0009_query_shape_indexes"),
+        ("categories", "0002_category_ad_counts"),
+        ("locations", "0002_reference_data"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="annonces_ad_public_region_idx",
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True, verbose_name="Latitude"),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="location_department",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ads",
+                to="locations.department",
+                verbose_name="Département de référence",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="location_neighborhood",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ads",
+                to="locations.neighborhood",
+                verbose_name="Quartier de référence",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="location_region",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ads",
+                to="locations.region",
+                verbose_name="Région de référence",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ad",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True, verbose_name="Longitude"),
+        ),
+        # Before the new indexes, so the backfill does not maintain them
+        migrations.RunPython(backfill_locations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["location_region", "created_at"],
+                name="annonces_ad_public_loc_reg_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["location_department", "created_at"],
+                name="annonces_ad_public_loc_dep_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(
+                    ("deleted_at__isnull", True),
+                    ("is_active", True),
+                    ("status", "active"),
+                ),
+                fields=["latitude", "longitude"],
+                name="annonces_ad_public_geo_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,63 @@
 from django.db import models
 from django.conf import settings
+from django.db.models.functions import Coalesce
 from apps.categories.models import Category
+from apps.categories.counts import COUNT_FIELDS, count_key
+from apps.locations import geo
+
+
+# Rows of the public listings; also the condition of their partial indexes
+PUBLIC = models.Q(is_active=True, status='active', deleted_at__isnull=True)
+
+
+class AdQuerySet(models.QuerySet):
+    """QuerySet for ads with helpers for the public listings."""
+    
+    def public(self):
+        """Ads visible to everyone (active, validated, not in trash)."""
+        return self.filter(PUBLIC)
+    
+    def for_list(self, user=None):
+        """
+        Prepare ads for AdListSerializer in a constant number of queries.
+        
+        Loads category and seller in the same query, annotates the favorites
+        count and the viewer's favorited flag, and prefetches one image per ad.
+        """
+        from apps.favorites.models import Favorite
+        
+        favorites = Favorite.objects.filter(ad=models.OuterRef('pk'))
+        favorites_count = favorites.order_by().values('ad').annotate(
+            total=models.Count('pk')
+        ).values('total')
+        
+        queryset = self.select_related('category', 'user').annotate(
+            favorites_count=Coalesce(models.Subquery(favorites_count), 0),
+        ).prefetch_related(
+            models.Prefetch(
+                'images',
+                queryset=AdImage.objects.order_by('-is_primary', 'order', 'id')[:1],
+                to_attr='list_images',
+            )
+        )
+        
+        if user is not None and user.is_authenticated:
+            return queryset.annotate(is_favorited=models.Exists(favorites.filter(user=user)))
+        return queryset.annotate(is_favorited=models.Value(False))
+    
+    def tab_counts(self):
+        """Number of ads per my_ads tab (all, active, pending, deleted), in a single query."""
+        live = models.Q(deleted_at__isnull=True)
+        return self.aggregate(
+            total=models.Count('pk'),
+            active=models.Count('pk', filter=live & models.Q(status='active')),
+            pending=models.Count('pk', filter=live & models.Q(status='pending')),
+            deleted=models.Count('pk', filter=models.Q(deleted_at__isnull=False)),
+        )
+    
+    def near(self, latitude, longitude, radius_km):
+        """Ads within `radius_km` of the point, annotated with `distance_km` (see locations.geo)."""
+        return geo.nearby(self, latitude, longitude, radius_km)
 
 
 class Ad(models.Model):
@@ -41,6 +98,34 @@ class Ad(models.Model):
     department = models.CharField(max_length=100, verbose_name='Département')
     neighborhood = models.CharField(max_length=100, blank=True, verbose_name='Quartier')
     address = models.CharField(max_length=255, blank=True, verbose_name='Adresse')
+    # Reference rows matched from the fields above on save (see locations.matching)
+    location_region = models.ForeignKey(
+        'locations.Region',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ads',
+        verbose_name='Région de référence'
+    )
+    location_department = models.ForeignKey(
+        'locations.Department',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ads',
+        verbose_name='Département de référence'
+    )
+    location_neighborhood = models.ForeignKey(
+        'locations.Neighborhood',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ads',
+        verbose_name='Quartier de référence'
+    )
+    # Coordinates of the most precise place matched, for `?near=`
+    latitude = models.FloatField(null=True, blank=True, verbose_name='Latitude')
+    longitude = models.FloatField(null=True, blank=True, verbose_name='Longitude')
     
     # Status
     status = models.CharField(
@@ -62,24 +147,58 @@ class Ad(models.Model):
     expires_at = models.DateTimeField(null=True, blank=True, verbose_name='Date d\'expiration')
     deleted_at = models.DateTimeField(null=True, blank=True, verbose_name='Date de suppression')
     
+    objects = AdQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Annonce'
         verbose_name_plural = 'Annonces'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['status', 'is_active']),
-            models.Index(fields=['category']),
             models.Index(fields=['region', 'department']),
             models.Index(fields=['-created_at']),
+            # Public listings, one per ordering, keyset-ready (see pagination.py);
+            # partial so expired, pending and deleted ads stay out of them
+            models.Index(fields=['created_at', 'id'], condition=PUBLIC, name='annonces_ad_public_created_idx'),
+            models.Index(fields=['price', 'id'], condition=PUBLIC, name='annonces_ad_public_price_idx'),
+            models.Index(fields=['views_count', 'id'], condition=PUBLIC, name='annonces_ad_public_views_idx'),
+            models.Index(fields=['category', 'created_at'], condition=PUBLIC, name='annonces_ad_public_cat_idx'),
+            models.Index(
+                fields=['created_at'], condition=PUBLIC & models.Q(is_featured=True),
+                name='annonces_ad_public_feat_idx',
+            ),
+            # AdFilter's region/department resolve to reference rows
+            models.Index(
+                fields=['location_region', 'created_at'], condition=PUBLIC, name='annonces_ad_public_loc_reg_idx',
+            ),
+            models.Index(
+                fields=['location_department', 'created_at'], condition=PUBLIC, name='annonces_ad_public_loc_dep_idx',
+            ),
+            # Bounding box of `?near=` (see locations.geo)
+            models.Index(fields=['latitude', 'longitude'], condition=PUBLIC, name='annonces_ad_public_geo_idx'),
+            # my_ads
+            models.Index(fields=['user', '-created_at']),
+            # Due ads for the expiry sweeper (see lifecycle.py)
+            models.Index(fields=['expires_at'], condition=models.Q(status='active'), name='annonces_ad_expiry_due_idx'),
         ]
     
     def __str__(self):
         return self.title
     
-    def increment_views(self):
-        """Increment view count."""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Where the ad is counted in CategoryAdCount, compared on save (see signals.py)
+        if COUNT_FIELDS <= set(field_names):
+            instance._counted_key = count_key(instance)
+        # Status as loaded, to detect an ad going back online (see signals.set_expiry)
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
+    def increment_views(self, count=1):
+        """Increment view count atomically."""
+        Ad.objects.filter(pk=self.pk).update(views_count=models.F('views_count') + count)
+        self.views_count += count
     
     def soft_delete(self):
         """Soft delete the ad."""
@@ -108,6 +227,8 @@ class AdImage(models.Model):
     image = models.ImageField(upload_to='ads/%Y/%m/', verbose_name='Image')
     is_primary = models.BooleanField(default=False, verbose_name='Image principale')
     order = models.PositiveIntegerField(default=0, verbose_name='Ordre')
+    # Resized copies by size and format, see images.py
+    variants = models.JSONField(default=dict, blank=True, verbose_name='Variantes')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -121,6 +242,36 @@ class AdImage(models.Model):
         return f"Image pour {self.ad.title}"
 
 
+class AdViewHit(models.Model):
+    """A view of an ad waiting to be added to Ad.views_count."""
+    
+    ad = models.ForeignKey(
+        Ad,
+        on_delete=models.CASCADE,
+        related_name='view_hits',
+        verbose_name='Annonce'
+    )
+    viewer = models.CharField(max_length=64, verbose_name='Visiteur')
+    window = models.PositiveIntegerField(verbose_name='Fenêtre')
+    flushed = models.BooleanField(default=False, verbose_name='Comptabilisée')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Vue d\'annonce'
+        verbose_name_plural = 'Vues d\'annonces'
+        constraints = [
+            models.UniqueConstraint(fields=['ad', 'viewer', 'window'], name='unique_ad_view_per_window'),
+        ]
+        indexes = [
+            models.Index(fields=['flushed', 'window']),
+        ]
+    
+    def __str__(self):
+        return f"Vue de {self.viewer} pour l'annonce {self.ad_id}"
+
+
 class AdContact(models.Model):
     """Contact messages for an ad."""
     
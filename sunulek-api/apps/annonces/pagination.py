@@ -0,0 +1,164 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are delimited by the (ordering field, id) of their first/last row
+instead of an OFFSET, and no COUNT(*) is run, so deep pages cost the same as
+the first one. Opt-in with `?pagination=cursor`, then follow `next` /
+`previous` links.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on (ordering field, id)."""
+    
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_param = api_settings.ORDERING_PARAM
+    invalid_cursor_message = 'Curseur invalide.'
+    
+    def __init__(self, ordering=None):
+        # Fixed ordering; otherwise taken from ?ordering= within view.ordering_fields
+        self.fixed_ordering = ordering
+    
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+    
+    def get_ordering(self, request, view):
+        if self.fixed_ordering:
+            return self.fixed_ordering
+        default = (getattr(view, 'ordering', None) or ['-created_at'])[0]
+        requested = request.query_params.get(self.ordering_param, '').split(',')[0].strip()
+        if requested.lstrip('-') in getattr(view, 'ordering_fields', []):
+            return requested
+        return default
+    
+    def encode_cursor(self, obj, reverse):
+        value = getattr(obj, self.field)
+        payload = {'v': str(value) if not isinstance(value, int) else value, 'id': obj.pk}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, base64.urlsafe_b64encode(raw).decode())
+    
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            value = model._meta.get_field(self.field).to_python(payload['v'])
+            return value, int(payload['id']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, json.JSONDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        ordering = self.get_ordering(request, view)
+        self.field = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = cursor[2] if cursor else False
+        
+        # Walk the index backwards to fetch the previous page
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}id')
+        
+        if cursor:
+            value, pk, _ = cursor
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}e': value}),
+                Q(**{f'{self.field}__{lookup}': value}) | Q(**{f'id__{lookup}': pk}),
+            )
+        
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        
+        self.page = rows
+        return rows
+    
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+    
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+    
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def wants_keyset(request):
+    return (
+        request.query_params.get('pagination') == 'cursor'
+        or KeysetPagination.cursor_query_param in request.query_params
+    )
+
+
+class KeysetPaginationMixin:
+    """
+    Use KeysetPagination instead of the default paginator when the client asks for it.
+    
+    `keyset_actions` restricts it to some actions (None: every action).
+    """
+    
+    keyset_pagination_class = KeysetPagination
+    keyset_actions = None
+    
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and (self.keyset_actions is None or self.action in self.keyset_actions)
+            and wants_keyset(self.request)
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
@@ -0,0 +1,118 @@
+"""
+Query-shape audit.
+
+Runs the API's hot read paths (ads list and its filters and orderings,
+featured, my_ads, contact messages, conversations) through their views,
+captures the SQL they issue and EXPLAINs every statement. A shape is
+flagged when the plan reads one of the large tables with a full scan.
+
+On PostgreSQL sequential scans are disabled for the EXPLAIN, so the result
+says whether an index *can* serve the shape even on a near-empty database.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .async_views import call_view
+
+# Tables that grow with usage; full scans of the others (categories...) are fine
+LARGE_TABLES = (
+    'annonces_ad',
+    'annonces_adcontact',
+    'annonces_adimage',
+    'chat_messages_conversation',
+    'chat_messages_message',
+    'favorites_favorite',
+)
+
+
+def request_factory():
+    """
+    APIRequestFactory whose requests carry a host accepted by ALLOWED_HOSTS.
+    
+    Its default 'testserver' is only allowed under the test runner, and
+    views that build absolute URLs (pagination links) would raise
+    DisallowedHost with it.
+    """
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*']
+    return APIRequestFactory(SERVER_NAME=next(filter(None, hosts), 'localhost'))
+
+
+def get_shapes():
+    """(name, view, method, path) for every audited request."""
+    from apps.annonces.views import AdViewSet, ContactMessagesViewSet
+    from apps.messages.views import ConversationViewSet
+    
+    ads_list = AdViewSet.as_view({'get': 'list'})
+    return [
+        ('ads.list', ads_list, '/'),
+        ('ads.list ordering=price', ads_list, '/?ordering=price'),
+        ('ads.list ordering=-views_count', ads_list, '/?ordering=-views_count'),
+        ('ads.list cursor', ads_list, '/?pagination=cursor'),
+        ('ads.list category', ads_list, '/?category=vehicules'),
+        ('ads.list region', ads_list, '/?region=Dakar&department=Pikine'),
+        ('ads.list near', ads_list, '/?near=14.7167,-17.4677&radius=5'),
+        ('ads.featured', AdViewSet.as_view({'get': 'featured'}), '/featured/'),
+        ('ads.recent', AdViewSet.as_view({'get': 'recent'}), '/recent/'),
+        ('ads.my_ads', AdViewSet.as_view({'get': 'my_ads'}), '/my_ads/?status=active'),
+        ('contact_messages.list', ContactMessagesViewSet.as_view({'get': 'list'}), '/messages/'),
+        ('conversations.list', ConversationViewSet.as_view({'get': 'list'}), '/conversations/'),
+        ('conversations.unread_count', ConversationViewSet.as_view({'get': 'unread_count'}), '/conversations/unread_count/'),
+    ]
+
+
+def explain(sql):
+    """Plan lines of `sql` for the current database."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+    return []
+
+
+def full_scans(plan):
+    """Large tables read without an index in `plan`."""
+    scanned = []
+    for line in plan:
+        match = (
+            re.search(r'Seq Scan on (\w+)', line)  # PostgreSQL
+            or re.match(r'SCAN (\w+)(?! USING)', line.strip())  # SQLite
+        )
+        if match and match.group(1) in LARGE_TABLES:
+            scanned.append(match.group(1))
+    return scanned
+
+
+def audit(user):
+    """
+    Run every shape as `user` and return [{'name', 'sql', 'plan', 'full_scans'}].
+    
+    Requests are authenticated so the response cache does not hide the queries.
+    Everything runs in a rolled back transaction.
+    """
+    from django.db import transaction
+    
+    factory = request_factory()
+    results = []
+    with transaction.atomic():
+        for name, view, path in get_shapes():
+            request = factory.get(path)
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as captured:
+                call_view(view, request).render()
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                plan = explain(sql)
+                results.append({'name': name, 'sql': sql, 'plan': plan, 'full_scans': full_scans(plan)})
+        transaction.set_rollback(True)
+    return results
@@ -0,0 +1,34 @@
+"""
+JSON renderer backed by orjson.
+
+Produces the same bytes as DRF's JSONRenderer with the default settings
+(compact separators, UTF-8, \\u2028/\\u2029 escaped): values orjson does not
+encode natively the same way (datetimes, decimals, lazy strings...) go
+through DRF's encoder. Indented output, and anything orjson refuses, is
+left to JSONRenderer.
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class FastJSONRenderer(JSONRenderer):
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or not self.compact
+            or self.ensure_ascii
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
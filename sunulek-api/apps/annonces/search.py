@@ -0,0 +1,189 @@
+"""
+Full-text search for ads.
+
+PostgreSQL: `annonces_ad.search_vector` is a generated tsvector column
+(french config, title weighted above description) with a GIN index.
+SQLite: `annonces_ad_fts` is an FTS5 table kept in sync by triggers.
+Other databases fall back to DRF's icontains search.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+SEARCH_CONFIG = 'french'
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE annonces_ad ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS annonces_ad_search_vector_idx ON annonces_ad USING gin (search_vector)',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS annonces_ad_search_vector_idx',
+    'ALTER TABLE annonces_ad DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS annonces_ad_fts USING fts5(
+        title, description,
+        content='annonces_ad', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_TRIGGERS = {
+    'annonces_ad_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS annonces_ad_fts_insert AFTER INSERT ON annonces_ad BEGIN
+            INSERT INTO annonces_ad_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+    'annonces_ad_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS annonces_ad_fts_delete AFTER DELETE ON annonces_ad BEGIN
+            INSERT INTO annonces_ad_fts(annonces_ad_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    'annonces_ad_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS annonces_ad_fts_update AFTER UPDATE OF title, description ON annonces_ad BEGIN
+            INSERT INTO annonces_ad_fts(annonces_ad_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO annonces_ad_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+SQLITE_UNINSTALL = [
+    *(f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGERS),
+    'DROP TABLE IF EXISTS annonces_ad_fts',
+]
+
+
+def install(schema_editor):
+    """Create the search column/index or FTS table for the current database."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_INSTALL:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        ensure_sqlite_index(schema_editor.connection)
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def ensure_sqlite_index(conn):
+    """
+    Create the FTS5 table and its triggers if missing.
+    
+    SQLite migrations that rebuild annonces_ad drop its triggers, so this also
+    runs after every migrate and rebuilds the index when triggers were lost.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'annonces_ad'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        cursor.execute(SQLITE_TABLE)
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        if not set(SQLITE_TRIGGERS) <= existing:
+            cursor.execute("INSERT INTO annonces_ad_fts(annonces_ad_fts) VALUES ('rebuild')")
+
+
+def fts5_query(terms):
+    """Turn user input into an FTS5 expression: every word must match, as a prefix."""
+    words = re.findall(r'\w+', ' '.join(terms))
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class PostgresSearchBackend:
+    """Ranked search on the GIN-indexed tsvector column."""
+    
+    def filter(self, queryset, terms):
+        query = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        text = ' '.join(terms)
+        return queryset.filter(
+            RawSQL(f'annonces_ad.search_vector @@ {query}', [text], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank(annonces_ad.search_vector, {query})', [text], output_field=FloatField())
+        )
+
+
+class SQLiteSearchBackend:
+    """Ranked search on the FTS5 table (bm25, title weighted twice)."""
+    
+    def filter(self, queryset, terms):
+        match = fts5_query(terms)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            RawSQL(
+                'annonces_ad.id IN (SELECT rowid FROM annonces_ad_fts WHERE annonces_ad_fts MATCH %s)',
+                [match],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                '(SELECT -bm25(annonces_ad_fts, 2.0, 1.0) FROM annonces_ad_fts '
+                'WHERE annonces_ad_fts MATCH %s AND rowid = annonces_ad.id)',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class() if backend_class else None
+
+
+class AdSearchFilter(filters.SearchFilter):
+    """
+    `?search=` filter backed by the full-text index.
+    
+    Annotates `search_rank`, used by AdOrderingFilter when no explicit
+    ordering is requested. Falls back to icontains on other databases.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        backend = get_backend()
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        return backend.filter(queryset, terms)
+
+
+class AdOrderingFilter(filters.OrderingFilter):
+    """Order `?near=` results by distance, then search results by relevance, unless `?ordering=` is given."""
+    
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            annotations = queryset.query.annotations
+            if 'distance_km' in annotations:
+                return ['distance_km', '-created_at']
+            if 'search_rank' in annotations:
+                return ['-search_rank', '-created_at']
+        return super().get_ordering(request, queryset, view)
@@ -3,18 +3,40 @@ from django.utils.text import slugify
 from django.utils import timezone
 import uuid
 from .models import Ad, AdImage, AdContact
+from .images import VARIANT_SIZES, FORMATS, variant_url
+from .uploads import attach_images, ensure_primary, validate_uploads
+from .direct_uploads import CONTENT_TYPES, validate_keys
+from .fastpath import FastRepresentationMixin
 from apps.categories.models import Category
 
 
-class AdImageSerializer(serializers.ModelSerializer):
+class AdImageSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Serializer for ad images."""
     
+    srcset = serializers.SerializerMethodField()
+    
     class Meta:
         model = AdImage
-        fields = ['id', 'image', 'is_primary', 'order']
+        fields = ['id', 'image', 'is_primary', 'order', 'srcset']
+    
+    def get_srcset(self, obj):
+        """`srcset` attribute per format, e.g. {'webp': '<url> 200w, <url> 480w, ...'}."""
+        if not obj.variants:
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for ext in FORMATS:
+            candidates = []
+            for name in VARIANT_SIZES:
+                url = variant_url(obj, name, ext)
+                if url:
+                    url = request.build_absolute_uri(url) if request else url
+                    candidates.append(f"{url} {obj.variants[name]['width']}w")
+            srcset[ext] = ', '.join(candidates)
+        return srcset
 
 
-class AdListSerializer(serializers.ModelSerializer):
+class AdListSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Serializer for ad list view (minimal data)."""
     
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -22,36 +44,51 @@ class AdListSerializer(serializers.ModelSerializer):
     primary_image = serializers.SerializerMethodField()
     favorites_count = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
     
     class Meta:
         model = Ad
         fields = [
             'id', 'title', 'slug', 'price', 'is_negotiable',
-            'region', 'department', 'neighborhood',
+            'region', 'department', 'neighborhood', 'distance_km',
             'category_name', 'user_name', 'primary_image',
             'views_count', 'favorites_count', 'is_favorited',
             'is_featured', 'status', 'deleted_at', 'created_at'
         ]
     
     def get_primary_image(self, obj):
-        primary = obj.images.filter(is_primary=True).first()
-        if not primary:
-            primary = obj.images.first()
+        # Prefetched by Ad.objects.for_list()
+        if hasattr(obj, 'list_images'):
+            primary = obj.list_images[0] if obj.list_images else None
+        else:
+            primary = obj.images.filter(is_primary=True).first()
+            if not primary:
+                primary = obj.images.first()
         if primary:
+            url = variant_url(primary, 'card') or primary.image.url
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(primary.image.url)
-            return primary.image.url
+                return request.build_absolute_uri(url)
+            return url
         return None
     
     def get_favorites_count(self, obj):
+        if hasattr(obj, 'favorites_count'):
+            return obj.favorites_count
         return obj.favorites.count()
     
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.favorites.filter(user=request.user).exists()
         return False
+    
+    def get_distance_km(self, obj):
+        # Annotated by Ad.objects.near() (`?near=`)
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 1) if distance is not None else None
 
 
 class AdDetailSerializer(serializers.ModelSerializer):
@@ -68,7 +105,7 @@ class AdDetailSerializer(serializers.ModelSerializer):
         model = Ad
         fields = [
             'id', 'title', 'slug', 'description', 'price', 'is_negotiable',
-            'region', 'department', 'neighborhood', 'address',
+            'region', 'department', 'neighborhood', 'address', 'latitude', 'longitude',
             'category', 'user', 'images', 'status',
             'views_count', 'favorites_count', 'is_favorited', 'is_featured',
             'is_owner', 'created_at', 'published_at'
@@ -128,6 +165,22 @@ class AdCreateSerializer(serializers.ModelSerializer):
             'images', 'delete_images'
         ]
     
+    def validate_delete_images(self, value):
+        import json
+        try:
+            delete_ids = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return delete_ids if isinstance(delete_ids, list) else []
+    
+    def validate(self, attrs):
+        if attrs.get('images'):
+            existing = 0
+            if self.instance is not None:
+                existing = self.instance.images.exclude(id__in=attrs.get('delete_images', [])).count()
+            validate_uploads(attrs['images'], existing)
+        return attrs
+    
     def create(self, validated_data):
         images_data = validated_data.pop('images', [])
         validated_data.pop('delete_images', None)  # Remove if present
@@ -143,14 +196,7 @@ class AdCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Create images
-        for i, image in enumerate(images_data):
-            AdImage.objects.create(
-                ad=ad,
-                image=image,
-                is_primary=(i == 0),
-                order=i
-            )
+        attach_images(ad, images_data)
         
         return ad
     
@@ -165,35 +211,44 @@ class AdCreateSerializer(serializers.ModelSerializer):
         
         # Delete specified images
         if delete_images_json:
-            import json
-            try:
-                delete_ids = json.loads(delete_images_json)
-                if isinstance(delete_ids, list):
-                    instance.images.filter(id__in=delete_ids).delete()
-            except (json.JSONDecodeError, TypeError):
-                pass
+            instance.images.filter(id__in=delete_images_json).delete()
         
-        # Add new images
-        if images_data:
-            existing_count = instance.images.count()
-            for i, image in enumerate(images_data):
-                AdImage.objects.create(
-                    ad=instance,
-                    image=image,
-                    is_primary=(existing_count == 0 and i == 0),
-                    order=existing_count + i
-                )
-            
-            # Ensure there's a primary image
-            if not instance.images.filter(is_primary=True).exists():
-                first_image = instance.images.first()
-                if first_image:
-                    first_image.is_primary = True
-                    first_image.save()
+        # Add new images; the first one is primary if the ad has none left
+        attach_images(instance, images_data)
+        if delete_images_json and not images_data:
+            ensure_primary(instance)
         
         return instance
 
 
+class AdImageUploadSerializer(serializers.Serializer):
+    """Validate photos added to an existing ad (context: `ad`)."""
+    
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False)
+    
+    def validate_images(self, value):
+        return validate_uploads(value, self.context['ad'].images.count())
+
+
+class UploadUrlsSerializer(serializers.Serializer):
+    """Content types of the photos the client is about to upload directly to storage."""
+    
+    content_types = serializers.ListField(
+        child=serializers.ChoiceField(choices=list(CONTENT_TYPES)),
+        allow_empty=False,
+        max_length=20,
+    )
+
+
+class AdImageRegisterSerializer(serializers.Serializer):
+    """Keys of direct uploads to attach to an ad (context: `ad`, `request`)."""
+    
+    keys = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    
+    def validate_keys(self, value):
+        return validate_keys(self.context['request'].user, value, self.context['ad'].images.count())
+
+
 class AdContactSerializer(serializers.ModelSerializer):
     """Serializer for contacting ad owner."""
     
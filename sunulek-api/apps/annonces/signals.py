@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.categories import counts
+from apps.locations.matching import apply as apply_location, get_index
+
+from . import caching
+from .models import Ad, AdImage
+from .images import delete_variants
+from .lifecycle import ads_expired, expiry_date
+from .tasks import generate_image_variants
+
+
+@receiver(post_save, sender=AdImage)
+def queue_image_variants(sender, instance, created, raw=False, **kwargs):
+    """Resize and re-encode new uploads in the background."""
+    if created and not raw and not instance.variants:
+        generate_image_variants.delay(instance.pk)
+
+
+@receiver(post_delete, sender=AdImage)
+def delete_image_variants(sender, instance, **kwargs):
+    delete_variants(instance)
+
+
+@receiver([post_save, post_delete], sender=Ad)
+def invalidate_ad_responses(sender, instance, **kwargs):
+    caching.invalidate(caching.ADS, caching.CATEGORIES, caching.ad_namespace(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=AdImage)
+@receiver([post_save, post_delete], sender='favorites.Favorite')
+def invalidate_ad_related_responses(sender, instance, **kwargs):
+    caching.invalidate(caching.ADS, caching.ad_namespace(instance.ad_id))
+
+
+@receiver([post_save, post_delete], sender='categories.Category')
+def invalidate_category_responses(sender, instance, **kwargs):
+    caching.invalidate(caching.ADS, caching.CATEGORIES, caching.category_namespace(instance.pk))
+
+
+def affects_counts(update_fields):
+    return update_fields is None or bool(
+        {Ad._meta.get_field(name).attname for name in update_fields} & counts.COUNT_FIELDS
+    )
+
+
+@receiver(pre_save, sender=Ad)
+def load_counted_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Read where the ad is counted from the database when it was not loaded with it."""
+    if raw or instance._state.adding or hasattr(instance, '_counted_key') or not affects_counts(update_fields):
+        return
+    previous = Ad.objects.filter(pk=instance.pk).only(*counts.COUNT_FIELDS).first()
+    instance._counted_key = counts.count_key(previous) if previous else None
+
+
+@receiver(post_save, sender=Ad)
+def update_category_counts(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not affects_counts(update_fields):
+        return
+    key = counts.count_key(instance)
+    counts.apply_deltas(counts.deltas_for(getattr(instance, '_counted_key', None), key))
+    instance._counted_key = key
+
+
+@receiver(post_delete, sender=Ad)
+def remove_from_category_counts(sender, instance, **kwargs):
+    old_key = getattr(instance, '_counted_key', counts.count_key(instance))
+    counts.apply_deltas(counts.deltas_for(old_key, None))
+    instance._counted_key = None
+
+
+@receiver(pre_save, sender=Ad)
+def set_expiry(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Give ads going live an expiry date (see lifecycle.py).
+    
+    An ad put back online (expired, sold, pending...) gets a new date, or
+    the sweeper would expire it again with its old one.
+    """
+    if raw or update_fields is not None:
+        return
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if instance.status != Ad.Status.ACTIVE:
+        return
+    reactivated = previous is not None and previous != Ad.Status.ACTIVE
+    if reactivated or instance.expires_at is None or instance.expires_at <= timezone.now():
+        instance.expires_at = expiry_date()
+
+
+@receiver(pre_save, sender=Ad)
+def match_location(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Link the typed location to the reference tables (see locations.matching)."""
+    if raw or update_fields is not None:
+        return
+    apply_location(instance, get_index().resolve(instance.region, instance.department, instance.neighborhood))
+
+
+@receiver(ads_expired)
+def remove_expired_from_counts(sender, ads, **kwargs):
+    deltas = Counter()
+    for ad in ads:
+        deltas.update(counts.deltas_for(counts.count_key(ad), None))
+    counts.apply_deltas(deltas)
+    caching.invalidate(caching.ADS, caching.CATEGORIES, *(caching.ad_namespace(ad.pk) for ad in ads))
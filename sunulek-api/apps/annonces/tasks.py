@@ -0,0 +1,20 @@
+from apps.tasks.queue import task
+
+from .images import process_ad_image
+from .models import AdImage
+
+
+@task(max_attempts=3)
+def generate_image_variants(ad_image_id):
+    from .direct_uploads import PENDING_PREFIX
+    from .uploads import ensure_primary
+    
+    ad_image = AdImage.objects.filter(pk=ad_image_id).first()
+    # Deleted or already processed in the meantime
+    if ad_image is None or ad_image.variants:
+        return
+    if not process_ad_image(ad_image) and ad_image.image.name.startswith(PENDING_PREFIX):
+        # Direct uploads are only checked here: drop files that are not images
+        ad_image.image.delete(save=False)
+        ad_image.delete()
+        ensure_primary(ad_image.ad)
@@ -0,0 +1,272 @@
+import io
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.categories.models import Category
+from apps.favorites.models import Favorite
+from apps.messages.models import Conversation
+from apps.users.models import User
+
+from . import caching, fastpath
+from .fastpath import check_contracts, get_contracts
+from .models import Ad, AdContact, AdImage
+from .query_audit import audit, get_shapes
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# The tests read the primary only, whatever DB_REPLICA_HOSTS says
+PRIMARY_ONLY = {'REPLICAS': []}
+
+
+def jpeg(name='photo.jpg'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, READ_REPLICAS=PRIMARY_ONLY)
+class AdListQueriesTests(TestCase):
+    """
+    Queries per page of the ad lists (see AdQuerySet.for_list).
+    
+    The counts must not depend on the number of ads, images or favorites
+    on the page: each page holds more ads than PAGE_SIZE, with images and
+    favorites, so an N+1 shows up as a failure.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.sn', 'owner', 'Awa', 'Diop', 'password')
+        cls.visitor = User.objects.create_user('visitor@example.sn', 'visitor', 'Moussa', 'Fall', 'password')
+        cls.category = Category.objects.create(name='Véhicules', slug='vehicules')
+        ads = [
+            Ad.objects.create(
+                title=f'Toyota Corolla {index}',
+                slug=f'toyota-corolla-{index}',
+                description='Bon état, climatisée.',
+                price=Decimal(1_500_000 + index),
+                user=cls.owner,
+                category=cls.category,
+                region='Dakar',
+                department='Pikine',
+                status='active',
+                is_featured=index < 3,
+            )
+            for index in range(25)
+        ]
+        for ad in ads[:5]:
+            AdImage.objects.create(ad=ad, image=jpeg(), order=0)
+            AdImage.objects.create(ad=ad, image=jpeg(), is_primary=True, order=1)
+        for ad in ads[::2]:
+            Favorite.objects.create(user=cls.visitor, ad=ad)
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+    
+    def get(self, url, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        # Anonymous responses are cached (see caching.py)
+        cache.clear()
+        return client.get(url)
+    
+    def assertQueries(self, url, expected, user=None):
+        with self.assertNumQueries(expected):
+            response = self.get(url, user)
+        self.assertEqual(response.status_code, 200)
+        return response
+    
+    def test_list(self):
+        # COUNT, ads with their annotations, images
+        response = self.assertQueries('/api/v1/annonces/', 3)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertQueries('/api/v1/annonces/', 3, user=self.visitor)
+    
+    def test_featured(self):
+        response = self.assertQueries('/api/v1/annonces/featured/', 2)
+        self.assertEqual(len(response.data), 3)
+        self.assertQueries('/api/v1/annonces/featured/', 2, user=self.visitor)
+    
+    def test_recent(self):
+        self.assertQueries('/api/v1/annonces/recent/', 2)
+        self.assertQueries('/api/v1/annonces/recent/', 2, user=self.visitor)
+    
+    def test_my_ads(self):
+        # COUNT, ads, images, tab counts
+        response = self.assertQueries('/api/v1/annonces/my_ads/', 4, user=self.owner)
+        self.assertEqual(response.data['counts']['total'], 25)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('/api/v1/annonces/my_ads/').status_code, 401)
+    
+    def test_category_ads(self):
+        # Category, COUNT, ads, images
+        url = f'/api/v1/categories/{self.category.slug}/ads/'
+        self.assertQueries(url, 4)
+        self.assertQueries(url, 4, user=self.visitor)
+    
+    def test_favorites(self):
+        # COUNT, favorites, their ads (Prefetch with for_list), images
+        response = self.assertQueries('/api/v1/favorites/', 4, user=self.visitor)
+        self.assertEqual(response.data['count'], 13)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('/api/v1/favorites/').status_code, 401)
+
+
+@override_settings(READ_REPLICAS=PRIMARY_ONLY)
+class ResponseCacheTests(TestCase):
+    """Anonymous responses are cached in memory caches only (see caching.py)."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner@example.sn', 'owner', 'Awa', 'Diop', 'password')
+        category = Category.objects.create(name='Véhicules', slug='vehicules')
+        Ad.objects.create(
+            title='Toyota Corolla', slug='toyota-corolla', description='Bon état.', price=Decimal(1_500_000),
+            user=owner, category=category, region='Dakar', department='Pikine', status='active',
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_hits_are_served_without_queries(self):
+        client = APIClient()
+        client.get('/api/v1/annonces/recent/')
+        with self.assertNumQueries(0):
+            response = client.get('/api/v1/annonces/recent/')
+        self.assertIn('ETag', response)
+        stats = caching.get_stats(['AdViewSet.recent'])['AdViewSet.recent']
+        self.assertGreaterEqual(stats['hits'], 1)
+    
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'sunulek_cache',
+    }})
+    def test_off_on_database_cache(self):
+        # No cache table in the test database: any cache read would fail.
+        # Ads and images, every time
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                response = APIClient().get('/api/v1/annonces/recent/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('ETag', response)
+
+
+@override_settings(READ_REPLICAS=PRIMARY_ONLY)
+class QueryPlanTests(TestCase):
+    """Every query shape of query_audit.py is served by an index (EXPLAIN)."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner@example.sn', 'owner', 'Awa', 'Diop', 'password')
+        visitor = User.objects.create_user('visitor@example.sn', 'visitor', 'Moussa', 'Fall', 'password')
+        category = Category.objects.create(name='Véhicules', slug='vehicules')
+        ad = Ad.objects.create(
+            title='Toyota Corolla', slug='toyota-corolla', description='Bon état.', price=Decimal(1_500_000),
+            user=cls.owner, category=category, region='Dakar', department='Pikine', status='active',
+        )
+        AdContact.objects.create(ad=ad, sender=visitor, message='Toujours disponible ?')
+        conversation = Conversation.objects.create(ad=ad, initiator=visitor, recipient=cls.owner)
+        conversation.add_message(visitor, 'Bonjour, est-ce toujours disponible ?')
+    
+    def test_every_shape_uses_an_index(self):
+        results = audit(self.owner)
+        self.assertEqual(
+            {name for name, *_ in get_shapes()},
+            {result['name'] for result in results},
+        )
+        for result in results:
+            with self.subTest(result['name'], sql=result['sql']):
+                self.assertEqual(result['full_scans'], [], '\n'.join(result['plan']))
+    
+    @override_settings(ALLOWED_HOSTS=['api.sunulek.com'])
+    def test_runs_with_the_production_hosts(self):
+        # Requests must not carry the test client's 'testserver' host
+        self.assertTrue(audit(self.owner))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, READ_REPLICAS=PRIMARY_ONLY)
+class FastPathContractTests(TestCase):
+    """The fast serializers render byte for byte what DRF's serializers render."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('visitor@example.sn', 'visitor', 'Moussa', 'Fall', 'password')
+        seller = User.objects.create_user('seller@example.sn', 'seller', 'Awa', 'Ndiaye', 'password')
+        category = Category.objects.create(name='Électronique', slug='electronique')
+        ads = []
+        for index, (owner, price) in enumerate([
+            (seller, Decimal('250000.00')), (seller, Decimal('0.50')), (cls.user, Decimal('1200000')),
+        ]):
+            ads.append(Ad.objects.create(
+                title=f'iPhone 13 « comme neuf » n°{index}',
+                slug=f'iphone-13-{index}',
+                description='Écran intact, batterie 92 %.\nLivraison possible 🚚',
+                price=price,
+                is_negotiable=index % 2 == 0,
+                user=owner,
+                category=category,
+                region='Dakar',
+                department='Dakar',
+                neighborhood='Sacré-Cœur 3' if index else '',
+                status='active',
+            ))
+        AdImage.objects.create(ad=ads[0], image=jpeg(), is_primary=True)
+        AdImage.objects.create(ad=ads[0], image=jpeg(), order=1)
+        Ad.objects.create(
+            title='Ancienne annonce', slug='ancienne-annonce', description='Vendue.', price=Decimal(5000),
+            user=cls.user, category=category, region='Thiès', department='Mbour', status='pending',
+        )
+        Favorite.objects.create(user=cls.user, ad=ads[0])
+        Favorite.objects.create(user=cls.user, ad=ads[1])
+        conversation = Conversation.objects.create(ad=ads[0], initiator=cls.user, recipient=seller)
+        conversation.add_message(cls.user, 'Bonjour, c\'est "négociable" ? 😀')
+        conversation.add_message(seller, 'Oui, à partir de 230 000 FCFA.')
+        Conversation.objects.create(ad=ads[1], initiator=cls.user, recipient=seller)
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_fast_responses_match_drf(self):
+        results = check_contracts(self.user)
+        self.assertEqual(
+            [name for name, *_ in get_contracts(self.user)],
+            [result['name'] for result in results],
+        )
+        for result in results:
+            with self.subTest(result['name']):
+                self.assertTrue(
+                    result['identical'],
+                    f"octet {result['offset']} : {result['fast']!r} != {result['reference']!r}",
+                )
+    
+    def test_every_contract_is_covered(self):
+        self.assertEqual(len(get_contracts(self.user)), 8)
+    
+    @override_settings(ALLOWED_HOSTS=['api.sunulek.com'])
+    def test_runs_with_the_production_hosts(self):
+        self.assertTrue(all(result['identical'] for result in check_contracts(self.user)))
+    
+    def test_reference_mode_does_not_leak_to_other_threads(self):
+        seen = []
+        with fastpath.reference_mode():
+            thread = threading.Thread(target=lambda: seen.append(fastpath.enabled.get()))
+            thread.start()
+            thread.join()
+            self.assertFalse(fastpath.enabled.get())
+        self.assertEqual(seen, [True])
+        self.assertTrue(fastpath.enabled.get())
@@ -0,0 +1,75 @@
+"""
+Ad photo uploads.
+
+Uploads are streamed to temporary files by Django's upload handlers (see
+FILE_UPLOAD_HANDLERS), validated from disk, then attached to the ad with a
+single bulk_create. bulk_create sends no post_save, so the follow-up work of
+the AdImage signals (variants, response cache) is done here.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Q, Subquery
+from rest_framework import serializers
+
+from . import caching
+from .models import Ad, AdImage
+from .tasks import generate_image_variants
+
+
+def get_limits():
+    return {
+        'MAX_PER_AD': 10,
+        'MAX_FILE_SIZE': 10 * 1024 * 1024,
+        'UPLOAD_EXPIRY': 600,
+        **getattr(settings, 'AD_IMAGES', {}),
+    }
+
+
+def validate_uploads(files, existing=0):
+    """Check the number and size of uploaded files before anything is stored."""
+    limits = get_limits()
+    if existing + len(files) > limits['MAX_PER_AD']:
+        raise serializers.ValidationError(
+            f"Une annonce ne peut pas avoir plus de {limits['MAX_PER_AD']} images."
+        )
+    max_mb = limits['MAX_FILE_SIZE'] // (1024 * 1024)
+    for file in files:
+        if file.size > limits['MAX_FILE_SIZE']:
+            raise serializers.ValidationError(f'{file.name} dépasse la taille maximale de {max_mb} Mo.')
+    return files
+
+
+def attach_images(ad, files):
+    """
+    Store `files` and insert their AdImage rows in one statement, after the
+    ad's current images. The first one becomes primary if the ad has none.
+    """
+    if not files:
+        return []
+    with transaction.atomic():
+        # Serialize uploads to the same ad so orders do not collide
+        Ad.objects.select_for_update().filter(pk=ad.pk).values_list('pk', flat=True).get()
+        current = AdImage.objects.filter(ad=ad).aggregate(
+            last_order=Max('order'),
+            primaries=Count('pk', filter=Q(is_primary=True)),
+        )
+        start = 0 if current['last_order'] is None else current['last_order'] + 1
+        images = AdImage.objects.bulk_create([
+            AdImage(ad=ad, image=file, is_primary=(i == 0 and not current['primaries']), order=start + i)
+            for i, file in enumerate(files)
+        ])
+        for image in images:
+            generate_image_variants.delay(image.pk)
+        caching.invalidate(caching.ADS, caching.ad_namespace(ad.pk))
+    return images
+
+
+def ensure_primary(ad):
+    """Make the first image primary if the ad has images but no primary one, in one UPDATE."""
+    first = AdImage.objects.filter(ad=ad).order_by('order', 'id').values('pk')[:1]
+    updated = AdImage.objects.filter(pk=Subquery(first)).filter(
+        ~Exists(AdImage.objects.filter(ad=OuterRef('ad'), is_primary=True))
+    ).update(is_primary=True)
+    if updated:
+        caching.invalidate(caching.ADS, caching.ad_namespace(ad.pk))
@@ -1,18 +1,34 @@
-from rest_framework import viewsets, permissions, status, filters
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
-from .models import Ad, AdImage, AdContact
+from .models import Ad, AdContact
 from .serializers import (
     AdListSerializer,
     AdDetailSerializer,
     AdCreateSerializer,
     AdContactSerializer,
     AdImageSerializer,
+    AdImageUploadSerializer,
+    AdImageRegisterSerializer,
+    UploadUrlsSerializer,
 )
 from .filters import AdFilter
+from .facets import compute_facets
+from .uploads import attach_images, get_limits
+from .direct_uploads import load_upload_token, presign
+from .counters import record_view
+from .caching import ADS, ENDPOINTS, ad_namespace, cache_response, category_namespace, get_stats
+from .search import AdSearchFilter, AdOrderingFilter
+from .pagination import KeysetPaginationMixin
 from .permissions import IsOwnerOrReadOnly
+from .async_views import AsyncViewMixin
+from apps.replicas.routing import ReplicaReadMixin
 
 
 @extend_schema(tags=['Annonces'])
@@ -23,22 +39,32 @@ from .permissions import IsOwnerOrReadOnly
     update=extend_schema(description='Modifier une annonce'),
     destroy=extend_schema(description='Supprimer une annonce'),
 )
-class AdViewSet(viewsets.ModelViewSet):
-    """ViewSet for ads/annonces."""
+class AdViewSet(ReplicaReadMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for ads/annonces. `?pagination=cursor` switches the list to keyset pagination.
+    
+    Safe requests read a replica when one is configured.
+    """
     
     queryset = Ad.objects.filter(is_active=True, status='active')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, AdSearchFilter, AdOrderingFilter]
     filterset_class = AdFilter
     search_fields = ['title', 'description']
     ordering_fields = ['price', 'created_at', 'views_count']
     ordering = ['-created_at']
     lookup_field = 'slug'
+    throttle_scopes = {'contact': 'contact'}
     
     def get_permissions(self):
-        if self.action in ['create']:
+        if self.action in ['create', 'upload_urls']:
             return [permissions.IsAuthenticated()]
         elif self.action in ['update', 'partial_update', 'destroy', 'soft_delete', 'restore', 'permanent_delete']:
             return [permissions.IsAuthenticated(), IsOwnerOrReadOnly()]
+        elif self.action == 'cache_stats':
+            return [permissions.IsAdminUser()]
+        if 'permission_classes' in getattr(getattr(self, self.action or '', None), 'kwargs', {}):
+            # Extra actions (my_ads, contact...) keep the permissions declared on @action
+            return super().get_permissions()
         return [permissions.AllowAny()]
     
     def get_serializer_class(self):
@@ -54,10 +80,10 @@ class AdViewSet(viewsets.ModelViewSet):
         
         # For list view, show only active ads
         if self.action == 'list':
-            return Ad.objects.filter(is_active=True, status='active', deleted_at__isnull=True)
+            return Ad.objects.public().for_list(user)
         
         # For retrieve/update/delete, allow owner to access their own ads regardless of status
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy', 'soft_delete']:
+        if self.action in ['retrieve', 'update', 'partial_update', 'destroy', 'soft_delete', 'add_images', 'register_images']:
             if user.is_authenticated:
                 # Return ads that are either active OR owned by the user
                 from django.db.models import Q
@@ -68,17 +94,33 @@ class AdViewSet(viewsets.ModelViewSet):
         
         return Ad.objects.filter(is_active=True, status='active', deleted_at__isnull=True)
     
+    @cache_response(ADS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count (simple implementation)
+        # Buffered and deduplicated, written by flush_ad_views
         if not request.user.is_authenticated or request.user != instance.user:
-            instance.increment_views()
+            record_view(request, instance)
+        return self.retrieve_data(request, instance)
+    
+    @cache_response(
+        lambda view, instance: ad_namespace(instance.pk),
+        lambda view, instance: category_namespace(instance.category_id),
+    )
+    def retrieve_data(self, request, instance):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_ads(self, request):
-        """Get current user's ads (including pending and soft-deleted)."""
+        """
+        Get current user's ads (including pending and soft-deleted), paginated.
+        
+        `counts` gives the size of each tab, so the client does not need to
+        fetch every ad to display them.
+        """
         status_filter = request.query_params.get('status', None)
         
         # Get all user's ads (not permanently deleted)
@@ -90,13 +132,13 @@ class AdViewSet(viewsets.ModelViewSet):
             ads = ads.filter(status='pending', deleted_at__isnull=True)
         elif status_filter == 'deleted':
             ads = ads.filter(deleted_at__isnull=False)
-        else:
-            # Return all ads (for tab counts)
-            pass
         
-        ads = ads.order_by('-created_at')
-        serializer = AdListSerializer(ads, many=True, context={'request': request})
-        return Response(serializer.data)
+        ads = ads.for_list(request.user).order_by('-created_at')
+        page = self.paginate_queryset(ads)
+        serializer = AdListSerializer(page, many=True, context={'request': request})
+        response = self.get_paginated_response(serializer.data)
+        response.data['counts'] = Ad.objects.filter(user=request.user).tab_counts()
+        return response
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def soft_delete(self, request, slug=None):
@@ -183,42 +225,110 @@ class AdViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        existing_count = ad.images.count()
-        for i, image in enumerate(images):
-            AdImage.objects.create(
-                ad=ad,
-                image=image,
-                is_primary=(existing_count == 0 and i == 0),
-                order=existing_count + i
-            )
+        serializer = AdImageUploadSerializer(data={'images': images}, context={'ad': ad})
+        serializer.is_valid(raise_exception=True)
+        attach_images(ad, serializer.validated_data['images'])
         
         return Response({'message': f'{len(images)} image(s) ajoutée(s).'})
     
+    @action(detail=False, methods=['post'])
+    def upload_urls(self, request):
+        """Presigned forms to upload photos straight to storage, then call register_images."""
+        serializer = UploadUrlsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploads = [presign(request, content_type) for content_type in serializer.validated_data['content_types']]
+        return Response({'uploads': uploads})
+    
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def register_images(self, request, slug=None):
+        """Attach photos uploaded with upload_urls to an ad."""
+        ad = self.get_object()
+        
+        if ad.user != request.user:
+            return Response(
+                {'error': 'Vous n\'êtes pas le propriétaire de cette annonce.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = AdImageRegisterSerializer(data=request.data, context={'ad': ad, 'request': request})
+        serializer.is_valid(raise_exception=True)
+        images = attach_images(ad, serializer.validated_data['keys'])
+        
+        return Response(
+            AdImageSerializer(images, many=True, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+    
     @action(detail=False, methods=['get'])
+    @cache_response(ADS)
+    def facets(self, request):
+        """Facet counts (category, region, department, price) for the current filters and search."""
+        queryset = self.filter_queryset(Ad.objects.public())
+        return Response(compute_facets(queryset))
+    
+    @action(detail=False, methods=['get'])
+    @cache_response(ADS)
     def featured(self, request):
         """Get featured ads."""
-        ads = self.get_queryset().filter(is_featured=True)[:10]
+        ads = Ad.objects.public().for_list(request.user).filter(is_featured=True)[:10]
         serializer = AdListSerializer(ads, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @cache_response(ADS)
     def recent(self, request):
         """Get most recent ads."""
-        ads = self.get_queryset().order_by('-created_at')[:10]
+        ads = Ad.objects.public().for_list(request.user).order_by('-created_at')[:10]
         serializer = AdListSerializer(ads, many=True, context={'request': request})
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Hit/miss counters of the response cache, per endpoint."""
+        return Response(get_stats(sorted(ENDPOINTS)))
+
+
+@extend_schema(tags=['Annonces'])
+class LocalUploadView(AsyncViewMixin, APIView):
+    """
+    Stand-in for the storage bucket when media are not on S3: receives the
+    form returned by `upload_urls`. The signed URL is the credential.
+    
+    Async: see async_views.
+    """
+    
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [MultiPartParser]
+    
+    async def post(self, request, token):
+        upload = load_upload_token(token)
+        if upload is None:
+            return Response({'error': 'Lien d\'envoi invalide ou expiré.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        file = request.FILES.get('file')
+        if file is None or request.data.get('Content-Type') != upload['type']:
+            return Response({'error': 'Fichier manquant ou type incorrect.'}, status=status.HTTP_400_BAD_REQUEST)
+        if file.size > get_limits()['MAX_FILE_SIZE']:
+            return Response({'error': 'Fichier trop volumineux.'}, status=status.HTTP_400_BAD_REQUEST)
+        if await sync_to_async(default_storage.exists)(upload['key']):
+            return Response({'error': 'Fichier déjà envoyé.'}, status=status.HTTP_409_CONFLICT)
+        
+        await sync_to_async(default_storage.save)(upload['key'], file)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @extend_schema(tags=['Messages'])
-class ContactMessagesViewSet(viewsets.ReadOnlyModelViewSet):
-    """ViewSet for viewing contact messages received."""
+class ContactMessagesViewSet(KeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
+    """ViewSet for viewing contact messages received. `?pagination=cursor` switches to keyset pagination."""
     
     serializer_class = AdContactSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['-created_at']
     
     def get_queryset(self):
         # Get messages for ads owned by current user
-        return AdContact.objects.filter(ad__user=self.request.user)
+        return AdContact.objects.filter(ad__user=self.request.user).select_related('ad', 'sender')
     
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
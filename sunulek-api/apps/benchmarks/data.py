@@ -0,0 +1,279 @@
+"""
+Synthetic data for the benchmarks.
+
+Generates users, ads with images, favorites, conversations and messages
+with bulk_create in batches, then rebuilds the derived data the API reads
+(location matches, category counts, unread counters, last-message
+snapshots). The full-text index follows by itself (triggers on SQLite,
+generated column on PostgreSQL). Output is deterministic for a given seed.
+"""
+
+import io
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+from PIL import Image
+
+from apps.locations.data import REGIONS as LOCATIONS
+
+DEFAULT_VOLUMES = {
+    'users': 5000,
+    'ads': 100_000,
+    'favorites': 200_000,
+    'conversations': 50_000,
+    'messages': 1_000_000,
+}
+
+EMAIL_DOMAIN = 'bench.sunulek.test'
+PASSWORD = 'benchmark'
+PLACEHOLDER_IMAGE = 'benchmarks/placeholder.jpg'
+
+CATEGORIES = {
+    'vehicules': ('Véhicules', ['Toyota Corolla', 'Peugeot 206', 'Hyundai Tucson', 'Moto Jakarta', 'Renault Clio']),
+    'immobilier': ('Immobilier', ['Appartement F3', 'Studio meublé', 'Terrain 300 m²', 'Villa R+1', 'Chambre à louer']),
+    'electronique': ('Électronique', ['iPhone 13', 'Samsung Galaxy A54', 'Ordinateur HP', 'Télévision LG', 'PlayStation 5']),
+    'mode': ('Mode', ['Boubou brodé', 'Chaussures Nike', 'Sac à main', 'Montre Casio', 'Tissu wax']),
+    'maison': ('Maison', ['Réfrigérateur', 'Canapé 3 places', 'Climatiseur', 'Lit 2 places', 'Cuisinière']),
+    'emploi': ('Emploi', ['Chauffeur', 'Femme de ménage', 'Développeur web', 'Comptable', 'Vendeur']),
+}
+
+# Region -> (weight, departments)
+REGIONS = {
+    'Dakar': (50, ['Dakar', 'Pikine', 'Guédiawaye', 'Rufisque', 'Keur Massar']),
+    'Thiès': (12, ['Thiès', 'Mbour', 'Tivaouane']),
+    'Diourbel': (6, ['Diourbel', 'Bambey', 'Mbacké']),
+    'Saint-Louis': (6, ['Saint-Louis', 'Dagana', 'Podor']),
+    'Kaolack': (5, ['Kaolack', 'Guinguinéo', 'Nioro du Rip']),
+    'Ziguinchor': (5, ['Ziguinchor', 'Bignona', 'Oussouye']),
+    'Louga': (4, ['Louga', 'Kébémer', 'Linguère']),
+    'Fatick': (3, ['Fatick', 'Foundiougne', 'Gossas']),
+    'Tambacounda': (3, ['Tambacounda', 'Bakel', 'Goudiry', 'Koumpentoum']),
+    'Kolda': (2, ['Kolda', 'Médina Yoro Foulah', 'Vélingara']),
+    'Matam': (2, ['Matam', 'Kanel', 'Ranérou']),
+    'Kaffrine': (1, ['Kaffrine', 'Birkelane', 'Koungheul', 'Malem-Hodar']),
+    'Kédougou': (1, ['Kédougou', 'Salémata', 'Saraya']),
+}
+
+# Department -> reference neighborhoods, drawn for 70 % of the ads that have some
+NEIGHBORHOODS = {
+    department: [neighborhood[0] for neighborhood in neighborhoods]
+    for *_, departments in LOCATIONS
+    for department, _, _, neighborhoods in departments
+}
+
+STATUS_WEIGHTS = {'active': 85, 'pending': 5, 'sold': 5, 'expired': 5}
+
+MESSAGES = [
+    'Bonjour, est-ce toujours disponible ?',
+    'Quel est votre dernier prix ?',
+    'Je suis intéressé, on peut se voir demain ?',
+    'Oui, toujours disponible.',
+    'Le prix est négociable.',
+    'Vous êtes situé où exactement ?',
+    "D'accord, je vous appelle ce soir.",
+]
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the generated created_at values instead of now()."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def placeholder_image():
+    """Store one small JPEG shared by every generated AdImage."""
+    if not default_storage.exists(PLACEHOLDER_IMAGE):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), (200, 120, 60)).save(buffer, 'JPEG', quality=80)
+        default_storage.save(PLACEHOLDER_IMAGE, ContentFile(buffer.getvalue()))
+    return PLACEHOLDER_IMAGE
+
+
+def seed(volumes=None, seed=42, batch_size=5000, log=print):
+    """Insert the benchmark data set. Returns the number of rows created per model."""
+    from apps.annonces.models import Ad, AdImage
+    from apps.categories import counts
+    from apps.categories.models import Category
+    from apps.favorites.models import Favorite
+    from apps.locations.matching import get_index, match_ads
+    from apps.messages.models import Conversation, Message
+    from apps.users.models import User
+    
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    rng = random.Random(seed)
+    now = timezone.now()
+    created = {}
+    
+    def insert(model, objects, fields=()):
+        total = 0
+        with explicit_timestamps(*(model._meta.get_field(name) for name in fields)):
+            for batch in batched(objects, batch_size):
+                with transaction.atomic():
+                    model.objects.bulk_create(batch)
+                total += len(batch)
+        created[model.__name__] = total
+        log(f'{model.__name__} : {total}')
+    
+    categories = []
+    for slug, (name, _) in CATEGORIES.items():
+        category, _ = Category.objects.get_or_create(slug=slug, defaults={'name': name})
+        categories.append(category)
+    
+    password = make_password(PASSWORD)
+    first_user = (User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+    insert(User, (
+        User(
+            email=f'user{first_user + i}@{EMAIL_DOMAIN}',
+            username=f'bench{first_user + i}',
+            first_name='Bench',
+            last_name=str(first_user + i),
+            password=password,
+            is_email_verified=True,
+        )
+        for i in range(volumes['users'])
+    ))
+    user_ids = list(User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').values_list('pk', flat=True))
+    
+    regions = list(REGIONS)
+    region_weights = [REGIONS[region][0] for region in regions]
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    # Own generator, so the other columns stay the same as without neighborhoods
+    places = random.Random(f'{seed}:neighborhoods')
+    
+    def neighborhood(department):
+        choices = NEIGHBORHOODS.get(department)
+        return places.choice(choices) if choices and places.random() < 0.7 else ''
+    
+    def ads():
+        for i in range(volumes['ads']):
+            category = rng.choice(categories)
+            region = rng.choices(regions, region_weights)[0]
+            title = f'{rng.choice(CATEGORIES[category.slug][1])} {rng.randint(1, 999)}'
+            created_at = now - timedelta(seconds=rng.randint(0, 90 * 86400))
+            status = rng.choices(statuses, status_weights)[0]
+            yield Ad(
+                title=title,
+                slug=f'bench-{seed}-{i}',
+                description=f'{title} en bon état, visible à {region}. Contactez-moi pour plus de détails.',
+                # Log-uniform between 1 000 and 50 000 000 FCFA
+                price=Decimal(round(10 ** rng.uniform(3, 7.7), -2)),
+                user_id=rng.choice(user_ids),
+                category=category,
+                region=region,
+                department=(department := rng.choice(REGIONS[region][1])),
+                neighborhood=neighborhood(department),
+                status=status,
+                is_featured=rng.random() < 0.02,
+                views_count=int(rng.paretovariate(1.2) * 10),
+                created_at=created_at,
+                published_at=created_at,
+                expires_at=created_at + timedelta(days=60) if status == 'active' else None,
+                deleted_at=now if rng.random() < 0.02 else None,
+            )
+    
+    insert(Ad, ads(), fields=['created_at'])
+    # bulk_create skips the pre_save signal that links ads to reference locations
+    match_ads(Ad.objects.filter(slug__startswith=f'bench-{seed}-'), get_index(), batch_size)
+    ads_by_id = dict(
+        Ad.objects.filter(slug__startswith=f'bench-{seed}-').values_list('pk', 'user_id')
+    )
+    ad_ids = list(ads_by_id)
+    
+    image = placeholder_image()
+    insert(AdImage, (
+        AdImage(ad_id=ad_id, image=image, is_primary=(order == 0), order=order)
+        for ad_id in ad_ids
+        for order in range(rng.randint(1, 4))
+    ))
+    
+    def unique_pairs(count, make_pair):
+        seen = set()
+        while len(seen) < count:
+            pair = make_pair()
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+    
+    insert(Favorite, (
+        Favorite(user_id=user_id, ad_id=ad_id)
+        for user_id, ad_id in unique_pairs(
+            min(volumes['favorites'], len(user_ids) * len(ad_ids) // 2),
+            lambda: (rng.choice(user_ids), rng.choice(ad_ids)),
+        )
+    ))
+    
+    def conversation_pair():
+        ad_id = rng.choice(ad_ids)
+        initiator = rng.choice(user_ids)
+        return (ad_id, initiator if initiator != ads_by_id[ad_id] else rng.choice(user_ids))
+    
+    pairs = [
+        pair for pair in unique_pairs(min(volumes['conversations'], len(ad_ids) * 10), conversation_pair)
+        if pair[1] != ads_by_id[pair[0]]
+    ]
+    insert(Conversation, (
+        Conversation(ad_id=ad_id, initiator_id=initiator, recipient_id=ads_by_id[ad_id])
+        for ad_id, initiator in pairs
+    ))
+    conversations = list(
+        Conversation.objects.filter(ad_id__in=ad_ids).values_list('pk', 'initiator_id', 'recipient_id')
+    )
+    
+    def messages():
+        for i in range(volumes['messages']):
+            conversation_id, initiator, recipient = rng.choice(conversations)
+            created_at = now - timedelta(seconds=rng.randint(0, 60 * 86400))
+            yield Message(
+                conversation_id=conversation_id,
+                sender_id=rng.choice((initiator, recipient)),
+                content=rng.choice(MESSAGES),
+                # Recent messages are more likely to be unread
+                is_read=created_at < now - timedelta(days=2) or rng.random() < 0.5,
+                created_at=created_at,
+            )
+    
+    if conversations:
+        insert(Message, messages(), fields=['created_at'])
+    
+    log('Données dérivées...')
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+    Conversation.objects.filter(pk__in=[row[0] for row in conversations]).update(
+        last_message=Subquery(latest.values('pk')[:1]),
+        # Conversations that drew no message keep an empty preview
+        last_message_content=Coalesce(
+            Subquery(latest.annotate(preview=Substr('content', 1, 100)).values('preview')[:1]), Value(''),
+        ),
+        last_message_sender=Subquery(latest.values('sender')[:1]),
+        last_message_at=Subquery(latest.values('created_at')[:1]),
+    )
+    call_command('rebuild_unread_counts', verbosity=0)
+    counts.rebuild()
+    return created
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.runner import DEFAULT_THRESHOLD, compare, run
+from apps.benchmarks.scenarios import SCENARIOS, get_scenarios
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence et le nombre de requêtes SQL des parcours principaux de l\'API.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help=f"Scénario à exécuter, répétable (défaut : tous). Choix : {', '.join(s.name for s in SCENARIOS)}.",
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Requêtes mesurées par scénario.')
+        parser.add_argument('--warmup', type=int, default=10, help='Requêtes non mesurées avant chaque scénario.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Nombre de threads clients.')
+        parser.add_argument('--seed', type=int, default=42, help='Graine du tirage des requêtes.')
+        parser.add_argument('--no-cache', action='store_true', help='Désactive le cache (DummyCache).')
+        parser.add_argument(
+            '--conn-max-age', type=int,
+            help='CONN_MAX_AGE de cette exécution, en secondes (0 : une connexion par requête ; défaut : réglages).',
+        )
+        parser.add_argument('--output', help='Fichier JSON des résultats (défaut : benchmarks/<commit>.json).')
+        parser.add_argument('--compare', help='Résultats de référence à comparer.')
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help='Hausse relative du p95 signalée comme régression (défaut : 0.10).',
+        )
+        parser.add_argument('--check', action='store_true', help='Code de sortie 1 en cas de régression.')
+    
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--iterations et --concurrency doivent être positifs.')
+        try:
+            scenarios = get_scenarios(options['scenarios'])
+            results = run(
+                scenarios,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                concurrency=options['concurrency'],
+                seed=options['seed'],
+                use_cache=not options['no_cache'],
+                max_age=options['conn_max_age'],
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / f"{results['meta']['commit'] or 'results'}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f'Résultats : {output}')
+        
+        if options['compare']:
+            self.compare(results, options)
+    
+    def compare(self, results, options):
+        try:
+            baseline = json.loads(Path(options['compare']).read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Référence illisible : {e}')
+        
+        if baseline['meta'].get('volumes') != results['meta']['volumes']:
+            self.stdout.write(self.style.WARNING('Les volumes de données diffèrent de la référence.'))
+        if baseline['meta'].get('options') != results['meta']['options']:
+            self.stdout.write(self.style.WARNING('Les options d\'exécution diffèrent de la référence.'))
+        
+        rows = compare(baseline, results, options['threshold'])
+        for row in rows:
+            (old_p95, new_p95), (old_queries, new_queries) = row['p95_ms'], row['queries_mean']
+            line = (
+                f"{row['name']:<28} p95 {old_p95:>8.2f} -> {new_p95:>8.2f} ms ({row['p95_change']:+.1%})  "
+                f"SQL {old_queries} -> {new_queries}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+        
+        regressions = [row for row in rows if row['regression']]
+        if regressions and options['check']:
+            raise CommandError(f'{len(regressions)} régression(s) par rapport à {options["compare"]}.')
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} scénario(s) comparé(s), {len(regressions)} régression(s).'))
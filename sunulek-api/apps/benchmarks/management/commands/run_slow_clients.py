@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.slowclients import run
+
+
+class Command(BaseCommand):
+    help = 'Mesure la latence d\'un serveur lancé à part pendant que des clients lents occupent ses connexions.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Serveur testé (défaut : http://127.0.0.1:8000).')
+        parser.add_argument('--slow', type=int, default=50, help='Nombre de clients lents.')
+        parser.add_argument('--probes', type=int, default=10, help='Nombre de clients rapides mesurés.')
+        parser.add_argument('--duration', type=float, default=20.0, help='Durée du test, en secondes.')
+        parser.add_argument('--chunk', type=int, default=16, help='Octets envoyés à chaque envoi d\'un client lent.')
+        parser.add_argument('--interval', type=float, default=0.5, help='Secondes entre deux envois d\'un client lent.')
+        parser.add_argument('--probe-path', default='/api/v1/categories/', help='Chemin demandé par les clients rapides.')
+        parser.add_argument('--output', help='Fichier JSON des résultats.')
+    
+    def handle(self, *args, **options):
+        if options['probes'] < 1 or options['slow'] < 0 or options['duration'] <= 0:
+            raise CommandError('--probes et --duration doivent être positifs, --slow ne peut être négatif.')
+        result = run(
+            options['url'],
+            slow=options['slow'],
+            probes=options['probes'],
+            duration=options['duration'],
+            chunk=options['chunk'],
+            interval=options['interval'],
+            probe_path=options['probe_path'],
+        )
+        
+        self.stdout.write(
+            f"{result['slow_clients']} client(s) lent(s), {result['probes']} rapide(s) : "
+            f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+            f"{result['throughput_rps']} req/s  {result['errors']} erreur(s)"
+        )
+        self.stdout.write(f"Clients lents : {result['slow_statuses']}")
+        
+        if options['output']:
+            output = Path(options['output'])
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(json.dumps({'url': options['url'], **result}, indent=2))
+            self.stdout.write(f'Résultats : {output}')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.annonces.models import Ad
+from apps.benchmarks.data import DEFAULT_VOLUMES, seed
+
+
+class Command(BaseCommand):
+    help = 'Remplit la base avec un jeu de données synthétique et reproductible pour les benchmarks.'
+    
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=default, help=f'Nombre de lignes (défaut : {default}).')
+        parser.add_argument('--seed', type=int, default=42, help='Graine du générateur (défaut : 42).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Lignes par insertion (défaut : 5000).')
+        parser.add_argument('--force', action='store_true', help='Ajoute les données même si la base contient déjà des annonces.')
+    
+    def handle(self, *args, **options):
+        if Ad.objects.exists() and not options['force']:
+            raise CommandError(
+                'La base contient déjà des annonces. Utilisez une base dédiée aux benchmarks ou --force.'
+            )
+        volumes = {name: options[name] for name in DEFAULT_VOLUMES}
+        seed(volumes, seed=options['seed'], batch_size=options['batch_size'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS('Données de benchmark créées.'))
@@ -0,0 +1,259 @@
+"""
+Benchmark runner.
+
+Sends every scenario's requests through the full Django stack (middleware,
+JWT authentication, views, serializers) with the test client, and records
+the latency and number of SQL queries of each request. Results are plain
+JSON so two runs, e.g. before and after a commit, can be compared.
+"""
+
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .scenarios import Fixtures
+
+# Relative growth of p95 latency reported as a regression by compare()
+DEFAULT_THRESHOLD = 0.10
+
+
+class TokenCache:
+    """One JWT access token per user, created on first use."""
+    
+    def __init__(self):
+        self.tokens = {}
+    
+    def headers(self, user):
+        if user is None:
+            return {}
+        if user.pk not in self.tokens:
+            self.tokens[user.pk] = str(RefreshToken.for_user(user).access_token)
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.tokens[user.pk]}'}
+
+
+def send(client, tokens, request, rollback):
+    method = getattr(client, request.method.lower())
+    headers = tokens.headers(request.user)
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        if rollback:
+            with transaction.atomic():
+                response = method(request.path, request.data, **headers)
+                transaction.set_rollback(True)
+        else:
+            response = method(request.path, request.data, **headers)
+        elapsed = time.perf_counter() - start
+    # What request_finished does, and the test client skips: connections
+    # older than CONN_MAX_AGE are closed, so the next request pays for a new one
+    close_old_connections()
+    return elapsed, len(queries), response.status_code
+
+
+def run_worker(scenario, fixtures, tokens, iterations, seed, worker):
+    rng = random.Random(f'{seed}:{scenario.name}:{worker}')
+    # Server errors are counted, not raised
+    client = Client(raise_request_exception=False)
+    return [
+        send(client, tokens, scenario.build(fixtures, rng), scenario.writes)
+        for _ in range(iterations)
+    ]
+
+
+def run_thread(*args):
+    try:
+        return run_worker(*args)
+    finally:
+        # Each thread opened its own connections
+        connections.close_all()
+
+
+def percentile(cuts, p):
+    return cuts[p - 1] if cuts else None
+
+
+def summarize(samples, wall_time, concurrency):
+    durations = [sample[0] * 1000 for sample in samples]
+    queries = [sample[1] for sample in samples]
+    statuses = {}
+    for _, _, code in samples:
+        statuses[str(code)] = statuses.get(str(code), 0) + 1
+    cuts = statistics.quantiles(durations, n=100, method='inclusive') if len(durations) > 1 else durations * 99
+    return {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'errors': sum(1 for sample in samples if sample[2] >= 400),
+        'statuses': statuses,
+        'p50_ms': round(percentile(cuts, 50), 2),
+        'p95_ms': round(percentile(cuts, 95), 2),
+        'p99_ms': round(percentile(cuts, 99), 2),
+        'mean_ms': round(statistics.fmean(durations), 2),
+        'max_ms': round(max(durations), 2),
+        'throughput_rps': round(len(samples) / wall_time, 1) if wall_time else None,
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+    }
+
+
+def run_scenario(scenario, fixtures, tokens, iterations, warmup, concurrency, seed):
+    run_worker(scenario, fixtures, tokens, warmup, seed, 'warmup')
+    
+    if scenario.writes and connection.vendor == 'sqlite':
+        # SQLite allows a single writer: concurrent writes only measure lock waits
+        concurrency = 1
+    # Split the iterations across the workers
+    shares = [iterations // concurrency + (i < iterations % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    if concurrency == 1:
+        samples = run_worker(scenario, fixtures, tokens, iterations, seed, 0)
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            futures = [
+                pool.submit(run_thread, scenario, fixtures, tokens, share, seed, worker)
+                for worker, share in enumerate(shares)
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+    return summarize(samples, time.perf_counter() - start, concurrency)
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(
+            ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    
+    try:
+        return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def data_volumes():
+    from apps.annonces.models import Ad, AdImage
+    from apps.favorites.models import Favorite
+    from apps.messages.models import Conversation, Message
+    from apps.users.models import User
+    
+    return {
+        model.__name__: model.objects.count()
+        for model in (User, Ad, AdImage, Favorite, Conversation, Message)
+    }
+
+
+@contextmanager
+def conn_max_age(seconds):
+    """Give every database alias a CONN_MAX_AGE of `seconds` (None: leave settings as they are)."""
+    if seconds is None:
+        yield
+        return
+    previous = {alias: connections.settings[alias].get('CONN_MAX_AGE', 0) for alias in connections}
+    connections.close_all()
+    for alias in connections:
+        connections.settings[alias]['CONN_MAX_AGE'] = seconds
+    try:
+        yield
+    finally:
+        connections.close_all()
+        for alias, value in previous.items():
+            connections.settings[alias]['CONN_MAX_AGE'] = value
+
+
+def run(scenarios, iterations=200, warmup=10, concurrency=1, seed=42, use_cache=True, max_age=None, log=print):
+    """
+    Run `scenarios` and return the results document.
+    
+    `max_age` overrides CONN_MAX_AGE for the run, to compare persistent
+    connections with one connection per request.
+    """
+    fixtures = Fixtures()
+    missing = fixtures.check()
+    if missing:
+        raise ValueError(f"Données manquantes : {', '.join(missing)} (lancez seed_benchmark_data).")
+    
+    overrides = {
+        'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+        # The scenarios repeat the same users' writes far beyond the limits
+        'THROTTLING': {**getattr(settings, 'THROTTLING', {}), 'ENABLED': False},
+        # Background work is not part of the request
+        'TASKS': {**getattr(settings, 'TASKS', {}), 'ALWAYS_SYNC': False},
+        # Uploaded files are written to a throwaway directory
+        'MEDIA_ROOT': tempfile.mkdtemp(prefix='sunulek-bench-'),
+    }
+    if not use_cache:
+        overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    
+    tokens = TokenCache()
+    results = {}
+    try:
+        with override_settings(**overrides), conn_max_age(max_age):
+            for scenario in scenarios:
+                results[scenario.name] = run_scenario(
+                    scenario, fixtures, tokens, iterations, warmup, concurrency, seed,
+                )
+                log(format_row(scenario.name, results[scenario.name]))
+    finally:
+        shutil.rmtree(overrides['MEDIA_ROOT'], ignore_errors=True)
+    
+    return {
+        'meta': {
+            'date': timezone.now().isoformat(),
+            **git_revision(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'volumes': data_volumes(),
+            'options': {
+                'iterations': iterations,
+                'warmup': warmup,
+                'concurrency': concurrency,
+                'seed': seed,
+                'cache': use_cache,
+                'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE', 0) if max_age is None else max_age,
+            },
+        },
+        'scenarios': results,
+    }
+
+
+def format_row(name, result):
+    return (
+        f"{name:<28} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  {result['throughput_rps']:>7} req/s  "
+        f"{result['queries_mean']:>5} req SQL  {result['errors']} erreur(s)"
+    )
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two results documents scenario by scenario.
+    
+    A scenario regresses when its p95 grows by more than `threshold`, or when
+    it issues more queries per request on average.
+    """
+    rows = []
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        change = (new['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0
+        rows.append({
+            'name': name,
+            'p95_ms': (old['p95_ms'], new['p95_ms']),
+            'p95_change': round(change, 3),
+            'queries_mean': (old['queries_mean'], new['queries_mean']),
+            'regression': change > threshold or new['queries_mean'] > old['queries_mean'],
+        })
+    return rows
@@ -0,0 +1,151 @@
+"""
+Benchmark scenarios.
+
+A scenario builds the next request to send: `build(fixtures, rng)` returns
+a Request whose path and parameters are drawn from the seeded data, so runs
+with the same seed issue the same requests. Scenarios flagged `writes`
+mutate the database; the runner rolls each of their requests back.
+"""
+
+import io
+from collections import namedtuple
+
+from PIL import Image
+
+Request = namedtuple('Request', ['method', 'path', 'data', 'user'], defaults=[None, None])
+Scenario = namedtuple('Scenario', ['name', 'build', 'writes'], defaults=[False])
+
+API = '/api/v1'
+
+SEARCH_TERMS = ['toyota', 'appartement', 'iphone', 'terrain', 'climatiseur', 'chauffeur', 'villa', 'samsung']
+PRICE_RANGES = ['0-10000', '10000-50000', '50000-100000', '100000-500000', '500000-1000000', '1000000-5000000']
+
+
+class Fixtures:
+    """Ids, slugs and users sampled once from the benchmark database."""
+    
+    def __init__(self, sample_size=500):
+        from apps.annonces.models import Ad
+        from apps.categories.models import Category
+        from apps.locations.models import Department, Neighborhood
+        from apps.messages.models import Conversation
+        from apps.users.models import User
+        
+        public = Ad.objects.public().order_by('?')
+        self.ads = list(public.values_list('pk', 'slug')[:sample_size])
+        self.categories = list(Category.objects.values_list('slug', flat=True))
+        self.locations = list(
+            public.values_list('region', 'department').distinct().order_by('region', 'department')
+        )
+        self.points = [
+            *Department.objects.values_list('latitude', 'longitude'),
+            *Neighborhood.objects.values_list('latitude', 'longitude'),
+        ]
+        
+        # Users with the busiest inboxes, and users with no conversation at all
+        active = list(
+            Conversation.objects.values_list('initiator_id', flat=True)
+            .order_by('initiator_id').distinct()[:sample_size]
+        )
+        self.inbox_users = list(User.objects.filter(pk__in=active))
+        self.users = list(User.objects.filter(is_active=True).order_by('?')[:sample_size])
+        
+        image = io.BytesIO()
+        Image.new('RGB', (1200, 900), (40, 110, 170)).save(image, 'JPEG', quality=85)
+        self.image = image.getvalue()
+    
+    def check(self):
+        """Names of the missing pieces of data, empty when every scenario can run."""
+        missing = []
+        for name in ('ads', 'categories', 'inbox_users', 'users'):
+            if not getattr(self, name):
+                missing.append(name)
+        return missing
+
+
+def ads_list(fixtures, rng):
+    return Request('GET', f'{API}/annonces/?page={rng.randint(1, 5)}')
+
+
+def ads_filtered(fixtures, rng):
+    region, department = rng.choice(fixtures.locations)
+    params = rng.choice([
+        f'category={rng.choice(fixtures.categories)}',
+        f'region={region}',
+        f'region={region}&department={department}',
+        f'category={rng.choice(fixtures.categories)}&price_range={rng.choice(PRICE_RANGES)}',
+        f'category={rng.choice(fixtures.categories)}&ordering=price',
+    ])
+    return Request('GET', f'{API}/annonces/?{params}')
+
+
+def ads_search(fixtures, rng):
+    return Request('GET', f'{API}/annonces/?search={rng.choice(SEARCH_TERMS)}')
+
+
+def ads_nearby(fixtures, rng):
+    latitude, longitude = rng.choice(fixtures.points)
+    # Within a couple of kilometers of a town or neighborhood
+    latitude += rng.uniform(-0.02, 0.02)
+    longitude += rng.uniform(-0.02, 0.02)
+    radius = rng.choice([2, 5, 10, 25])
+    return Request('GET', f'{API}/annonces/?near={latitude:.4f},{longitude:.4f}&radius={radius}')
+
+
+def ad_detail(fixtures, rng):
+    _, slug = rng.choice(fixtures.ads)
+    return Request('GET', f'{API}/annonces/{slug}/')
+
+
+def inbox(fixtures, rng):
+    return Request('GET', f'{API}/conversations/', user=rng.choice(fixtures.inbox_users))
+
+
+def unread_badge(fixtures, rng):
+    return Request('GET', f'{API}/conversations/unread-count/', user=rng.choice(fixtures.inbox_users))
+
+
+def favorite_toggle(fixtures, rng):
+    ad_id, _ = rng.choice(fixtures.ads)
+    return Request('POST', f'{API}/favorites/toggle/', {'ad_id': ad_id}, rng.choice(fixtures.users))
+
+
+def ad_create_with_images(fixtures, rng):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    
+    data = {
+        'title': f'Benchmark {rng.randint(1, 10**6)}',
+        'description': 'Annonce créée par le benchmark.',
+        'price': rng.randint(1, 1000) * 1000,
+        'category': rng.choice(fixtures.categories),
+        'region': 'Dakar',
+        'department': 'Pikine',
+        'images': [
+            SimpleUploadedFile(f'photo{i}.jpg', fixtures.image, content_type='image/jpeg')
+            for i in range(2)
+        ],
+    }
+    return Request('POST', f'{API}/annonces/', data, rng.choice(fixtures.users))
+
+
+SCENARIOS = [
+    Scenario('ads.list', ads_list),
+    Scenario('ads.filtered', ads_filtered),
+    Scenario('ads.search', ads_search),
+    Scenario('ads.nearby', ads_nearby),
+    Scenario('ads.detail', ad_detail),
+    Scenario('conversations.inbox', inbox),
+    Scenario('conversations.unread_badge', unread_badge),
+    Scenario('favorites.toggle', favorite_toggle, writes=True),
+    Scenario('ads.create_with_images', ad_create_with_images, writes=True),
+]
+
+
+def get_scenarios(names=None):
+    if not names:
+        return SCENARIOS
+    selected = [scenario for scenario in SCENARIOS if scenario.name in names]
+    unknown = set(names) - {scenario.name for scenario in selected}
+    if unknown:
+        raise ValueError(f"Scénario(s) inconnu(s) : {', '.join(sorted(unknown))}")
+    return selected
@@ -0,0 +1,136 @@
+"""
+Slow-client load test.
+
+Runs against a server started separately (gunicorn WSGI or ASGI), over raw
+sockets: `slow` clients send a request in small chunks spaced by `interval`
+seconds, like phones uploading over a poor mobile link, while `probes`
+fast clients fetch `probe_path` in a loop. The probes' latency and
+throughput show how many requests the server still serves when its
+workers are held by slow clients.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+# Seconds before a probe request is counted as failed
+PROBE_TIMEOUT = 30
+
+
+def build_request(host, method, path, body=b'', headers=None):
+    lines = [
+        f'{method} {path} HTTP/1.1',
+        f'Host: {host}',
+        'Connection: close',
+        *(f'{name}: {value}' for name, value in (headers or {}).items()),
+    ]
+    if body:
+        lines += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+    return '\r\n'.join(lines).encode() + b'\r\n\r\n' + body
+
+
+async def read_status(reader):
+    """Status code of the response, read to the end. 0 if the server closed without answering."""
+    status_line = await reader.readline()
+    await reader.read()
+    try:
+        return int(status_line.split()[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+class SlowClientTest:
+    def __init__(self, url, slow=50, probes=10, duration=20.0, chunk=16, interval=0.5,
+                 probe_path='/api/v1/categories/', slow_path='/api/v1/auth/login/'):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.netloc = parts.netloc
+        self.slow = slow
+        self.probes = probes
+        self.duration = duration
+        self.chunk = chunk
+        self.interval = interval
+        self.probe_request = build_request(self.netloc, 'GET', probe_path)
+        # A login with a body big enough to take `duration` to send
+        body = json.dumps({'email': 'slow@example.com', 'password': 'x' * int(duration / interval * chunk)})
+        self.slow_request = build_request(self.netloc, 'POST', slow_path, body.encode())
+        self.samples = []
+        self.slow_statuses = {}
+    
+    async def slow_client(self, deadline):
+        """Trickle the request until it is fully sent, reconnecting until `deadline`."""
+        while time.monotonic() < deadline:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                self.count_slow('refused')
+                await asyncio.sleep(self.interval)
+                continue
+            try:
+                for start in range(0, len(self.slow_request), self.chunk):
+                    writer.write(self.slow_request[start:start + self.chunk])
+                    await writer.drain()
+                    await asyncio.sleep(self.interval)
+                self.count_slow(str(await read_status(reader)))
+            except OSError:
+                self.count_slow('reset')
+            finally:
+                writer.close()
+    
+    def count_slow(self, outcome):
+        self.slow_statuses[outcome] = self.slow_statuses.get(outcome, 0) + 1
+    
+    async def probe(self):
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), PROBE_TIMEOUT,
+            )
+            try:
+                writer.write(self.probe_request)
+                status = await asyncio.wait_for(read_status(reader), PROBE_TIMEOUT)
+            finally:
+                writer.close()
+        except (OSError, asyncio.TimeoutError):
+            status = 0
+        self.samples.append((time.perf_counter() - start, status))
+    
+    async def probe_client(self, start_at, deadline):
+        await asyncio.sleep(max(start_at - time.monotonic(), 0))
+        while time.monotonic() < deadline:
+            await self.probe()
+    
+    async def run(self):
+        now = time.monotonic()
+        # Probes start once the slow clients have connected
+        probes_start = now + min(self.interval * 2, self.duration / 4)
+        deadline = now + self.duration
+        await asyncio.gather(
+            *(self.slow_client(deadline) for _ in range(self.slow)),
+            *(self.probe_client(probes_start, deadline) for _ in range(self.probes)),
+        )
+        return self.summarize(deadline - probes_start)
+    
+    def summarize(self, wall_time):
+        ok = [duration * 1000 for duration, status in self.samples if 200 <= status < 400]
+        cuts = statistics.quantiles(ok, n=100, method='inclusive') if len(ok) > 1 else ok * 99
+        return {
+            'slow_clients': self.slow,
+            'probes': self.probes,
+            'requests': len(self.samples),
+            'errors': len(self.samples) - len(ok),
+            'p50_ms': round(cuts[49], 2) if cuts else None,
+            'p95_ms': round(cuts[94], 2) if cuts else None,
+            'p99_ms': round(cuts[98], 2) if cuts else None,
+            'max_ms': round(max(ok), 2) if ok else None,
+            'throughput_rps': round(len(ok) / wall_time, 1),
+            'slow_statuses': self.slow_statuses,
+        }
+
+
+def run(url, **options):
+    """Run the test against `url` and return its summary."""
+    return asyncio.run(SlowClientTest(url, **options).run())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category
+from .models import Category, CategoryAdCount
 
 
 @admin.register(Category)
@@ -9,3 +9,11 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
     ordering = ('order', 'name')
+
+
+@admin.register(CategoryAdCount)
+class CategoryAdCountAdmin(admin.ModelAdmin):
+    list_display = ('category', 'region', 'count')
+    list_filter = ('category', 'region')
+    search_fields = ('category__name', 'region__name')
+    readonly_fields = ('category', 'region', 'count')
@@ -0,0 +1,112 @@
+"""
+Precomputed number of public ads per category and per category + region.
+
+An ad is counted under (category, region) while it is public (see
+AdQuerySet.public()), the region being its reference region
+(location_region), the key of the `region` filter and facet. Ads whose
+location matched no region are only in the category total. The ad signals move it between keys on every save and
+delete; code that changes ads with queryset.update() must call apply_deltas()
+itself. `manage.py rebuild_category_counts` checks and rebuilds the table.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import CategoryAdCount
+
+# Region of the per-category total row
+TOTAL = None
+
+# Ad columns that decide where (and whether) an ad is counted
+COUNT_FIELDS = frozenset({'category_id', 'location_region_id', 'status', 'is_active', 'deleted_at'})
+
+
+def count_key(ad):
+    """(category_id, region_id) the ad is counted under, or None if it is not public."""
+    if ad.category_id is None or not (ad.is_active and ad.status == 'active' and ad.deleted_at is None):
+        return None
+    return (ad.category_id, ad.location_region_id)
+
+
+def sort_key(key):
+    # Totals (region None) first
+    category_id, region_id = key
+    return (category_id, region_id or 0)
+
+
+def deltas_for(old_key, new_key):
+    """Counter changes for an ad moving from `old_key` to `new_key`."""
+    deltas = Counter()
+    if old_key == new_key:
+        return deltas
+    for key, sign in ((old_key, -1), (new_key, 1)):
+        if key is not None:
+            category_id, region_id = key
+            if region_id is not TOTAL:
+                deltas[key] += sign
+            deltas[(category_id, TOTAL)] += sign
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add `deltas` ({(category_id, region_id): delta}) to the stored counts."""
+    # Sorted so concurrent transactions lock rows in the same order
+    changes = sorted(((key, delta) for key, delta in deltas.items() if delta), key=lambda change: sort_key(change[0]))
+    if not changes:
+        return
+    with transaction.atomic():
+        for (category_id, region_id), delta in changes:
+            updated = CategoryAdCount.objects.filter(
+                category_id=category_id, region_id=region_id
+            ).update(count=F('count') + delta)
+            if not updated:
+                _, created = CategoryAdCount.objects.get_or_create(
+                    category_id=category_id, region_id=region_id, defaults={'count': delta}
+                )
+                if not created:
+                    CategoryAdCount.objects.filter(
+                        category_id=category_id, region_id=region_id
+                    ).update(count=F('count') + delta)
+
+
+def expected_counts():
+    """Counts computed from the ads table, as {(category_id, region_id): count}."""
+    from apps.annonces.models import Ad
+    
+    rows = Ad.objects.public().filter(category__isnull=False).order_by().values(
+        'category_id', 'location_region_id'
+    ).annotate(total=Count('pk'))
+    counts = Counter()
+    for row in rows:
+        if row['location_region_id'] is not TOTAL:
+            counts[(row['category_id'], row['location_region_id'])] += row['total']
+        counts[(row['category_id'], TOTAL)] += row['total']
+    return counts
+
+
+def find_mismatches():
+    """[(category_id, region_id, stored, expected)] for every key where the table is wrong."""
+    expected = expected_counts()
+    stored = {
+        (row.category_id, row.region_id): row.count
+        for row in CategoryAdCount.objects.all()
+    }
+    return [
+        (category_id, region_id, stored.get((category_id, region_id), 0), expected.get((category_id, region_id), 0))
+        for category_id, region_id in sorted(set(expected) | set(stored), key=sort_key)
+        if stored.get((category_id, region_id), 0) != expected.get((category_id, region_id), 0)
+    ]
+
+
+def rebuild():
+    """Replace the table with counts computed from the ads. Returns the number of rows."""
+    rows = [
+        CategoryAdCount(category_id=category_id, region_id=region_id, count=count)
+        for (category_id, region_id), count in expected_counts().items()
+    ]
+    with transaction.atomic():
+        CategoryAdCount.objects.all().delete()
+        CategoryAdCount.objects.bulk_create(rows)
+    return len(rows)
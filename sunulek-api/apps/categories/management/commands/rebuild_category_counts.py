@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.categories import counts
+
+
+class Command(BaseCommand):
+    help = 'Vérifie ou recalcule les compteurs d\'annonces par catégorie et par région.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Signale les compteurs faux sans les corriger (code de sortie 1 si incohérence).',
+        )
+    
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = counts.find_mismatches()
+            for category_id, region_id, stored, expected in mismatches:
+                self.stdout.write(
+                    f'Catégorie {category_id} / région {region_id or "total"} : {stored} enregistré(s), {expected} attendu(s)'
+                )
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} compteur(s) incohérent(s).')
+            self.stdout.write(self.style.SUCCESS('Compteurs cohérents.'))
+            return
+        
+        rows = counts.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{rows} compteur(s) recalculé(s).'))
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_category_counts(apps, schema_editor):
+    Ad = apps.get_model('annonces', 'Ad')
+    CategoryAdCount = apps.get_model('categories', 'CategoryAdCount')
+
+    rows = Ad.objects.filter(
+        is_active=True, status='active', deleted_at__isnull=True, category__isnull=False
+    ).order_by().values('category_id', 'region').annotate(total=Count('pk'))
+    counts = Counter()
+    for row in rows:
+        counts[(row['category_id'], row['region'])] += row['total']
+        counts[(row['category_id'], '')] += row['total']
+    CategoryAdCount.objects.bulk_create([
+        CategoryAdCount(category_id=category_id, region=region, count=count)
+        for (category_id, region), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        ("annonces", "0007_ad_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryAdCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "region",
+                    models.CharField(blank=True, max_length=100, verbose_name="Région"),
+                ),
+                (
+                    "count",
+                    models.IntegerField(default=0, verbose_name="Nombre d'annonces"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ad_counts",
+                        to="categories.category",
+                        verbose_name="Catégorie",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Compteur d'annonces",
+                "verbose_name_plural": "Compteurs d'annonces",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("category", "region"),
+                        name="unique_category_region_count",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_category_counts, migrations.RunPython.noop),
+    ]
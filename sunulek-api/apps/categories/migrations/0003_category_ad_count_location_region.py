@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:26
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def delete_text_counts(apps, schema_editor):
+    # Keyed on the typed region text: counted again below
+    apps.get_model('categories', 'CategoryAdCount').objects.all().delete()
+
+
+def recount_by_location_region(apps, schema_editor):
+    Ad = apps.get_model('annonces', 'Ad')
+    CategoryAdCount = apps.get_model('categories', 'CategoryAdCount')
+
+    rows = Ad.objects.filter(
+        is_active=True, status='active', deleted_at__isnull=True, category__isnull=False
+    ).order_by().values('category_id', 'location_region_id').annotate(total=Count('pk'))
+    counts = Counter()
+    for row in rows:
+        if row['location_region_id'] is not None:
+            counts[(row['category_id'], row['location_region_id'])] += row['total']
+        counts[(row['category_id'], None)] += row['total']
+    CategoryAdCount.objects.bulk_create([
+        CategoryAdCount(category_id=category_id, region_id=region_id, count=count)
+        for (category_id, region_id), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0010_ad_location"),
+        ("categories", "0002_category_ad_counts"),
+        ("locations", "0002_reference_data"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_text_counts, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="categoryadcount",
+            name="unique_category_region_count",
+        ),
+        migrations.RemoveField(
+            model_name="categoryadcount",
+            name="region",
+        ),
+        migrations.AddField(
+            model_name="categoryadcount",
+            name="region",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="category_ad_counts",
+                to="locations.region",
+                verbose_name="Région",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="categoryadcount",
+            constraint=models.UniqueConstraint(
+                fields=("category", "region"), name="unique_category_region_count"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="categoryadcount",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("region__isnull", True)),
+                fields=("category",),
+                name="unique_category_total_count",
+            ),
+        ),
+        migrations.RunPython(recount_by_location_region, migrations.RunPython.noop),
+    ]
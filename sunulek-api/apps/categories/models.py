@@ -1,4 +1,15 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+
+
+class CategoryQuerySet(models.QuerySet):
+    
+    def with_ads_count(self, region_id=None):
+        """Annotate `ads_count` from CategoryAdCount: public ads in the region `region_id`, or in total."""
+        counts = CategoryAdCount.objects.filter(
+            category=models.OuterRef('pk'), region_id=region_id
+        ).values('count')[:1]
+        return self.annotate(ads_count=Coalesce(models.Subquery(counts), 0))
 
 
 class Category(models.Model):
@@ -16,6 +27,8 @@ class Category(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CategoryQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Catégorie'
         verbose_name_plural = 'Catégories'
@@ -23,3 +36,40 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
+
+
+class CategoryAdCount(models.Model):
+    """
+    Number of public ads per category and reference region, kept up to date
+    by the ad signals (see counts.py). The row without region is the category total.
+    """
+    
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='ad_counts',
+        verbose_name='Catégorie'
+    )
+    region = models.ForeignKey(
+        'locations.Region',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='category_ad_counts',
+        verbose_name='Région'
+    )
+    count = models.IntegerField(default=0, verbose_name='Nombre d\'annonces')
+    
+    class Meta:
+        verbose_name = 'Compteur d\'annonces'
+        verbose_name_plural = 'Compteurs d\'annonces'
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'region'], name='unique_category_region_count'),
+            # NULLs are distinct in the constraint above
+            models.UniqueConstraint(
+                fields=['category'], condition=models.Q(region__isnull=True), name='unique_category_total_count',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.category_id} / {self.region_id or 'total'} : {self.count}"
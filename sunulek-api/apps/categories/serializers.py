@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Category
+from .models import Category, CategoryAdCount
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,4 +12,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'icon', 'image', 'ads_count']
     
     def get_ads_count(self, obj):
-        return obj.ads.filter(is_active=True).count()
+        # Annotated by Category.objects.with_ads_count()
+        if hasattr(obj, 'ads_count'):
+            return obj.ads_count
+        row = CategoryAdCount.objects.filter(category=obj, region__isnull=True).first()
+        return row.count if row else 0
@@ -1,25 +1,54 @@
+from django.db.models import Value
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
+from apps.annonces.caching import ADS, CATEGORIES, cache_response
+from apps.annonces.pagination import KeysetPaginationMixin
+from apps.locations.matching import get_index
+from apps.replicas.routing import ReplicaReadMixin
 from .models import Category
 from .serializers import CategorySerializer
 
 
 @extend_schema(tags=['Categories'])
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
-    """ViewSet for viewing categories."""
+class CategoryViewSet(ReplicaReadMixin, KeysetPaginationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for viewing categories, read from a replica when one is configured.
+    
+    `?pagination=cursor` switches `ads` to keyset pagination.
+    """
     
-    queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+    keyset_actions = ['ads']
+    
+    def get_queryset(self):
+        # `?region=` counts the ads of that region only, matched like the ads filter
+        queryset = Category.objects.filter(is_active=True)
+        name = self.request.query_params.get('region')
+        if not name:
+            return queryset.with_ads_count()
+        region = get_index().regions.find(name)
+        if region is None:
+            return queryset.annotate(ads_count=Value(0))
+        return queryset.with_ads_count(region.id)
+    
+    @cache_response(CATEGORIES)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cache_response(CATEGORIES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
     
     @action(detail=True, methods=['get'])
+    @cache_response(ADS)
     def ads(self, request, slug=None):
-        """Get all ads for a specific category."""
+        """Get the ads of a specific category, paginated."""
         category = self.get_object()
         from apps.annonces.serializers import AdListSerializer
-        ads = category.ads.filter(is_active=True)
-        serializer = AdListSerializer(ads, many=True, context={'request': request})
-        return Response(serializer.data)
+        ads = category.ads.public().for_list(request.user).order_by('-created_at')
+        page = self.paginate_queryset(ads)
+        serializer = AdListSerializer(page, many=True, context={'request': request})
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0009_query_shape_indexes"),
+        ("favorites", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="favorites_user_created_idx"
+            ),
+        ),
+    ]
@@ -25,6 +25,10 @@ class Favorite(models.Model):
         verbose_name_plural = 'Favoris'
         ordering = ['-created_at']
         unique_together = ['user', 'ad']  # Prevent duplicate favorites
+        indexes = [
+            # A user's favorites, newest first (list, keyset-ready)
+            models.Index(fields=['user', '-created_at', '-id'], name='favorites_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.ad.title}"
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import Favorite
+from apps.annonces.fastpath import FastRepresentationMixin
 from apps.annonces.serializers import AdListSerializer
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Serializer for favorites."""
     
     ad = AdListSerializer(read_only=True)
@@ -1,20 +1,27 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Prefetch
 from drf_spectacular.utils import extend_schema
+from apps.annonces.pagination import KeysetPaginationMixin
 from .models import Favorite
 from .serializers import FavoriteSerializer
 
 
 @extend_schema(tags=['Favoris'])
-class FavoriteViewSet(viewsets.ModelViewSet):
-    """ViewSet for managing favorites."""
+class FavoriteViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
+    """ViewSet for managing favorites. `?pagination=cursor` switches the list to keyset pagination."""
     
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['-created_at']
+    throttle_scopes = {'toggle': 'favorite_toggle'}
     
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        from apps.annonces.models import Ad
+        return Favorite.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('ad', queryset=Ad.objects.for_list(self.request.user))
+        )
     
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -0,0 +1,23 @@
+from django.contrib import admin
+from .models import Region, Department, Neighborhood
+
+
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'code', 'latitude', 'longitude')
+    search_fields = ('name', 'code')
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    list_display = ('name', 'region', 'code', 'latitude', 'longitude')
+    list_filter = ('region',)
+    search_fields = ('name', 'code')
+    prepopulated_fields = {'code': ('name',)}
+
+
+@admin.register(Neighborhood)
+class NeighborhoodAdmin(admin.ModelAdmin):
+    list_display = ('name', 'department', 'latitude', 'longitude')
+    list_filter = ('department__region',)
+    search_fields = ('name',)
@@ -0,0 +1,156 @@
+"""
+Senegal location reference data, loaded by migration 0002.
+
+Regions carry their ISO 3166-2:SN code. The coordinates of a region or a
+department are those of its chief town, where most of its ads are; those of
+a neighborhood are its approximate center (within about a kilometer).
+"""
+
+# (code, name, latitude, longitude, departments)
+# department: (name, latitude, longitude, neighborhoods)
+# neighborhood: (name, latitude, longitude)
+REGIONS = [
+    ('DK', 'Dakar', 14.6937, -17.4441, [
+        ('Dakar', 14.6937, -17.4441, [
+            ('Plateau', 14.6680, -17.4350),
+            ('Médina', 14.6810, -17.4500),
+            ('Gueule Tapée', 14.6880, -17.4570),
+            ('Fann', 14.6900, -17.4650),
+            ('Point E', 14.6950, -17.4630),
+            ('Grand Dakar', 14.7050, -17.4500),
+            ('HLM', 14.7100, -17.4450),
+            ('Mermoz', 14.7080, -17.4750),
+            ('Sacré-Cœur', 14.7200, -17.4680),
+            ('Dieuppeul', 14.7200, -17.4600),
+            ('Liberté', 14.7220, -17.4550),
+            ('Hann', 14.7200, -17.4300),
+            ('Ouakam', 14.7230, -17.4900),
+            ('Grand Yoff', 14.7350, -17.4550),
+            ('Patte d\'Oie', 14.7450, -17.4400),
+            ('Almadies', 14.7440, -17.5150),
+            ('Ngor', 14.7480, -17.5130),
+            ('Yoff', 14.7550, -17.4700),
+            ('Parcelles Assainies', 14.7600, -17.4350),
+            ('Cambérène', 14.7700, -17.4250),
+        ]),
+        ('Pikine', 14.7646, -17.3907, [
+            ('Thiaroye', 14.7500, -17.3800),
+            ('Guinaw Rails', 14.7500, -17.4000),
+            ('Diamaguène', 14.7550, -17.3900),
+            ('Mbao', 14.7300, -17.3200),
+            ('Yeumbeul', 14.7750, -17.3500),
+        ]),
+        ('Guédiawaye', 14.7769, -17.3950, [
+            ('Golf Sud', 14.7850, -17.4000),
+            ('Sam Notaire', 14.7900, -17.3950),
+            ('Wakhinane', 14.7800, -17.3950),
+        ]),
+        ('Rufisque', 14.7158, -17.2733, [
+            ('Bargny', 14.6950, -17.2250),
+            ('Diamniadio', 14.7200, -17.1833),
+            ('Sébikotane', 14.7456, -17.1367),
+            ('Sangalkam', 14.7833, -17.2167),
+        ]),
+        ('Keur Massar', 14.7833, -17.3167, [
+            ('Malika', 14.7950, -17.3400),
+            ('Jaxaay', 14.7700, -17.2900),
+        ]),
+    ]),
+    ('TH', 'Thiès', 14.7910, -16.9359, [
+        ('Thiès', 14.7910, -16.9359, []),
+        ('Mbour', 14.4198, -16.9611, [
+            ('Saly', 14.4500, -17.0150),
+            ('Ngaparou', 14.4617, -17.0567),
+            ('Somone', 14.4883, -17.0850),
+        ]),
+        ('Tivaouane', 14.9500, -16.8167, []),
+    ]),
+    ('DB', 'Diourbel', 14.6550, -16.2314, [
+        ('Diourbel', 14.6550, -16.2314, []),
+        ('Bambey', 14.7000, -16.4500, []),
+        ('Mbacké', 14.7906, -15.9080, [
+            ('Touba', 14.8500, -15.8833),
+        ]),
+    ]),
+    ('FK', 'Fatick', 14.3390, -16.4111, [
+        ('Fatick', 14.3390, -16.4111, []),
+        ('Foundiougne', 14.1333, -16.4667, []),
+        ('Gossas', 14.4950, -16.0667, []),
+    ]),
+    ('KA', 'Kaffrine', 14.1059, -15.5508, [
+        ('Kaffrine', 14.1059, -15.5508, []),
+        ('Birkelane', 14.1333, -15.7500, []),
+        ('Koungheul', 13.9833, -14.8000, []),
+        ('Malem-Hodar', 14.0833, -15.3000, []),
+    ]),
+    ('KL', 'Kaolack', 14.1652, -16.0758, [
+        ('Kaolack', 14.1652, -16.0758, []),
+        ('Guinguinéo', 14.2667, -15.9500, []),
+        ('Nioro du Rip', 13.7500, -15.8000, []),
+    ]),
+    ('KE', 'Kédougou', 12.5556, -12.1744, [
+        ('Kédougou', 12.5556, -12.1744, []),
+        ('Salémata', 12.6333, -12.8167, []),
+        ('Saraya', 12.8333, -11.7500, []),
+    ]),
+    ('KD', 'Kolda', 12.8939, -14.9414, [
+        ('Kolda', 12.8939, -14.9414, []),
+        ('Médina Yoro Foulah', 13.2928, -14.7150, []),
+        ('Vélingara', 13.1500, -14.1167, []),
+    ]),
+    ('LG', 'Louga', 15.6144, -16.2286, [
+        ('Louga', 15.6144, -16.2286, []),
+        ('Kébémer', 15.3667, -16.4500, []),
+        ('Linguère', 15.3953, -15.1197, []),
+    ]),
+    ('MT', 'Matam', 15.6559, -13.2554, [
+        ('Matam', 15.6559, -13.2554, []),
+        ('Kanel', 15.4917, -13.1764, []),
+        ('Ranérou', 15.3000, -13.9667, []),
+    ]),
+    ('SL', 'Saint-Louis', 16.0179, -16.4896, [
+        ('Saint-Louis', 16.0179, -16.4896, []),
+        ('Dagana', 16.5167, -15.5000, [
+            ('Richard-Toll', 16.4625, -15.7008),
+        ]),
+        ('Podor', 16.6500, -14.9667, []),
+    ]),
+    ('SE', 'Sédhiou', 12.7081, -15.5569, [
+        ('Sédhiou', 12.7081, -15.5569, []),
+        ('Bounkiling', 13.0333, -15.7000, []),
+        ('Goudomp', 12.5778, -15.8736, []),
+    ]),
+    ('TC', 'Tambacounda', 13.7707, -13.6673, [
+        ('Tambacounda', 13.7707, -13.6673, []),
+        ('Bakel', 14.9000, -12.4667, []),
+        ('Goudiry', 14.1833, -12.7167, []),
+        ('Koumpentoum', 13.9833, -14.5500, []),
+    ]),
+    ('ZG', 'Ziguinchor', 12.5681, -16.2733, [
+        ('Ziguinchor', 12.5681, -16.2733, []),
+        ('Bignona', 12.8103, -16.2264, []),
+        ('Oussouye', 12.4850, -16.5469, [
+            ('Cap Skirring', 12.3933, -16.7461),
+        ]),
+    ]),
+]
+
+# Other spellings seen in ads, normalized (see matching.normalize) -> reference name
+REGION_ALIASES = {
+    'st louis': 'Saint-Louis',
+    'ndar': 'Saint-Louis',
+    'casamance': 'Ziguinchor',
+}
+DEPARTMENT_ALIASES = {
+    'st louis': 'Saint-Louis',
+    'nioro': 'Nioro du Rip',
+    'medina yoro foula': 'Médina Yoro Foulah',
+}
+NEIGHBORHOOD_ALIASES = {
+    'parcelles': 'Parcelles Assainies',
+    'pa': 'Parcelles Assainies',
+    'sacre coeur': 'Sacré-Cœur',
+    'sicap liberte': 'Liberté',
+    'hann bel air': 'Hann',
+    'richard toll': 'Richard-Toll',
+}
@@ -0,0 +1,43 @@
+"""
+Distance queries on latitude/longitude columns.
+
+Distances use the equirectangular approximation: exact to well under 1 %
+over the size of Senegal, and plain arithmetic every database runs.
+nearby() first keeps the rows inside the bounding box of the circle, which
+a B-tree index on (latitude, longitude) serves, and only computes the
+distance of those.
+"""
+
+import math
+
+from django.db.models import F, FloatField
+from django.db.models.functions import Sqrt
+
+KM_PER_DEGREE = 111.32
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """((min, max) latitude, (min, max) longitude) of the square around the circle."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (latitude - lat_delta, latitude + lat_delta), (longitude - lng_delta, longitude + lng_delta)
+
+
+def distance_km(latitude, longitude):
+    """Expression of the distance in km between the row's coordinates and the point."""
+    dy = (F('latitude') - latitude) * KM_PER_DEGREE
+    dx = (F('longitude') - longitude) * (KM_PER_DEGREE * math.cos(math.radians(latitude)))
+    return Sqrt(dx * dx + dy * dy, output_field=FloatField())
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    """Rows within `radius_km` of the point, annotated with `distance_km`."""
+    latitudes, longitudes = bounding_box(latitude, longitude, radius_km)
+    return queryset.filter(
+        latitude__range=latitudes, longitude__range=longitudes,
+    ).annotate(
+        distance_km=distance_km(latitude, longitude),
+    ).filter(distance_km__lte=radius_km)
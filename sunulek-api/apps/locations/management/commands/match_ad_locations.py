@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.annonces import caching
+from apps.annonces.models import Ad
+from apps.categories import counts
+from apps.locations.matching import get_index, match_ads
+
+
+class Command(BaseCommand):
+    help = 'Rattache les annonces aux régions, départements et quartiers de référence (correspondance approchée).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Signale les annonces à rattacher sans les modifier (code de sortie 1 s\'il y en a).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Annonces par mise à jour groupée.')
+    
+    def handle(self, *args, **options):
+        result = match_ads(Ad.objects.all(), get_index(), options['batch_size'], commit=not options['check'])
+        
+        for (region, department), total in result.unmatched.most_common(20):
+            self.stdout.write(f'Sans correspondance : « {region} » / « {department} » ({total} annonce(s))')
+        unmatched = sum(result.unmatched.values())
+        
+        if options['check']:
+            if result.updated:
+                raise CommandError(f'{result.updated} annonce(s) sur {result.ads} à rattacher.')
+            self.stdout.write(self.style.SUCCESS(f'{result.ads} annonce(s) à jour, {unmatched} sans correspondance.'))
+            return
+        
+        if result.updated:
+            # Ads are counted by reference region, and bulk updates send no signal
+            counts.rebuild()
+            caching.invalidate(caching.ADS, caching.CATEGORIES)
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.updated} annonce(s) rattachée(s) sur {result.ads}, {unmatched} sans correspondance.'
+        ))
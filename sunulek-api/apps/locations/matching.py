@@ -0,0 +1,196 @@
+"""
+Matching of typed locations against the reference tables.
+
+Ads keep the region, department and neighborhood typed by their author.
+LocationIndex.resolve() maps each string to a reference row by, in order:
+1. the normalized name (case, accents and punctuation ignored),
+2. a known alias (data.py),
+3. for neighborhoods, a reference name found as whole words in the text,
+4. the closest name above FUZZY_CUTOFF (difflib ratio).
+Departments are looked up within the matched region and neighborhoods
+within the matched department. A department found without its region, or
+typed in the region field ("Pikine"), gives the region.
+"""
+
+import difflib
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, namedtuple
+
+from .data import DEPARTMENT_ALIASES, NEIGHBORHOOD_ALIASES, REGION_ALIASES
+
+FUZZY_CUTOFF = 0.8
+
+# Seconds before a process reloads the reference tables
+INDEX_TTL = 300
+
+# Ad fields set from a match
+AD_FIELDS = ['location_region', 'location_department', 'location_neighborhood', 'latitude', 'longitude']
+
+Place = namedtuple('Place', ['id', 'name', 'latitude', 'longitude', 'parent_id'])
+MatchResult = namedtuple('MatchResult', ['ads', 'updated', 'unmatched'])
+
+
+class Match(namedtuple('Match', ['region', 'department', 'neighborhood'])):
+    """Places matched at each level, None where nothing matched."""
+    
+    @property
+    def place(self):
+        """The most precise place matched, or None."""
+        return self.neighborhood or self.department or self.region
+
+
+def normalize(text):
+    text = (text or '').lower().replace('œ', 'oe').replace('æ', 'ae')
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+class Names:
+    """Places of one level, looked up by name."""
+    
+    def __init__(self, places, aliases):
+        self.places = {normalize(place.name): place for place in places}
+        for alias, name in aliases.items():
+            if normalize(name) in self.places:
+                self.places.setdefault(alias, self.places[normalize(name)])
+    
+    def find(self, text, contains=False):
+        key = normalize(text)
+        if not key:
+            return None
+        if key in self.places:
+            return self.places[key]
+        if contains:
+            padded = f' {key} '
+            found = [name for name in self.places if f' {name} ' in padded]
+            if found:
+                return self.places[max(found, key=len)]
+        close = difflib.get_close_matches(key, self.places, n=1, cutoff=FUZZY_CUTOFF)
+        return self.places[close[0]] if close else None
+
+
+EMPTY = Names([], {})
+
+
+class LocationIndex:
+    """In-memory copy of the reference tables (a few hundred rows)."""
+    
+    def __init__(self, regions, departments, neighborhoods):
+        self.region_by_id = {place.id: place for place in regions}
+        self.regions = Names(regions, REGION_ALIASES)
+        self.departments = Names(departments, DEPARTMENT_ALIASES)
+        self.departments_in = {
+            region.id: Names([d for d in departments if d.parent_id == region.id], DEPARTMENT_ALIASES)
+            for region in regions
+        }
+        self.neighborhoods_in = {
+            department.id: Names([n for n in neighborhoods if n.parent_id == department.id], NEIGHBORHOOD_ALIASES)
+            for department in departments
+        }
+    
+    @classmethod
+    def load(cls, region_model, department_model, neighborhood_model):
+        """Read the tables through the given models (historical ones in migrations)."""
+        def places(model, parent):
+            fields = ['id', 'name', 'latitude', 'longitude']
+            if parent is None:
+                return [Place(*row, None) for row in model.objects.values_list(*fields)]
+            return [Place(*row) for row in model.objects.values_list(*fields, parent)]
+        
+        return cls(
+            places(region_model, None),
+            places(department_model, 'region_id'),
+            places(neighborhood_model, 'department_id'),
+        )
+    
+    def resolve(self, region='', department='', neighborhood=''):
+        found_region = self.regions.find(region)
+        if found_region:
+            found_department = self.departments_in.get(found_region.id, EMPTY).find(department)
+        else:
+            found_department = self.departments.find(department) or self.departments.find(region)
+            if found_department:
+                found_region = self.region_by_id[found_department.parent_id]
+        found_neighborhood = None
+        if found_department:
+            found_neighborhood = self.neighborhoods_in.get(found_department.id, EMPTY).find(
+                neighborhood, contains=True
+            )
+        return Match(found_region, found_department, found_neighborhood)
+
+
+def apply(ad, match):
+    """
+    Set the reference fields and coordinates of `ad` from `match`.
+    
+    The text typed by the author is kept: filters, facets and category
+    counts group on the reference fields.
+    """
+    ad.location_region_id = match.region.id if match.region else None
+    ad.location_department_id = match.department.id if match.department else None
+    ad.location_neighborhood_id = match.neighborhood.id if match.neighborhood else None
+    place = match.place
+    ad.latitude, ad.longitude = (place.latitude, place.longitude) if place else (None, None)
+
+
+def match_ads(queryset, index, batch_size=1000, commit=True):
+    """
+    Apply `index` to the ads of `queryset` with bulk updates (no signals).
+    
+    Returns MatchResult(ads, updated, unmatched), `unmatched` counting the
+    (region, department) strings that matched no region. With
+    commit=False, `updated` is the number of ads that would change.
+    """
+    model = queryset.model
+    attnames = [model._meta.get_field(name).attname for name in AD_FIELDS]
+    matches = {}
+    result = MatchResult(0, 0, Counter())
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values('pk', 'region', 'department', 'neighborhood', *attnames)[:batch_size]
+        )
+        if not rows:
+            return result
+        last_pk = rows[-1]['pk']
+        
+        changed = []
+        for row in rows:
+            key = (row['region'], row['department'], row['neighborhood'])
+            if key not in matches:
+                matches[key] = index.resolve(*key)
+            if matches[key].region is None:
+                result.unmatched[key[:2]] += 1
+            ad = model(pk=row['pk'])
+            apply(ad, matches[key])
+            if any(getattr(ad, name) != row[name] for name in attnames):
+                changed.append(ad)
+        if commit and changed:
+            model.objects.bulk_update(changed, AD_FIELDS)
+        result = MatchResult(result.ads + len(rows), result.updated + len(changed), result.unmatched)
+
+
+_index = None
+_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """LocationIndex of the reference tables, reloaded every INDEX_TTL seconds."""
+    global _index, _loaded_at
+    if _index is None or time.monotonic() - _loaded_at > INDEX_TTL:
+        with _index_lock:
+            if _index is None or time.monotonic() - _loaded_at > INDEX_TTL:
+                from .models import Department, Neighborhood, Region
+                _index = LocationIndex.load(Region, Department, Neighborhood)
+                _loaded_at = time.monotonic()
+    return _index
+
+
+def clear_index():
+    global _index
+    _index = None
@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def load_reference_data(apps, schema_editor):
+    # Idempotent: a later migration can run it again after data.py changes
+    from apps.locations.data import REGIONS
+
+    Region = apps.get_model('locations', 'Region')
+    Department = apps.get_model('locations', 'Department')
+    Neighborhood = apps.get_model('locations', 'Neighborhood')
+
+    for code, name, latitude, longitude, departments in REGIONS:
+        region, _ = Region.objects.update_or_create(
+            code=code, defaults={'name': name, 'latitude': latitude, 'longitude': longitude},
+        )
+        for department_name, latitude, longitude, neighborhoods in departments:
+            department, _ = Department.objects.update_or_create(
+                code=slugify(department_name),
+                defaults={'region': region, 'name': department_name, 'latitude': latitude, 'longitude': longitude},
+            )
+            for neighborhood_name, latitude, longitude in neighborhoods:
+                Neighborhood.objects.update_or_create(
+                    department=department, name=neighborhood_name,
+                    defaults={'latitude': latitude, 'longitude': longitude},
+                )
+
+
+def unload_reference_data(apps, schema_editor):
+    apps.get_model('locations', 'Region').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("locations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(load_reference_data, unload_reference_data),
+    ]
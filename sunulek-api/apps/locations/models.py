@@ -0,0 +1,68 @@
+from django.db import models
+
+
+class Region(models.Model):
+    """One of the 14 regions of Senegal."""
+    
+    code = models.CharField(max_length=2, unique=True, verbose_name='Code')  # ISO 3166-2:SN
+    name = models.CharField(max_length=100, unique=True, verbose_name='Nom')
+    # Chief town
+    latitude = models.FloatField(verbose_name='Latitude')
+    longitude = models.FloatField(verbose_name='Longitude')
+    
+    class Meta:
+        verbose_name = 'Région'
+        verbose_name_plural = 'Régions'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class Department(models.Model):
+    """Department of a region."""
+    
+    region = models.ForeignKey(
+        Region,
+        on_delete=models.CASCADE,
+        related_name='departments',
+        verbose_name='Région'
+    )
+    code = models.SlugField(max_length=100, unique=True, verbose_name='Code')
+    name = models.CharField(max_length=100, unique=True, verbose_name='Nom')
+    # Chief town
+    latitude = models.FloatField(verbose_name='Latitude')
+    longitude = models.FloatField(verbose_name='Longitude')
+    
+    class Meta:
+        verbose_name = 'Département'
+        verbose_name_plural = 'Départements'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class Neighborhood(models.Model):
+    """Neighborhood, town or village of a department."""
+    
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='neighborhoods',
+        verbose_name='Département'
+    )
+    name = models.CharField(max_length=100, verbose_name='Nom')
+    latitude = models.FloatField(verbose_name='Latitude')
+    longitude = models.FloatField(verbose_name='Longitude')
+    
+    class Meta:
+        verbose_name = 'Quartier'
+        verbose_name_plural = 'Quartiers'
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['department', 'name'], name='unique_department_neighborhood'),
+        ]
+    
+    def __str__(self):
+        return self.name
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from .models import Region, Department, Neighborhood
+
+
+class NeighborhoodSerializer(serializers.ModelSerializer):
+    
+    class Meta:
+        model = Neighborhood
+        fields = ['id', 'name', 'latitude', 'longitude']
+
+
+class DepartmentSerializer(serializers.ModelSerializer):
+    
+    neighborhoods = NeighborhoodSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Department
+        fields = ['id', 'code', 'name', 'latitude', 'longitude', 'neighborhoods']
+
+
+class RegionSerializer(serializers.ModelSerializer):
+    """Region with its departments and their neighborhoods."""
+    
+    departments = DepartmentSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Region
+        fields = ['id', 'code', 'name', 'latitude', 'longitude', 'departments']
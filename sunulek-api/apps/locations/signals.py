@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .matching import clear_index
+from .models import Department, Neighborhood, Region
+
+
+@receiver([post_save, post_delete], sender=Region)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Neighborhood)
+def reload_index(sender, **kwargs):
+    # Other processes reload theirs within INDEX_TTL
+    clear_index()
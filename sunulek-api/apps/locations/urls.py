@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import RegionListView
+
+urlpatterns = [
+    path('', RegionListView.as_view(), name='location-list'),
+]
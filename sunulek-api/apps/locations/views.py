@@ -0,0 +1,18 @@
+from django.db.models import Prefetch
+from rest_framework import generics, permissions
+from drf_spectacular.utils import extend_schema
+from apps.replicas.routing import ReplicaReadMixin
+from .models import Region, Department
+from .serializers import RegionSerializer
+
+
+@extend_schema(tags=['Locations'])
+class RegionListView(ReplicaReadMixin, generics.ListAPIView):
+    """Reference locations: regions, their departments and neighborhoods, unpaginated."""
+    
+    serializer_class = RegionSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+    queryset = Region.objects.prefetch_related(
+        Prefetch('departments', queryset=Department.objects.prefetch_related('neighborhoods')),
+    )
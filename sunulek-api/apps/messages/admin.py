@@ -14,7 +14,7 @@ class ConversationAdmin(admin.ModelAdmin):
     list_display = ('id', 'ad', 'initiator', 'recipient', 'created_at', 'updated_at')
     list_filter = ('created_at',)
     search_fields = ('ad__title', 'initiator__email', 'recipient__email')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('initiator_unread_count', 'recipient_unread_count', 'created_at', 'updated_at')
     inlines = [MessageInline]
 
 
@@ -0,0 +1,241 @@
+"""
+Real-time message events.
+
+Conversation.add_message / mark_read_by publish events to both participants
+through a channel layer; the `/conversations/events/` Server-Sent Events
+endpoint (served by the ASGI application) streams them to the client.
+
+Channel layers:
+- InMemoryChannelLayer: single process, used in development and tests.
+- PostgresChannelLayer: LISTEN/NOTIFY, shared by every worker, no broker.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Put in a subscription to end it (see close_subscribers)
+CLOSED = object()
+
+
+class Subscription:
+    """
+    Async iterator over the events of one user.
+    
+    Registered as soon as it is created, so nothing published after that is
+    missed. Yields None every `keepalive` seconds without events so the
+    caller can keep the connection open. Ends when the layer closes it.
+    """
+    
+    def __init__(self, layer, user_id, keepalive=None):
+        self.layer = layer
+        self.user_id = user_id
+        self.keepalive = keepalive
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        layer.add_subscriber(user_id, self)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        try:
+            event = await asyncio.wait_for(self.queue.get(), self.keepalive)
+        except asyncio.TimeoutError:
+            return None
+        if event is CLOSED:
+            raise StopAsyncIteration
+        return event
+    
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+    
+    async def aclose(self):
+        self.layer.remove_subscriber(self.user_id, self)
+
+
+class InMemoryChannelLayer:
+    """Fan events out to the subscribers of the current process."""
+    
+    def __init__(self, options):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+    
+    def publish(self, user_ids, event):
+        """Send `event` to every subscriber of the given users. Callable from sync code."""
+        self.dispatch(user_ids, event)
+    
+    def dispatch(self, user_ids, event):
+        with self._lock:
+            targets = [
+                subscriber
+                for user_id in user_ids
+                for subscriber in self._subscribers.get(user_id, ())
+            ]
+        for subscriber in targets:
+            subscriber.put(event)
+    
+    def add_subscriber(self, user_id, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+    
+    def remove_subscriber(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+    
+    def close_subscribers(self):
+        """End every subscription, when events may have been missed."""
+        with self._lock:
+            subscribers = [subscriber for group in self._subscribers.values() for subscriber in group]
+            self._subscribers = {}
+        for subscriber in subscribers:
+            subscriber.put(CLOSED)
+    
+    def subscribe(self, user_id, keepalive=None):
+        """Start receiving the events of `user_id`. Must be called from a running event loop."""
+        return Subscription(self, user_id, keepalive)
+
+
+class PostgresChannelLayer(InMemoryChannelLayer):
+    """
+    Deliver events between processes with PostgreSQL LISTEN/NOTIFY.
+    
+    Each process holds a single listening connection, opened by a thread
+    started with its first subscriber, and fans notifications out locally.
+    The connection uses the driver of the `default` database (psycopg 3 or
+    psycopg2) with its settings, outside any pool. When it fails, the
+    subscribers are closed, so clients reconnect and fetch what they missed,
+    and the thread connects again after a growing delay.
+    """
+    
+    channel = 'sunulek_events'
+    
+    # Seconds without notification before the connection is checked
+    health_check_interval = 30
+    # Seconds between reconnection attempts, doubled on each failure
+    reconnect_delays = (1, 30)
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+    
+    def publish(self, user_ids, event):
+        payload = json.dumps({'users': list(user_ids), 'event': event}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+    
+    def on_notify(self, payload):
+        payload = json.loads(payload)
+        self.dispatch(payload['users'], payload['event'])
+    
+    def connect(self):
+        """A new autocommit connection of the default database's driver, listening on `channel`."""
+        wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+        conn = wrapper.Database.connect(**wrapper.get_connection_params())
+        conn.autocommit = True
+        conn.cursor().execute(f'LISTEN {self.channel}')
+        return conn
+    
+    def receive(self, conn):
+        """Dispatch the notifications of `conn` until it fails."""
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        
+        while True:
+            if is_psycopg3:
+                for notify in conn.notifies(timeout=self.health_check_interval):
+                    self.on_notify(notify.payload)
+            elif select.select([conn], [], [], self.health_check_interval) != ([], [], []):
+                conn.poll()
+                while conn.notifies:
+                    self.on_notify(conn.notifies.pop(0).payload)
+                continue
+            # Nothing received for a while: raises if the connection is gone
+            conn.cursor().execute('SELECT 1')
+    
+    def listen(self):
+        delay = self.reconnect_delays[0]
+        while True:
+            conn = None
+            try:
+                conn = self.connect()
+                delay = self.reconnect_delays[0]
+                self.receive(conn)
+            except Exception:
+                logger.warning('Écoute de %s interrompue, reconnexion dans %s s', self.channel, delay, exc_info=True)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            # Notifications sent while disconnected are lost
+            self.close_subscribers()
+            time.sleep(delay)
+            delay = min(delay * 2, self.reconnect_delays[1])
+    
+    def subscribe(self, user_id, keepalive=None):
+        if self._listener is None:
+            with self._listener_lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self.listen, name='realtime-listener', daemon=True)
+                    self._listener.start()
+        return super().subscribe(user_id, keepalive)
+
+
+_layer = None
+_layer_lock = threading.Lock()
+
+
+def get_channel_layer():
+    global _layer
+    if _layer is None:
+        with _layer_lock:
+            if _layer is None:
+                options = getattr(settings, 'REALTIME', {})
+                backend = options.get('CHANNEL_LAYER', 'apps.messages.events.InMemoryChannelLayer')
+                _layer = import_string(backend)(options)
+    return _layer
+
+
+def publish_message(conversation, message):
+    """
+    Notify both participants of a new message.
+    
+    Only ids are sent, clients fetch the message itself: a NOTIFY payload is
+    limited to 8000 bytes, less than a long message with accents or emoji.
+    """
+    get_channel_layer().publish(
+        [conversation.initiator_id, conversation.recipient_id],
+        {
+            'type': 'message',
+            'conversation_id': conversation.id,
+            'message_id': message.id,
+            'sender_id': message.sender_id,
+        },
+    )
+
+
+def publish_read(conversation, reader):
+    """Notify both participants that `reader` has read the conversation."""
+    get_channel_layer().publish(
+        [conversation.initiator_id, conversation.recipient_id],
+        {'type': 'read', 'conversation_id': conversation.id, 'reader_id': reader.id},
+    )
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, cls=DjangoJSONEncoder)}\n\n"
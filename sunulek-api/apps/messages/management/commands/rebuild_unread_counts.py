@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.messages.models import Conversation, Message
+
+
+def unread_for(participant):
+    """Subquery counting unread messages not sent by `participant` ('initiator' or 'recipient')."""
+    unread = Message.objects.filter(
+        conversation=OuterRef('pk'), is_read=False
+    ).exclude(sender=OuterRef(participant)).order_by().values('conversation').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(unread), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les compteurs de messages non lus des conversations.'
+    
+    def handle(self, *args, **options):
+        updated = Conversation.objects.update(
+            initiator_unread_count=unread_for('initiator'),
+            recipient_unread_count=unread_for('recipient'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{updated} conversation(s) recalculée(s).'))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counts(apps, schema_editor):
+    Conversation = apps.get_model('chat_messages', 'Conversation')
+    Message = apps.get_model('chat_messages', 'Message')
+
+    def unread_for(participant):
+        unread = Message.objects.filter(
+            conversation=OuterRef('pk'), is_read=False
+        ).exclude(sender=OuterRef(participant)).order_by().values('conversation').annotate(
+            total=Count('pk')
+        ).values('total')
+        return Coalesce(Subquery(unread), 0)
+
+    Conversation.objects.update(
+        initiator_unread_count=unread_for('initiator'),
+        recipient_unread_count=unread_for('recipient'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat_messages", "0002_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="initiator_unread_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Non lus (initiateur)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="recipient_unread_count",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Non lus (destinataire)"
+            ),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
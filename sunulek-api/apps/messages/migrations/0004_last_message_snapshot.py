@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+
+
+def backfill_last_message(apps, schema_editor):
+    Conversation = apps.get_model('chat_messages', 'Conversation')
+    Message = apps.get_model('chat_messages', 'Message')
+
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-created_at', '-id')
+    Conversation.objects.update(
+        last_message=Subquery(latest.values('pk')[:1]),
+        last_message_content=Subquery(
+            latest.annotate(preview=Substr('content', 1, 100)).values('preview')[:1]
+        ),
+        last_message_sender=Subquery(latest.values('sender')[:1]),
+        last_message_at=Subquery(latest.values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("annonces", "0006_keyset_indexes"),
+        ("chat_messages", "0003_unread_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="chat_messages.message",
+                verbose_name="Dernier message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_content",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message_sender",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["initiator", "-updated_at"],
+                name="chat_messag_initiat_28ee80_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["recipient", "-updated_at"],
+                name="chat_messag_recipie_958abf_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_last_message, migrations.RunPython.noop),
+    ]
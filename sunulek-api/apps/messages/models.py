@@ -1,6 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
+from . import events
+
+
+LAST_MESSAGE_PREVIEW_LENGTH = 100
+
 
 class Conversation(models.Model):
     """
@@ -27,6 +32,29 @@ class Conversation(models.Model):
         verbose_name='Destinataire'
     )
     
+    # Snapshot of the latest message for the inbox, written by add_message
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Dernier message'
+    )
+    last_message_content = models.CharField(max_length=LAST_MESSAGE_PREVIEW_LENGTH, blank=True)
+    last_message_sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    
+    # Unread messages per participant, maintained by add_message / mark_read_by
+    initiator_unread_count = models.PositiveIntegerField(default=0, verbose_name='Non lus (initiateur)')
+    recipient_unread_count = models.PositiveIntegerField(default=0, verbose_name='Non lus (destinataire)')
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -37,17 +65,62 @@ class Conversation(models.Model):
         ordering = ['-updated_at']
         # Ensure only one conversation per ad per initiator
         unique_together = ['ad', 'initiator']
+        indexes = [
+            # Inbox: conversations of a participant, most recent first
+            models.Index(fields=['initiator', '-updated_at']),
+            models.Index(fields=['recipient', '-updated_at']),
+        ]
     
     def __str__(self):
         return f"Conversation: {self.initiator.email} → {self.recipient.email} ({self.ad.title})"
     
-    @property
-    def last_message(self):
-        return self.messages.first()
+    def unread_field_for(self, user):
+        return 'initiator_unread_count' if user.id == self.initiator_id else 'recipient_unread_count'
     
     def unread_count_for(self, user):
-        """Count unread messages for a specific user."""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        """Unread messages for a specific user."""
+        return getattr(self, self.unread_field_for(user))
+    
+    def add_message(self, sender, content):
+        """
+        Create a message, bump the other participant's unread counter and
+        store the last-message snapshot, in one transaction.
+        """
+        other = self.recipient if sender.id == self.initiator_id else self.initiator
+        field = self.unread_field_for(other)
+        
+        with transaction.atomic():
+            message = Message.objects.create(conversation=self, sender=sender, content=content)
+            snapshot = {
+                'last_message': message,
+                'last_message_content': content[:LAST_MESSAGE_PREVIEW_LENGTH],
+                'last_message_sender': sender,
+                'last_message_at': message.created_at,
+                'updated_at': message.created_at,
+            }
+            # The row lock taken here serializes with mark_read_by
+            Conversation.objects.filter(pk=self.pk).update(**{field: models.F(field) + 1}, **snapshot)
+            # robust: the message is committed even if the channel layer fails
+            transaction.on_commit(lambda: events.publish_message(self, message), robust=True)
+        
+        for name, value in snapshot.items():
+            setattr(self, name, value)
+        setattr(self, field, getattr(self, field) + 1)
+        return message
+    
+    def mark_read_by(self, user):
+        """Mark the other participant's messages as read and reset the user's counter."""
+        field = self.unread_field_for(user)
+        if not getattr(self, field):
+            return
+        
+        with transaction.atomic():
+            list(Conversation.objects.select_for_update().filter(pk=self.pk).values_list('pk'))
+            self.messages.filter(is_read=False).exclude(sender=user).update(is_read=True)
+            Conversation.objects.filter(pk=self.pk).update(**{field: 0})
+            transaction.on_commit(lambda: events.publish_read(self, user), robust=True)
+        
+        setattr(self, field, 0)
 
 
 class Message(models.Model):
@@ -78,6 +151,9 @@ class Message(models.Model):
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Message de {self.sender.email} - {self.created_at}"
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
 from .models import Conversation, Message
+from apps.annonces.fastpath import FastRepresentationMixin
 
 User = get_user_model()
 
 
-class MessageUserSerializer(serializers.ModelSerializer):
+class MessageUserSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Minimal user info for messages."""
     
     class Meta:
@@ -13,7 +15,7 @@ class MessageUserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'full_name', 'avatar']
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Serializer for individual messages."""
     
     sender = MessageUserSerializer(read_only=True)
@@ -31,7 +33,7 @@ class MessageSerializer(serializers.ModelSerializer):
         return False
 
 
-class ConversationListSerializer(serializers.ModelSerializer):
+class ConversationListSerializer(FastRepresentationMixin, serializers.ModelSerializer):
     """Serializer for conversation list."""
     
     other_user = serializers.SerializerMethodField()
@@ -49,20 +51,25 @@ class ConversationListSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
     
+    @cached_property
+    def user_serializer(self):
+        # One instance for the whole page instead of one per conversation
+        return MessageUserSerializer()
+    
     def get_other_user(self, obj):
         request = self.context.get('request')
         if request and request.user:
             other = obj.recipient if obj.initiator_id == request.user.id else obj.initiator
-            return MessageUserSerializer(other).data
+            return self.user_serializer.to_representation(other)
         return None
     
     def get_last_message(self, obj):
-        last = obj.messages.first()
-        if last:
+        # Snapshot stored on the conversation by Conversation.add_message
+        if obj.last_message_at:
             return {
-                'content': last.content[:100],
-                'created_at': last.created_at,
-                'is_mine': last.sender_id == self.context.get('request').user.id if self.context.get('request') else False
+                'content': obj.last_message_content,
+                'created_at': obj.last_message_at,
+                'is_mine': obj.last_message_sender_id == self.context.get('request').user.id if self.context.get('request') else False
             }
         return None
     
@@ -73,9 +80,13 @@ class ConversationListSerializer(serializers.ModelSerializer):
         return 0
     
     def get_ad_image(self, obj):
-        primary = obj.ad.images.filter(is_primary=True).first()
-        if not primary:
-            primary = obj.ad.images.first()
+        # Prefetched by ConversationViewSet.list
+        if hasattr(obj.ad, 'list_images'):
+            primary = obj.ad.list_images[0] if obj.ad.list_images else None
+        else:
+            primary = obj.ad.images.filter(is_primary=True).first()
+            if not primary:
+                primary = obj.ad.images.first()
         if primary:
             request = self.context.get('request')
             if request:
@@ -84,7 +95,13 @@ class ConversationListSerializer(serializers.ModelSerializer):
 
 
 class ConversationDetailSerializer(serializers.ModelSerializer):
-    """Serializer for conversation detail with messages."""
+    """
+    Serializer for conversation detail with messages.
+    
+    With a `messages_paginator` in the context, only one page of messages is
+    returned (newest first window, in chronological order) along with
+    `messages_next` (older) and `messages_previous` (newer) links.
+    """
     
     other_user = serializers.SerializerMethodField()
     messages = serializers.SerializerMethodField()
@@ -108,10 +125,25 @@ class ConversationDetailSerializer(serializers.ModelSerializer):
         return None
     
     def get_messages(self, obj):
-        # Return messages in chronological order (oldest first)
-        messages = obj.messages.all().order_by('created_at')
+        paginator = self.context.get('messages_paginator')
+        if paginator:
+            page = paginator.paginate_queryset(
+                obj.messages.select_related('sender'), self.context['request']
+            )
+            messages = list(reversed(page))
+        else:
+            # Return messages in chronological order (oldest first)
+            messages = obj.messages.select_related('sender').order_by('created_at')
         return MessageSerializer(messages, many=True, context=self.context).data
     
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        paginator = self.context.get('messages_paginator')
+        if paginator:
+            data['messages_next'] = paginator.get_next_link()
+            data['messages_previous'] = paginator.get_previous_link()
+        return data
+    
     def get_ad_image(self, obj):
         primary = obj.ad.images.filter(is_primary=True).first()
         if not primary:
@@ -1,11 +1,18 @@
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status, permissions
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db.models import Prefetch, Q, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
 from drf_spectacular.utils import extend_schema
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
-from .models import Conversation, Message
+from .models import Conversation
+from .events import get_channel_layer, format_sse
 from .serializers import (
     ConversationListSerializer,
     ConversationDetailSerializer,
@@ -13,29 +20,38 @@ from .serializers import (
     StartConversationSerializer,
     MessageSerializer,
 )
-from apps.annonces.models import Ad
+from apps.annonces.async_views import AsyncViewMixin, serialize
+from apps.annonces.models import Ad, AdImage
+from apps.annonces.pagination import KeysetPagination, wants_keyset
 
 
 @extend_schema(tags=['Messages'])
-class ConversationViewSet(viewsets.ViewSet):
-    """ViewSet for managing conversations and messages."""
+class ConversationViewSet(AsyncViewMixin, viewsets.ViewSet):
+    """ViewSet for managing conversations and messages. Async: see apps.annonces.async_views."""
     
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scopes = {'start': 'conversation_start', 'send': 'message_send'}
     
-    def list(self, request):
+    async def list(self, request):
         """List all conversations for the current user."""
         conversations = Conversation.objects.filter(
             Q(initiator=request.user) | Q(recipient=request.user)
-        ).select_related('ad', 'initiator', 'recipient').prefetch_related('messages')
+        ).select_related('ad', 'initiator', 'recipient').defer('ad__description').prefetch_related(
+            Prefetch(
+                'ad__images',
+                queryset=AdImage.objects.order_by('-is_primary', 'order', 'id')[:1],
+                to_attr='list_images',
+            )
+        )
         
         serializer = ConversationListSerializer(
             conversations, many=True, context={'request': request}
         )
-        return Response(serializer.data)
+        return Response(await serialize(serializer))
     
-    def retrieve(self, request, pk=None):
+    async def retrieve(self, request, pk=None):
         """Get a specific conversation with all messages."""
-        conversation = get_object_or_404(
+        conversation = await aget_object_or_404(
             Conversation.objects.filter(
                 Q(initiator=request.user) | Q(recipient=request.user)
             ),
@@ -43,13 +59,16 @@ class ConversationViewSet(viewsets.ViewSet):
         )
         
         # Mark messages as read
-        conversation.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+        await sync_to_async(conversation.mark_read_by)(request.user)
         
-        serializer = ConversationDetailSerializer(conversation, context={'request': request})
-        return Response(serializer.data)
+        context = {'request': request}
+        if wants_keyset(request):
+            context['messages_paginator'] = KeysetPagination(ordering='-created_at')
+        serializer = ConversationDetailSerializer(conversation, context=context)
+        return Response(await serialize(serializer))
     
     @action(detail=False, methods=['post'])
-    def start(self, request):
+    async def start(self, request):
         """Start a new conversation or get existing one."""
         serializer = StartConversationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -58,42 +77,35 @@ class ConversationViewSet(viewsets.ViewSet):
         message_content = serializer.validated_data['message']
         
         # Get the ad
-        ad = get_object_or_404(Ad, id=ad_id)
+        ad = await aget_object_or_404(Ad, id=ad_id)
         
         # Can't message yourself
-        if ad.user == request.user:
+        if ad.user_id == request.user.id:
             return Response(
                 {'error': 'Vous ne pouvez pas vous envoyer un message.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Get or create conversation
-        conversation, created = Conversation.objects.get_or_create(
+        conversation, created = await Conversation.objects.aget_or_create(
             ad=ad,
             initiator=request.user,
-            defaults={'recipient': ad.user}
-        )
-        
-        # Create the message
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            content=message_content
+            defaults={'recipient_id': ad.user_id}
         )
         
-        # Update conversation timestamp
-        conversation.save()  # This updates updated_at
+        # Create the message (also updates counters and timestamp)
+        message = await sync_to_async(conversation.add_message)(request.user, message_content)
         
         return Response({
             'conversation_id': conversation.id,
-            'message': MessageSerializer(message, context={'request': request}).data,
+            'message': await serialize(MessageSerializer(message, context={'request': request})),
             'created': created
         }, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'])
-    def send(self, request, pk=None):
+    async def send(self, request, pk=None):
         """Send a message in an existing conversation."""
-        conversation = get_object_or_404(
+        conversation = await aget_object_or_404(
             Conversation.objects.filter(
                 Q(initiator=request.user) | Q(recipient=request.user)
             ),
@@ -103,25 +115,64 @@ class ConversationViewSet(viewsets.ViewSet):
         serializer = SendMessageSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            content=serializer.validated_data['content']
-        )
-        
-        # Update conversation timestamp
-        conversation.save()
+        message = await sync_to_async(conversation.add_message)(request.user, serializer.validated_data['content'])
         
         return Response(
-            MessageSerializer(message, context={'request': request}).data,
+            await serialize(MessageSerializer(message, context={'request': request})),
             status=status.HTTP_201_CREATED
         )
     
     @action(detail=False, methods=['get'])
-    def unread_count(self, request):
+    async def unread_count(self, request):
         """Get total unread messages count."""
-        conversations = Conversation.objects.filter(
+        totals = await Conversation.objects.filter(
             Q(initiator=request.user) | Q(recipient=request.user)
+        ).aaggregate(
+            as_initiator=Sum('initiator_unread_count', filter=Q(initiator=request.user)),
+            as_recipient=Sum('recipient_unread_count', filter=Q(recipient=request.user)),
         )
-        total = sum(conv.unread_count_for(request.user) for conv in conversations)
+        total = (totals['as_initiator'] or 0) + (totals['as_recipient'] or 0)
         return Response({'count': total})
+
+
+@sync_to_async
+def authenticate_stream(request):
+    """JWT from the Authorization header, or ?token= since EventSource cannot set headers."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+async def conversation_events(request):
+    """
+    Server-Sent Events stream of the current user's message events.
+    
+    Must be served by the ASGI application (config.asgi) so that open
+    streams do not hold sync workers.
+    """
+    user = await authenticate_stream(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentification requise.'}, status=401)
+    
+    keepalive = getattr(settings, 'REALTIME', {}).get('KEEPALIVE', 25)
+    
+    subscription = get_channel_layer().subscribe(user.id, keepalive=keepalive)
+    
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            async for event in subscription:
+                yield format_sse(event) if event else ': keepalive\n\n'
+        finally:
+            await subscription.aclose()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoring'
+    verbose_name = 'Supervision'
+    
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        
+        from .instrumentation import get_options, install_query_timing, install_serializer_timing
+        
+        if get_options()['ENABLED']:
+            install_serializer_timing()
+            connection_created.connect(install_query_timing)
+            for connection in connections.all(initialized_only=True):
+                install_query_timing(connection=connection)
@@ -0,0 +1,114 @@
+"""
+Per-request instrumentation.
+
+RequestMetrics is bound to the current request through a context variable.
+An execute wrapper, installed on every database connection when it opens,
+adds each query's duration and SQL template (the statement before parameters
+are bound) to it. Context variables follow sync_to_async, so the queries an
+async view runs in threads are counted too. The
+serializer `.data` timing and the response render time add up to the
+serialization time. Identical templates repeated within one request are the
+signature of an N+1 pattern.
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+
+current = ContextVar('request_metrics', default=None)
+
+
+def get_options():
+    return {
+        'ENABLED': True,
+        'NPLUSONE_THRESHOLD': 5,     # Executions of one SQL template flagged as N+1
+        'PROFILE_SAMPLE_RATE': 0.0,  # Share of requests run under cProfile
+        'PROFILE_KEEP': 20,          # Profiles kept per process
+        'FLUSH_INTERVAL': 10,        # Seconds between publications of a worker's stats
+        'LATENCY_BUCKETS': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),  # ms
+        'METRICS_TOKEN': '',
+        **getattr(settings, 'MONITORING', {}),
+    }
+
+
+class RequestMetrics:
+    """Database and serialization time accumulated during one request."""
+    
+    __slots__ = ('start', 'queries', 'db_time', 'serialization_time', 'templates', '_depth', '_render_start')
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.templates = Counter()
+        self._depth = 0
+        self._render_start = None
+    
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.templates[sql] += 1
+    
+    def repeated_templates(self, threshold):
+        """(sql, count) of the templates run at least `threshold` times, most repeated first."""
+        return [(sql, count) for sql, count in self.templates.most_common() if count >= threshold]
+    
+    def render_started(self):
+        self._render_start = time.perf_counter()
+    
+    def render_finished(self):
+        if self._render_start is not None:
+            self.serialization_time += time.perf_counter() - self._render_start
+            self._render_start = None
+
+
+def measure_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection: adds the query to the request being measured, if any."""
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_timing(sender=None, connection=None, **kwargs):
+    """`connection_created` receiver; also called at startup for connections already open."""
+    if measure_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(measure_query)
+
+
+def install_serializer_timing():
+    """
+    Time `serializer.data` for the request being measured.
+    
+    BaseSerializer.data is where every DRF serializer (and ListSerializer)
+    runs to_representation; only the outermost call is counted so nested
+    serializers are not measured twice.
+    """
+    data = BaseSerializer.data
+    if getattr(data.fget, 'instrumented', False):
+        return
+    
+    def timed_data(serializer):
+        metrics = current.get()
+        if metrics is None:
+            return data.fget(serializer)
+        metrics._depth += 1
+        start = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            metrics._depth -= 1
+            if not metrics._depth:
+                metrics.serialization_time += time.perf_counter() - start
+    
+    timed_data.instrumented = True
+    BaseSerializer.data = property(timed_data)
@@ -0,0 +1,122 @@
+import cProfile
+import io
+import logging
+import pstats
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .instrumentation import RequestMetrics, current, get_options
+from .stats import get_process_stats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_LINES = 30
+
+
+def view_label(request):
+    """`METHOD route-name`, or the view path for unnamed routes."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <non résolu>'
+    return f'{request.method} {match.view_name or match._func_path}'
+
+
+def format_profile(profiler):
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_LINES)
+    return output.getvalue()
+
+
+class InstrumentationMiddleware:
+    """
+    Record query count, database time, serialization time and latency per view.
+    
+    Cheap enough to stay on in production: one timer and one counter per
+    query, and per-process aggregation published every FLUSH_INTERVAL
+    seconds. A share of sync requests (PROFILE_SAMPLE_RATE) also runs under
+    cProfile, which follows a single thread.
+    """
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        options = get_options()
+        self.enabled = options['ENABLED']
+        self.threshold = options['NPLUSONE_THRESHOLD']
+        self.sample_rate = options['PROFILE_SAMPLE_RATE']
+        # One warning per (view, template) and process
+        self.reported = set()
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        profiler = cProfile.Profile() if self.sample_rate and random.random() < self.sample_rate else None
+        try:
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        finally:
+            current.reset(token)
+        
+        self.record(request, response, metrics, profiler)
+        return response
+    
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        
+        # Publishing the stats may write to a database cache
+        await sync_to_async(self.record)(request, response, metrics, None)
+        return response
+    
+    def record(self, request, response, metrics, profiler):
+        latency = time.perf_counter() - metrics.start
+        view = view_label(request)
+        repeated = metrics.repeated_templates(self.threshold)
+        stats = get_process_stats()
+        stats.record(view, response.status_code, metrics, latency, repeated)
+        
+        for sql, count in repeated:
+            if (view, sql) not in self.reported:
+                self.reported.add((view, sql))
+                logger.warning('N+1 probable dans %s : %d exécutions de %s', view, count, sql)
+        if profiler:
+            stats.add_profile({
+                'view': view,
+                'path': request.path,
+                'latency_ms': round(latency * 1000, 2),
+                'queries': metrics.queries,
+                'at': time.time(),
+                'stats': format_profile(profiler),
+            })
+    
+    def process_template_response(self, request, response):
+        """DRF responses are rendered after this hook: time the rendering as serialization."""
+        metrics = current.get()
+        if metrics is not None:
+            metrics.render_started()
+            response.add_post_render_callback(lambda rendered: metrics.render_finished())
+        return response
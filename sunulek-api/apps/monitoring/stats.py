@@ -0,0 +1,221 @@
+"""
+Aggregated request statistics.
+
+Each process accumulates per-view counters and latency histograms in memory
+and publishes a snapshot to the cache every FLUSH_INTERVAL seconds, so the
+stats endpoint and the Prometheus metrics cover every gunicorn worker.
+Counters are cumulative since the worker started; snapshots of workers that
+stopped publishing expire.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+
+from django.core.cache import cache
+
+from .instrumentation import get_options
+
+KEY_PREFIX = 'monitoring'
+WORKERS_KEY = f'{KEY_PREFIX}:workers'
+SNAPSHOT_TIMEOUT = 300
+NPLUSONE_KEEP = 50
+
+COUNTERS = ('requests', 'errors', 'queries', 'db_ms', 'serialization_ms', 'latency_ms', 'nplusone')
+
+
+def empty_view_stats(buckets):
+    return {
+        **dict.fromkeys(COUNTERS, 0),
+        'max_latency_ms': 0.0,
+        'max_queries': 0,
+        # Cumulative like Prometheus: buckets[i] counts requests <= LATENCY_BUCKETS[i], the last one is +Inf
+        'buckets': [0] * (len(buckets) + 1),
+    }
+
+
+class ProcessStats:
+    """Counters of the current process."""
+    
+    def __init__(self, options):
+        self.buckets = tuple(options['LATENCY_BUCKETS'])
+        self.flush_interval = options['FLUSH_INTERVAL']
+        self._lock = threading.Lock()
+        self._views = {}
+        self._nplusone = deque(maxlen=NPLUSONE_KEEP)
+        self._profiles = deque(maxlen=options['PROFILE_KEEP'])
+        self._last_flush = 0.0
+        self.key = f'{KEY_PREFIX}:worker:{os.getpid()}'
+    
+    def record(self, view, status_code, metrics, latency, repeated):
+        latency_ms = latency * 1000
+        index = bisect.bisect_left(self.buckets, latency_ms)
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = empty_view_stats(self.buckets)
+            stats['requests'] += 1
+            stats['errors'] += status_code >= 500
+            stats['queries'] += metrics.queries
+            stats['db_ms'] += metrics.db_time * 1000
+            stats['serialization_ms'] += metrics.serialization_time * 1000
+            stats['latency_ms'] += latency_ms
+            stats['max_latency_ms'] = max(stats['max_latency_ms'], latency_ms)
+            stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+            for i in range(index, len(stats['buckets'])):
+                stats['buckets'][i] += 1
+            if repeated:
+                stats['nplusone'] += 1
+                sql, count = repeated[0]
+                self._nplusone.append({'view': view, 'sql': sql, 'count': count, 'at': time.time()})
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.publish()
+    
+    def add_profile(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'at': time.time(),
+                'buckets': self.buckets,
+                'views': {
+                    view: {**stats, 'buckets': list(stats['buckets'])}
+                    for view, stats in self._views.items()
+                },
+                'nplusone': list(self._nplusone),
+                'profiles': list(self._profiles),
+            }
+    
+    def publish(self):
+        """Store this process's snapshot in the cache and register it."""
+        self._last_flush = time.monotonic()
+        cache.set(self.key, self.snapshot(), SNAPSHOT_TIMEOUT)
+        workers = cache.get(WORKERS_KEY) or []
+        if self.key not in workers:
+            cache.set(WORKERS_KEY, [*workers, self.key], None)
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_process_stats():
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = ProcessStats(get_options())
+    return _stats
+
+
+def collect():
+    """Merge the snapshots of every live worker, including the current process."""
+    local = get_process_stats()
+    local.publish()
+    
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many(workers)
+    live = [key for key in workers if key in snapshots]
+    if len(live) != len(workers):
+        cache.set(WORKERS_KEY, live, None)
+    
+    merged = {'workers': len(live), 'buckets': local.buckets, 'views': {}, 'nplusone': [], 'profiles': []}
+    for snapshot in snapshots.values():
+        if tuple(snapshot['buckets']) != local.buckets:
+            continue  # Published with other settings
+        for view, stats in snapshot['views'].items():
+            total = merged['views'].setdefault(view, empty_view_stats(local.buckets))
+            for name in COUNTERS:
+                total[name] += stats[name]
+            total['max_latency_ms'] = max(total['max_latency_ms'], stats['max_latency_ms'])
+            total['max_queries'] = max(total['max_queries'], stats['max_queries'])
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+        merged['nplusone'].extend(snapshot['nplusone'])
+        merged['profiles'].extend(snapshot['profiles'])
+    
+    merged['nplusone'].sort(key=lambda item: item['at'], reverse=True)
+    merged['profiles'].sort(key=lambda item: item['at'], reverse=True)
+    return merged
+
+
+def bucket_percentile(buckets, counts, p):
+    """Upper bound (ms) of the histogram bucket containing the p-th percentile."""
+    total = counts[-1]
+    if not total:
+        return None
+    rank = total * p / 100
+    for bound, count in zip(buckets, counts):
+        if count >= rank:
+            return bound
+    return None  # Above the last bucket
+
+
+def summary(merged):
+    """Per-view averages and percentiles, slowest views first."""
+    views = []
+    for view, stats in merged['views'].items():
+        requests = stats['requests']
+        views.append({
+            'view': view,
+            'requests': requests,
+            'errors': stats['errors'],
+            'latency_mean_ms': round(stats['latency_ms'] / requests, 2),
+            'latency_p50_ms': bucket_percentile(merged['buckets'], stats['buckets'], 50),
+            'latency_p95_ms': bucket_percentile(merged['buckets'], stats['buckets'], 95),
+            'latency_max_ms': round(stats['max_latency_ms'], 2),
+            'queries_mean': round(stats['queries'] / requests, 2),
+            'queries_max': stats['max_queries'],
+            'db_mean_ms': round(stats['db_ms'] / requests, 2),
+            'serialization_mean_ms': round(stats['serialization_ms'] / requests, 2),
+            'nplusone_requests': stats['nplusone'],
+        })
+    views.sort(key=lambda item: item['latency_mean_ms'] * item['requests'], reverse=True)
+    return views
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus(merged):
+    """Render the merged stats in the Prometheus text exposition format."""
+    lines = []
+    
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+    
+    views = sorted(merged['views'].items())
+    
+    def per_view(field, scale=1):
+        return [f'{{view="{escape_label(view)}"}} {stats[field] * scale:g}' for view, stats in views]
+    
+    for name, field, scale, help_text in (
+        ('sunulek_http_requests_total', 'requests', 1, 'Requêtes HTTP traitées.'),
+        ('sunulek_http_errors_total', 'errors', 1, 'Réponses 5xx.'),
+        ('sunulek_db_queries_total', 'queries', 1, 'Requêtes SQL exécutées.'),
+        ('sunulek_db_seconds_total', 'db_ms', 0.001, 'Temps passé en base de données.'),
+        ('sunulek_serialization_seconds_total', 'serialization_ms', 0.001, 'Temps de sérialisation et de rendu.'),
+        ('sunulek_nplusone_requests_total', 'nplusone', 1, 'Requêtes HTTP avec un motif N+1.'),
+    ):
+        metric(name, 'counter', help_text, [name + sample for sample in per_view(field, scale)])
+    
+    samples = []
+    for view, stats in views:
+        label = escape_label(view)
+        bounds = [f'{bound / 1000:g}' for bound in merged['buckets']] + ['+Inf']
+        for bound, count in zip(bounds, stats['buckets']):
+            samples.append(f'sunulek_http_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {count}')
+        samples.append(f'sunulek_http_request_duration_seconds_sum{{view="{label}"}} {stats["latency_ms"] / 1000:g}')
+        samples.append(f'sunulek_http_request_duration_seconds_count{{view="{label}"}} {stats["requests"]}')
+    metric('sunulek_http_request_duration_seconds', 'histogram', 'Latence des requêtes HTTP.', samples)
+    
+    metric('sunulek_workers', 'gauge', 'Processus ayant publié leurs statistiques.', [f'sunulek_workers {merged["workers"]}'])
+    return '\n'.join(lines) + '\n'
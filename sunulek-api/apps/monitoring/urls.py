@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import StatsView, metrics
+
+urlpatterns = [
+    path('stats/', StatsView.as_view(), name='monitoring-stats'),
+    path('metrics/', metrics, name='monitoring-metrics'),
+]
@@ -0,0 +1,53 @@
+import hmac
+
+from django.http import HttpResponse, JsonResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .instrumentation import get_options
+from .stats import collect, prometheus, summary
+
+
+@extend_schema(tags=['Supervision'])
+class StatsView(APIView):
+    """Per-view latency, SQL and serialization stats of every worker, recent N+1 patterns and profiles."""
+    
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        merged = collect()
+        return Response({
+            'workers': merged['workers'],
+            'views': summary(merged),
+            'nplusone': merged['nplusone'],
+            'profiles': merged['profiles'],
+        })
+
+
+def is_metrics_client(request):
+    """METRICS_TOKEN as a bearer token (for the scraper), or an admin's JWT."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if not raw_token:
+        return False
+    token = get_options()['METRICS_TOKEN']
+    if token and hmac.compare_digest(raw_token, token.encode()):
+        return True
+    try:
+        user = auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return False
+    return user.is_staff
+
+
+def metrics(request):
+    """Prometheus text exposition of the merged stats."""
+    if not is_metrics_client(request):
+        return JsonResponse({'detail': 'Authentification requise.'}, status=401)
+    return HttpResponse(prometheus(collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ReplicasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.replicas'
+    verbose_name = 'Réplicas de lecture'
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.replicas.routing import get_options, measure_lag, pin_seconds
+
+
+class Command(BaseCommand):
+    help = 'Affiche le retard de réplication de chaque réplica de lecture.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Code de sortie 1 si un réplica est injoignable ou trop en retard.')
+    
+    def handle(self, *args, **options):
+        settings = get_options()
+        if not settings['REPLICAS']:
+            self.stdout.write('Aucun réplica configuré : toutes les requêtes lisent la base principale.')
+            return
+        
+        unavailable = []
+        for alias in settings['REPLICAS']:
+            lag = measure_lag(alias)
+            if lag is None:
+                unavailable.append(alias)
+                self.stdout.write(self.style.ERROR(f'{alias:<12} injoignable'))
+            elif lag > settings['MAX_LAG']:
+                unavailable.append(alias)
+                self.stdout.write(self.style.WARNING(f'{alias:<12} {lag:.1f} s de retard (écarté au-delà de {settings["MAX_LAG"]} s)'))
+            else:
+                self.stdout.write(f'{alias:<12} {lag:.1f} s de retard')
+        
+        self.stdout.write(f'Après une écriture, son auteur lit la base principale pendant {pin_seconds(settings)} s.')
+        if unavailable and options['check']:
+            raise CommandError(f'{len(unavailable)} réplica(s) indisponible(s).')
+        available = len(settings['REPLICAS']) - len(unavailable)
+        self.stdout.write(self.style.SUCCESS(f'{available} réplica(s) utilisable(s) sur {len(settings["REPLICAS"])}.'))
@@ -0,0 +1,52 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework.permissions import SAFE_METHODS
+
+from .routing import current, get_options, pin
+
+
+def pin_author(request, response):
+    """Pin the author of a successful write to the primary."""
+    if (
+        get_options()['REPLICAS']
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        # Set by DRF once the JWT is authenticated
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin(user)
+
+
+class ReplicaMiddleware:
+    """Scope the replica choice to one request and pin the authors of successful writes."""
+    
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = current.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        pin_author(request, response)
+        return response
+    
+    async def __acall__(self, request):
+        token = current.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        if request.method not in SAFE_METHODS:
+            # request.user may still be the lazy session user, loaded from the database
+            await sync_to_async(pin_author)(request, response)
+        return response
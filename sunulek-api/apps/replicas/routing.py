@@ -0,0 +1,172 @@
+"""
+Read replicas.
+
+Views that opt in with ReplicaReadMixin run the queries of their safe
+(GET, HEAD, OPTIONS) requests on a replica. Everything else stays on the
+primary (`default`), and so does every request of a user for a short time
+after one of their writes, so they always read what they just wrote.
+
+A replica is used only while its replication lag, measured at most every
+LAG_CHECK_INTERVAL seconds, is below MAX_LAG. The authors of a write are
+pinned to the primary for MAX_LAG + LAG_CHECK_INTERVAL seconds: by then,
+any replica still in use has replayed it.
+"""
+
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Replica the reads of the current request go to (None: the primary)
+current = ContextVar('replica', default=None)
+
+# 0 when the replica has replayed everything it received, so an idle
+# primary does not look like lag
+POSTGRES_LAG = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def get_options():
+    return {
+        'REPLICAS': [],            # Database aliases of the replicas
+        'MAX_LAG': 5,              # Seconds
+        'LAG_CHECK_INTERVAL': 5,   # Seconds
+        # Apps read from the primary even on replica requests: cache table, throttling counters
+        'PRIMARY_APPS': ['django_cache', 'throttling'],
+        **getattr(settings, 'READ_REPLICAS', {}),
+    }
+
+
+def pin_seconds(options):
+    return options['MAX_LAG'] + options['LAG_CHECK_INTERVAL']
+
+
+def measure_lag(alias):
+    """Replication lag of `alias` in seconds, or None if it cannot be reached."""
+    conn = connections[alias]
+    try:
+        if conn.vendor != 'postgresql':
+            # No replication to measure (SQLite stand-ins in development)
+            conn.ensure_connection()
+            return 0.0
+        with conn.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    return float(lag or 0)
+
+
+class ReplicaPool:
+    """The replicas of this process and their last measured lag."""
+    
+    def __init__(self, options):
+        self.options = options
+        self.checked = {}  # alias -> (monotonic time, lag)
+    
+    def lag(self, alias):
+        checked = self.checked.get(alias)
+        now = time.monotonic()
+        if checked is None or now - checked[0] >= self.options['LAG_CHECK_INTERVAL']:
+            checked = self.checked[alias] = (now, measure_lag(alias))
+        return checked[1]
+    
+    def available(self):
+        """Replicas reachable and within MAX_LAG."""
+        return [
+            alias for alias in self.options['REPLICAS']
+            if (lag := self.lag(alias)) is not None and lag <= self.options['MAX_LAG']
+        ]
+    
+    def choose(self):
+        aliases = self.available()
+        return random.choice(aliases) if aliases else None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ReplicaPool(get_options())
+    return _pool
+
+
+def reset_pool(setting, **kwargs):
+    global _pool
+    if setting == 'READ_REPLICAS':
+        _pool = None
+
+
+setting_changed.connect(reset_pool)
+
+
+def pin_key(user_id):
+    return f'replicas:pin:{user_id}'
+
+
+def pin(user):
+    """Keep `user` on the primary until their writes have reached the replicas."""
+    cache.set(pin_key(user.pk), 1, pin_seconds(get_options()))
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(pin_key(user.pk)) is not None
+
+
+class ReplicaRouter:
+    """Send the reads of replica requests to their replica, and every write to the primary."""
+    
+    def db_for_read(self, model, **hints):
+        alias = current.get()
+        if alias is not None and model._meta.app_label not in get_options()['PRIMARY_APPS']:
+            return alias
+        return None
+    
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, *get_options()['REPLICAS']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        if db in get_options()['REPLICAS']:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Run the queries of safe requests on a replica.
+    
+    The switch happens once the request is authenticated, permitted and
+    throttled, so those checks still read the primary.
+    """
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            get_options()['REPLICAS']
+            and request.method in SAFE_METHODS
+            and not is_pinned(request.user)
+        ):
+            current.set(get_pool().choose())
@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.annonces.models import Ad
+from apps.categories.models import Category
+from apps.locations.matching import clear_index
+from apps.throttling.models import ThrottleCounter
+from apps.users.models import User
+
+from . import routing
+
+REPLICAS = {'REPLICAS': ['mirror'], 'MAX_LAG': 5, 'LAG_CHECK_INTERVAL': 5}
+
+
+@contextmanager
+def queries_on(alias):
+    """Collect the SQL run on the connection of `alias`."""
+    queries = []
+    
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+    
+    with connections[alias].execute_wrapper(record):
+        yield queries
+
+
+@override_settings(READ_REPLICAS=REPLICAS)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routing with 'mirror', a second connection to the primary (see settings.py).
+    
+    TransactionTestCase: the mirror is a connection of its own, it only sees
+    committed rows. serialized_rollback restores the location reference
+    data after each flush.
+    """
+    
+    databases = {'default', 'mirror'}
+    serialized_rollback = True
+    
+    def setUp(self):
+        routing._pool = None
+        cache.clear()
+        clear_index()
+        self.author = User.objects.create_user('author@example.sn', 'author', 'Awa', 'Diop', 'password')
+        self.reader = User.objects.create_user('reader@example.sn', 'reader', 'Moussa', 'Fall', 'password')
+        self.category = Category.objects.create(name='Véhicules', slug='vehicules')
+        self.ad = Ad.objects.create(
+            title='Toyota Corolla', slug='toyota-corolla', description='Bon état.', price=Decimal(1_500_000),
+            user=self.author, category=self.category, region='Dakar', department='Pikine', status='active',
+        )
+    
+    def tearDown(self):
+        routing._pool = None
+        cache.clear()
+    
+    def client_for(self, user):
+        client = APIClient()
+        if user.is_authenticated:
+            client.force_authenticate(user)
+        return client
+    
+    def get_ads(self, user=None):
+        # Authenticated by default: anonymous responses are cached
+        user = user or self.reader
+        with queries_on('mirror') as replica, queries_on('default') as primary:
+            response = self.client_for(user).get('/api/v1/annonces/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        return replica, primary
+    
+    def test_safe_reads_go_to_the_replica(self):
+        for user in (self.reader, AnonymousUser()):
+            with self.subTest(user=user):
+                replica, primary = self.get_ads(user)
+                self.assertTrue(any('annonces_ad' in sql for sql in replica))
+                self.assertFalse(any('annonces_ad' in sql for sql in primary))
+    
+    def test_views_without_the_mixin_read_the_primary(self):
+        with queries_on('mirror') as replica:
+            response = self.client_for(self.reader).get('/api/v1/favorites/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, [])
+    
+    def test_author_is_pinned_to_the_primary_after_a_write(self):
+        with queries_on('mirror') as replica:
+            response = self.client_for(self.author).patch(
+                f'/api/v1/annonces/{self.ad.slug}/', {'title': 'Toyota Corolla 2015'}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, [])
+        
+        replica, _ = self.get_ads(self.author)
+        self.assertEqual(replica, [])
+        # Other users still read the replica
+        replica, _ = self.get_ads(self.reader)
+        self.assertNotEqual(replica, [])
+        
+        # Until the pin expires
+        cache.delete(routing.pin_key(self.author.pk))
+        replica, _ = self.get_ads(self.author)
+        self.assertNotEqual(replica, [])
+    
+    def test_failed_write_does_not_pin(self):
+        response = self.client_for(self.reader).patch(
+            f'/api/v1/annonces/{self.ad.slug}/', {'title': 'Pas à moi'}, format='json',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(routing.is_pinned(self.reader))
+    
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch.object(routing, 'measure_lag', return_value=REPLICAS['MAX_LAG'] + 1):
+            replica, primary = self.get_ads()
+            self.assertEqual(routing.get_pool().available(), [])
+        self.assertEqual(replica, [])
+        self.assertTrue(any('annonces_ad' in sql for sql in primary))
+    
+    def test_unreachable_replica_is_skipped(self):
+        with mock.patch.object(routing, 'measure_lag', return_value=None):
+            replica, _ = self.get_ads()
+        self.assertEqual(replica, [])
+    
+    def test_lag_is_measured_once_per_interval(self):
+        with mock.patch.object(routing, 'measure_lag', return_value=0.0) as measure_lag:
+            self.get_ads()
+            self.get_ads()
+        measure_lag.assert_called_once_with('mirror')
+    
+    def test_router(self):
+        router = routing.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Ad))
+        token = routing.current.set('mirror')
+        try:
+            self.assertEqual(router.db_for_read(Ad), 'mirror')
+            # Throttling counters and the cache table stay on the primary
+            self.assertIsNone(router.db_for_read(ThrottleCounter))
+            self.assertEqual(router.db_for_write(Ad), 'default')
+        finally:
+            routing.current.reset(token)
+        self.assertFalse(router.allow_migrate('mirror', 'annonces'))
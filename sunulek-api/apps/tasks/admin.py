@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('created_at', 'updated_at', 'locked_at', 'last_error')
+    actions = ['requeue']
+    
+    @admin.action(description='Relancer les tâches sélectionnées')
+    def requeue(self, request, queryset):
+        queryset.update(status=Job.Status.PENDING, attempts=0, run_at=timezone.now(), locked_at=None)
@@ -0,0 +1,36 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.tasks.queue import get_options
+from apps.tasks.worker import Scheduler, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Exécute les tâches de fond en attente (emails, images, ...) et les tâches périodiques (TASKS[\'PERIODIC\']).'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Traiter les tâches dues puis s\'arrêter.')
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--sleep', type=float, default=1.0, help='Pause quand la file est vide (secondes).')
+        parser.add_argument('--no-periodic', action='store_true', help='Ne pas exécuter les tâches périodiques.')
+    
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        scheduler = Scheduler({} if options['no_periodic'] else get_options()['PERIODIC'])
+        
+        while self.running:
+            close_old_connections()
+            scheduler.run_due()
+            processed = run_pending(options['batch_size'])
+            if options['once'] and not processed:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
+    
+    def stop(self, *args):
+        self.running = False
@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A queued call to a function registered with @task."""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'En attente'
+        RUNNING = 'running', 'En cours'
+        DEAD = 'dead', 'Abandonnée'
+    
+    name = models.CharField(max_length=200, verbose_name='Tâche')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    
+    # Status
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Statut'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives')
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name='Tentatives max')
+    last_error = models.TextField(blank=True, verbose_name='Dernière erreur')
+    
+    # Timestamps
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='Exécuter à partir de')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Tâche'
+        verbose_name_plural = 'Tâches'
+        ordering = ['run_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
@@ -0,0 +1,58 @@
+"""
+Database-backed task queue.
+
+Functions decorated with @task are enqueued with `.delay(...)` as Job rows
+and executed by `manage.py run_tasks`, with retries, exponential backoff
+and dead-lettering. With TASKS['ALWAYS_SYNC'] they run in-process after the
+current transaction commits (tests, local development).
+
+Arguments must be JSON-serializable: pass ids, not model instances.
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job
+
+
+def get_options():
+    return {
+        'ALWAYS_SYNC': False,
+        'BACKOFF_BASE': 10,
+        'BACKOFF_MAX': 3600,
+        'LOCK_TIMEOUT': 600,
+        'PERIODIC': {},
+        **getattr(settings, 'TASKS', {}),
+    }
+
+
+class Task:
+    """A function that can be run in the background."""
+    
+    def __init__(self, func, max_attempts):
+        self.func = func
+        self.max_attempts = max_attempts
+        self.name = f'{func.__module__}.{func.__name__}'
+        self.__doc__ = func.__doc__
+    
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+    
+    def delay(self, *args, **kwargs):
+        """Queue a call. Nothing runs before the current transaction commits."""
+        if get_options()['ALWAYS_SYNC']:
+            transaction.on_commit(lambda: self.func(*args, **kwargs))
+            return None
+        return Job.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=self.max_attempts,
+        )
+
+
+def task(func=None, *, max_attempts=5):
+    """Register a function as a task: `@task` or `@task(max_attempts=3)`."""
+    if func is None:
+        return lambda f: Task(f, max_attempts)
+    return Task(func, max_attempts)
@@ -0,0 +1,101 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+from .queue import get_options
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(attempts, options):
+    """Seconds to wait before the next attempt."""
+    return min(options['BACKOFF_BASE'] * 2 ** (attempts - 1), options['BACKOFF_MAX'])
+
+
+def requeue_stale(options):
+    """Put back jobs whose worker died while running them."""
+    limit = timezone.now() - timedelta(seconds=options['LOCK_TIMEOUT'])
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=limit).update(
+        status=Job.Status.PENDING, locked_at=None
+    )
+
+
+def claim(batch_size):
+    """Lock a batch of due jobs for this worker (other workers skip them)."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.PENDING, run_at__lte=now)
+            .order_by('run_at')[:batch_size]
+        )
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.Status.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def execute(job, options):
+    try:
+        import_string(job.name)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('Tâche %s abandonnée après %s tentatives', job.name, job.attempts)
+            Job.objects.filter(pk=job.pk).update(status=Job.Status.DEAD, last_error=error, locked_at=None)
+        else:
+            run_at = timezone.now() + timedelta(seconds=backoff(job.attempts, options))
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.Status.PENDING, last_error=error, locked_at=None, run_at=run_at
+            )
+        return False
+    job.delete()
+    return True
+
+
+def run_pending(batch_size=10):
+    """Run one batch of due jobs. Returns the number of jobs processed."""
+    options = get_options()
+    requeue_stale(options)
+    jobs = claim(batch_size)
+    for job in jobs:
+        execute(job, options)
+    return len(jobs)
+
+
+class Scheduler:
+    """
+    Run the functions of TASKS['PERIODIC'] from the worker loop.
+    
+    Each function is called at startup, then every `interval` seconds; an
+    error is logged and the function is retried at its next run. Every
+    worker runs them, so they must be safe to run concurrently.
+    """
+    
+    def __init__(self, periodic):
+        self.periodic = periodic
+        self.next_run = dict.fromkeys(periodic, 0.0)
+    
+    def run_due(self):
+        """Run the functions whose interval has elapsed. Returns how many ran."""
+        ran = 0
+        for name, interval in self.periodic.items():
+            now = time.monotonic()
+            if now < self.next_run[name]:
+                continue
+            self.next_run[name] = now + interval
+            try:
+                import_string(name)()
+            except Exception:
+                logger.exception('Tâche périodique %s en échec', name)
+            ran += 1
+        return ran
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ThrottleCounter
+
+
+@admin.register(ThrottleCounter)
+class ThrottleCounterAdmin(admin.ModelAdmin):
+    list_display = ('key', 'window', 'count', 'expires_at')
+    search_fields = ('key',)
+    readonly_fields = ('key', 'window', 'count', 'expires_at')
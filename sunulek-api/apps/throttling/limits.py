@@ -0,0 +1,144 @@
+"""
+Sliding-window rate limits.
+
+Each rule counts hits in fixed windows of its period and weighs the
+previous window by the share of it still inside the sliding period:
+
+    count = current + previous * (1 - elapsed / period)
+
+which approximates a true sliding log with two counters per key, on the
+strict side (with a limit of 1, the wait can reach two periods). Only
+accepted hits are counted, so a client that keeps hammering a limit is not
+locked out longer than the period.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+Rate = namedtuple('Rate', ['limit', 'period'])
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_options():
+    return {
+        'ENABLED': True,
+        'STORE': 'apps.throttling.stores.CacheStore',
+        'FALLBACK_STORE': 'apps.throttling.stores.MemoryStore',
+        'RATES': {},
+        **getattr(settings, 'THROTTLING', {}),
+    }
+
+
+def parse_rate(rate):
+    """'10/min', '5/10m', '100/day' -> Rate(limit, period in seconds)."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d*)\s*([smhd])[a-z]*\s*', rate)
+    if match is None:
+        raise ValueError(f'Limite invalide : {rate!r}')
+    limit, multiplier, unit = match.groups()
+    return Rate(int(limit), int(multiplier or 1) * PERIODS[unit])
+
+
+def get_rules(scope):
+    """[(kind, Rate)] configured for `scope`: kinds are 'user', 'ip' or any key the caller provides."""
+    config = get_options()['RATES'].get(scope, {})
+    rules = []
+    for kind, rates in config.items():
+        for rate in [rates] if isinstance(rates, str) else rates:
+            rules.append((kind, parse_rate(rate)))
+    return rules
+
+
+class Limiter:
+    """Check and count hits against a store, falling back to another when it fails."""
+    
+    def __init__(self, options):
+        self.store = import_string(options['STORE'])(options)
+        fallback = options.get('FALLBACK_STORE')
+        self.fallback = import_string(fallback)(options) if fallback else None
+    
+    def call(self, method, *args):
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception:
+            if self.fallback is None:
+                raise
+            logger.warning('Stockage de limitation indisponible, repli local', exc_info=True)
+            return getattr(self.fallback, method)(*args)
+    
+    def hit(self, scope, checks, now=None):
+        """
+        Count one hit for every (ident_key, Rate) in `checks` if all of them allow it.
+        
+        Returns (allowed, retry_after_seconds).
+        """
+        now = time.time() if now is None else now
+        windows = []
+        for key, rate in checks:
+            window = int(now // rate.period)
+            windows.append((f'{scope}:{rate.limit}/{rate.period}:{key}', window, rate))
+        counts = self.call('get_counts', [
+            (key, index) for key, window, _ in windows for index in (window - 1, window)
+        ])
+        
+        wait = 0
+        for key, window, rate in windows:
+            current = counts.get((key, window), 0)
+            previous = counts.get((key, window - 1), 0)
+            elapsed = now - window * rate.period
+            if current + previous * (1 - elapsed / rate.period) + 1 > rate.limit:
+                wait = max(wait, retry_after(rate, current, previous, elapsed))
+        if wait:
+            return False, wait
+        
+        for key, window, rate in windows:
+            self.call('increment', key, window, 2 * rate.period)
+        return True, 0
+
+
+def retry_after(rate, current, previous, elapsed):
+    """Seconds until one more hit fits, assuming no other hit is accepted meanwhile."""
+    room = rate.limit - 1
+    if current <= room and previous:
+        # The previous window's weight has to decay
+        fraction = 1 - (room - current) / previous
+        return max(1, math.ceil(fraction * rate.period - elapsed))
+    # Wait for the next window, then for the current one to decay
+    fraction = 1 - room / current if current else 0
+    return max(1, math.ceil(rate.period - elapsed + fraction * rate.period))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = Limiter(get_options())
+    return _limiter
+
+
+def check(scope, idents):
+    """
+    Count a hit of `scope` for the given {kind: ident} and return (allowed, retry_after).
+    
+    Kinds without an ident (e.g. 'user' for an anonymous request) are skipped.
+    """
+    if not get_options()['ENABLED']:
+        return True, 0
+    checks = [(f'{kind}:{idents[kind]}', rate) for kind, rate in get_rules(scope) if idents.get(kind)]
+    if not checks:
+        return True, 0
+    return get_limiter().hit(scope, checks)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=200)),
+                ("window", models.BigIntegerField(verbose_name="Fenêtre")),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("expires_at", models.DateTimeField(verbose_name="Expire le")),
+            ],
+            options={
+                "verbose_name": "Compteur de limitation",
+                "verbose_name_plural": "Compteurs de limitation",
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="throttling__expires_5b78a1_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("key", "window"),
+                        name="throttling_counter_key_window_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ThrottleCounter(models.Model):
+    """Hits of one throttling key in one window (DatabaseStore)."""
+    
+    key = models.CharField(max_length=200)
+    window = models.BigIntegerField(verbose_name='Fenêtre')
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(verbose_name='Expire le')
+    
+    class Meta:
+        verbose_name = 'Compteur de limitation'
+        verbose_name_plural = 'Compteurs de limitation'
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'window'], name='throttling_counter_key_window_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.key} @ {self.window} : {self.count}'
@@ -0,0 +1,123 @@
+"""
+Counter stores for the throttles.
+
+A store keeps one integer per (key, window) for at least `ttl` seconds.
+CacheStore shares counters between workers through the Django cache
+(Redis/Memcached, or DatabaseCache); DatabaseStore uses its own table when
+no shared cache is available; MemoryStore counts per process only.
+"""
+
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class BaseStore:
+    """Interface for counter stores."""
+    
+    def __init__(self, options):
+        self.options = options
+    
+    def get_counts(self, keys):
+        """{(key, window): count} for the given (key, window) pairs; missing counters are omitted."""
+        raise NotImplementedError
+    
+    def increment(self, key, window, ttl):
+        raise NotImplementedError
+
+
+class CacheStore(BaseStore):
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self.cache = caches[options.get('CACHE', 'default')]
+    
+    def cache_key(self, key, window):
+        return f'throttle:{key}:{window}'
+    
+    def get_counts(self, keys):
+        names = {self.cache_key(key, window): (key, window) for key, window in keys}
+        return {names[name]: count for name, count in self.cache.get_many(list(names)).items()}
+    
+    def increment(self, key, window, ttl):
+        name = self.cache_key(key, window)
+        if self.cache.add(name, 1, ttl):
+            return
+        try:
+            self.cache.incr(name)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(name, 1, ttl)
+
+
+class MemoryStore(BaseStore):
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._last_prune = time.monotonic()
+    
+    def get_counts(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                item: self._counts[item][0]
+                for item in keys
+                if item in self._counts and self._counts[item][1] > now
+            }
+    
+    def increment(self, key, window, ttl):
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._counts.get((key, window), (0, now + ttl))
+            if expires <= now:
+                count, expires = 0, now + ttl
+            self._counts[(key, window)] = (count + 1, expires)
+            if now - self._last_prune > 60:
+                self._counts = {item: value for item, value in self._counts.items() if value[1] > now}
+                self._last_prune = now
+
+
+class DatabaseStore(BaseStore):
+    """
+    Counters in the ThrottleCounter table.
+    
+    Expired rows are deleted by about one increment in PURGE_EVERY.
+    """
+    
+    def get_counts(self, keys):
+        from .models import ThrottleCounter
+        
+        if not keys:
+            return {}
+        rows = ThrottleCounter.objects.filter(
+            key__in={key for key, _ in keys},
+            window__in={window for _, window in keys},
+            expires_at__gt=timezone.now(),
+        ).values_list('key', 'window', 'count')
+        wanted = set(keys)
+        return {(key, window): count for key, window, count in rows if (key, window) in wanted}
+    
+    def increment(self, key, window, ttl):
+        from .models import ThrottleCounter
+        
+        counters = ThrottleCounter.objects.filter(key=key, window=window)
+        if not counters.update(count=F('count') + 1):
+            try:
+                with transaction.atomic():
+                    ThrottleCounter.objects.create(
+                        key=key, window=window, count=1,
+                        expires_at=timezone.now() + timedelta(seconds=ttl),
+                    )
+            except IntegrityError:
+                # Created by a concurrent request
+                counters.update(count=F('count') + 1)
+        if random.randrange(self.options.get('PURGE_EVERY', 1000)) == 0:
+            ThrottleCounter.objects.filter(expires_at__lte=timezone.now()).delete()
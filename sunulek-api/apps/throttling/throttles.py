@@ -0,0 +1,47 @@
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .limits import check
+
+
+def get_scope(view):
+    """`throttle_scopes[action]` for viewsets, else `throttle_scope`."""
+    scopes = getattr(view, 'throttle_scopes', None)
+    if scopes:
+        scope = scopes.get(getattr(view, 'action', None))
+        if scope:
+            return scope
+    return getattr(view, 'throttle_scope', None)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Apply the THROTTLING['RATES'] of the view's scope, per user and per IP,
+    and per 'key' when the view defines get_throttle_key(request).
+    
+    Views without a scope are not limited. DRF answers refused requests with
+    429 and a Retry-After header.
+    """
+    
+    def allow_request(self, request, view):
+        scope = get_scope(view)
+        if scope is None:
+            return True
+        user = request.user
+        idents = {
+            'user': user.pk if user and user.is_authenticated else None,
+            'ip': self.get_ident(request),
+            'key': view.get_throttle_key(request) if hasattr(view, 'get_throttle_key') else None,
+        }
+        allowed, self.retry_after = check(scope, idents)
+        return allowed
+    
+    def wait(self):
+        return self.retry_after
+
+
+def throttle(scope, ident):
+    """Apply the 'key' rules of `scope` to a value chosen by the view (e.g. an email), raising Throttled."""
+    allowed, retry_after = check(scope, {'key': ident})
+    if not allowed:
+        raise Throttled(wait=retry_after)
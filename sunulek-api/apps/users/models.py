@@ -55,18 +55,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         return f'{self.first_name} {self.last_name}'
     
     def generate_verification_code(self):
-        """Generate a 6-digit verification code with rate limiting."""
-        now = timezone.now()
-        
-        # Rate limit: 1 minute between requests
-        if self.email_verification_code_sent_at:
-            time_diff = (now - self.email_verification_code_sent_at).total_seconds()
-            if time_diff < 60:
-                return None
-        
+        """Generate a 6-digit verification code (rate limited by the `verification_email` throttle scope)."""
         code = ''.join(random.choices(string.digits, k=6))
         self.email_verification_code = code
-        self.email_verification_code_sent_at = now
+        self.email_verification_code_sent_at = timezone.now()
         self.save(update_fields=['email_verification_code', 'email_verification_code_sent_at'])
         return code
     
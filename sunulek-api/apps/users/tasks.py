@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from apps.tasks.queue import task
+
+
+@task(max_attempts=5)
+def send_email(subject, message, recipient_list):
+    """Send an email; SMTP errors are retried by the task worker."""
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=recipient_list,
+        fail_silently=False,
+    )
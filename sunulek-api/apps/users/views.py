@@ -1,11 +1,11 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.conf import settings
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 from .serializers import (
@@ -18,39 +18,46 @@ from .serializers import (
     UpdateProfileSerializer,
     PublicProfileSerializer,
 )
+from .tasks import send_email
+from apps.annonces.async_views import AsyncViewMixin, serialize
+from apps.throttling.throttles import throttle
+from apps.replicas.routing import ReplicaReadMixin
 
 User = get_user_model()
 
 
 @extend_schema(tags=['Authentication'])
-class RegisterView(generics.CreateAPIView):
-    """Register a new user."""
+class RegisterView(AsyncViewMixin, generics.CreateAPIView):
+    """Register a new user. Async: see apps.annonces.async_views."""
     
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
     
-    def create(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        
-        # Generate and send verification code
-        code = user.generate_verification_code()
-        if code:
-            send_mail(
-                subject='SunuLek - Code de confirmation',
-                message=f'Bonjour {user.first_name},\n\nVotre code de confirmation est : {code}\n\nCe code expire dans 10 minutes.',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=True,
-            )
+        user = await sync_to_async(self.register)(serializer)
         
         return Response({
             'message': 'Inscription réussie. Un code de confirmation a été envoyé à votre email.',
             'user_id': user.id,
             'email': user.email,
         }, status=status.HTTP_201_CREATED)
+    
+    def register(self, serializer):
+        """Create the account (password hashing) and send its verification code."""
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        
+        # Generate and send verification code
+        code = user.generate_verification_code()
+        send_email.delay(
+            subject='SunuLek - Code de confirmation',
+            message=f'Bonjour {user.first_name},\n\nVotre code de confirmation est : {code}\n\nCe code expire dans 10 minutes.',
+            recipient_list=[user.email],
+        )
+        return user
 
 
 @extend_schema(tags=['Authentication'])
@@ -58,6 +65,13 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """Login with email and password, get JWT tokens."""
     
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = 'login'
+    
+    def get_throttle_key(self, request):
+        """Client IP and account: users sharing a carrier NAT address do not share a limit."""
+        data = request.data if hasattr(request.data, 'get') else {}
+        account = str(data.get(User.USERNAME_FIELD, '')).strip().lower()
+        return f'{BaseThrottle().get_ident(request)}:{account}' if account else None
 
 
 @extend_schema(tags=['Authentication'])
@@ -66,8 +80,11 @@ class VerifyEmailView(APIView):
     
     permission_classes = [permissions.AllowAny]
     serializer_class = VerifyEmailSerializer
+    throttle_scope = 'verify_email'
     
     def post(self, request, user_id):
+        # Attempts per account, whatever the IP: the code has only 6 digits
+        throttle('verify_email_account', user_id)
         serializer = VerifyEmailSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -89,18 +106,19 @@ class VerifyEmailView(APIView):
 
 
 @extend_schema(tags=['Authentication'])
-class ResendVerificationView(APIView):
-    """Resend email verification code."""
+class ResendVerificationView(AsyncViewMixin, APIView):
+    """Resend email verification code. Async: see apps.annonces.async_views."""
     
     permission_classes = [permissions.AllowAny]
     serializer_class = ResendVerificationSerializer
+    throttle_scope = 'verification'
     
-    def post(self, request):
+    async def post(self, request):
         serializer = ResendVerificationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         try:
-            user = User.objects.get(email=serializer.validated_data['email'])
+            user = await User.objects.aget(email=serializer.validated_data['email'])
         except User.DoesNotExist:
             return Response(
                 {'error': 'Utilisateur non trouvé.'},
@@ -113,20 +131,16 @@ class ResendVerificationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        await sync_to_async(self.send_code)(user)
+        return Response({'message': 'Nouveau code envoyé.'})
+    
+    def send_code(self, user):
+        throttle('verification_email', user.pk)
         code = user.generate_verification_code()
-        if code:
-            send_mail(
-                subject='SunuLek - Nouveau code de confirmation',
-                message=f'Bonjour {user.first_name},\n\nVotre nouveau code est : {code}',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=True,
-            )
-            return Response({'message': 'Nouveau code envoyé.'})
-        
-        return Response(
-            {'error': 'Veuillez attendre 1 minute avant de redemander un code.'},
-            status=status.HTTP_429_TOO_MANY_REQUESTS
+        send_email.delay(
+            subject='SunuLek - Nouveau code de confirmation',
+            message=f'Bonjour {user.first_name},\n\nVotre nouveau code est : {code}',
+            recipient_list=[user.email],
         )
 
 
@@ -191,10 +205,18 @@ class LogoutView(APIView):
 
 
 @extend_schema(tags=['User Profile'])
-class PublicProfileView(generics.RetrieveAPIView):
-    """Get public profile of a user by ID."""
+class PublicProfileView(ReplicaReadMixin, AsyncViewMixin, generics.RetrieveAPIView):
+    """
+    Get public profile of a user by ID, read from a replica when one is configured.
+    
+    Async: see apps.annonces.async_views.
+    """
     
     serializer_class = PublicProfileSerializer
     permission_classes = [permissions.AllowAny]
     queryset = User.objects.all()
     lookup_field = 'id'
+    
+    async def get(self, request, *args, **kwargs):
+        user = await sync_to_async(self.get_object)()
+        return Response(await serialize(self.get_serializer(user)))
@@ -8,6 +8,8 @@ urlpatterns = [
     path('auth/', include('apps.users.urls')),
     path('annonces/', include('apps.annonces.urls')),
     path('categories/', include('apps.categories.urls')),
+    path('locations/', include('apps.locations.urls')),
     path('favorites/', include('apps.favorites.urls')),
     path('conversations/', include('apps.messages.urls')),
+    path('monitoring/', include('apps.monitoring.urls')),
 ]
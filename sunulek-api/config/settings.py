@@ -41,8 +41,14 @@ LOCAL_APPS = [
     'apps.users',
     'apps.annonces',
     'apps.categories',
+    'apps.locations',
     'apps.favorites',
     'apps.messages',
+    'apps.tasks',
+    'apps.benchmarks',
+    'apps.monitoring',
+    'apps.throttling',
+    'apps.replicas',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -53,15 +59,26 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # After WhiteNoise so static files are not measured
+    'apps.monitoring.middleware.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.replicas.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# How docker-entrypoint.sh serves the API: 'wsgi' (gunicorn sync workers and
+# threads) or 'asgi' (uvicorn workers, async views run on the event loop)
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+if SERVER_MODE == 'asgi':
+    # WhiteNoise is sync-only and would move every request back to a thread;
+    # nginx serves /static/ in this mode
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 # =============================================================================
@@ -96,9 +113,86 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Persistent connections: reused for this many seconds (0 = one per request),
+        # and checked before reuse so a connection dropped by the server is replaced
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Threads per gunicorn worker (docker-entrypoint.sh): each uses at most one
+# connection per database, so a worker needs GUNICORN_THREADS connections
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=2, cast=int)
+
+if SERVER_MODE == 'asgi':
+    # Each ASGI request runs its sync code in a thread of its own: a persistent
+    # connection would never be reused. Use DB_POOL to bound connections instead
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# Connection pooling: '' (persistent connections only), 'psycopg' (psycopg 3
+# pool in each worker) or 'pgbouncer' (behind PgBouncer in transaction mode)
+DB_POOL = config('DB_POOL', default='')
+if DB_POOL == 'psycopg':
+    # Connections go back to the pool at the end of each request instead
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=GUNICORN_THREADS, cast=int),
+            # Seconds a request waits for a free connection before failing
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        },
+    }
+elif DB_POOL == 'pgbouncer':
+    # A transaction may run on another server connection than the previous one:
+    # no server-side cursors (QuerySet.iterator()) across transactions
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replicas: one alias per entry of DB_REPLICA_HOSTS (host or host:port),
+# with the primary's name and credentials
+REPLICA_ALIASES = []
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica.partition(':')
+    REPLICA_ALIASES.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# A second connection to the primary, never read unless listed in
+# READ_REPLICAS: the routing tests (apps/replicas/tests.py) use it as a replica
+DATABASES['mirror'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['apps.replicas.routing.ReplicaRouter']
+
+# Safe requests of the views using ReplicaReadMixin read a replica (apps.replicas.routing)
+READ_REPLICAS = {
+    'REPLICAS': REPLICA_ALIASES,
+    # Replicas further behind are skipped; authors of a write read the
+    # primary for MAX_LAG + LAG_CHECK_INTERVAL seconds
+    'MAX_LAG': config('REPLICA_MAX_LAG', default=5, cast=float),
+    'LAG_CHECK_INTERVAL': config('REPLICA_LAG_CHECK_INTERVAL', default=5, cast=float),
+}
+
+# =============================================================================
+# CACHE
+# =============================================================================
+# LocMemCache is per process: use a shared memory backend (RedisCache,
+# PyMemcacheCache) as soon as several workers serve the API, or invalidations
+# are not seen by all. DatabaseCache costs SQL queries per read: the response
+# cache is off on it (apps.annonces.caching)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='sunulek'),
+    }
+}
+
+# Seconds an anonymous response stays cached (apps.annonces.caching)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================
@@ -122,11 +216,49 @@ USE_TZ = True
 # =============================================================================
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media (ad photos, avatars, category images): local disk served by nginx, or
+# an S3-compatible bucket (AWS, MinIO, Scaleway...) with
+# STORAGE_BACKEND=storages.backends.s3.S3Storage (django-storages)
+STORAGE_BACKEND = config('STORAGE_BACKEND', default='django.core.files.storage.FileSystemStorage')
+STORAGE_OPTIONS = {}
+if STORAGE_BACKEND == 'storages.backends.s3.S3Storage':
+    STORAGE_OPTIONS = {
+        'bucket_name': config('S3_BUCKET_NAME'),
+        'endpoint_url': config('S3_ENDPOINT_URL', default='') or None,  # e.g. http://minio:9000
+        'region_name': config('S3_REGION_NAME', default='') or None,
+        'access_key': config('S3_ACCESS_KEY_ID', default='') or None,
+        'secret_key': config('S3_SECRET_ACCESS_KEY', default='') or None,
+        'custom_domain': config('S3_CUSTOM_DOMAIN', default='') or None,  # Public host of the bucket / CDN
+        'querystring_auth': False,  # Media are public, URLs are not signed
+        'file_overwrite': False,
+        'signature_version': 's3v4',
+    }
+
+STORAGES = {
+    'default': {
+        'BACKEND': STORAGE_BACKEND,
+        'OPTIONS': STORAGE_OPTIONS,
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Stream every upload to a temporary file in 64 KB chunks instead of keeping
+# small ones in memory: memory per request stays bounded whatever is sent
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+DATA_UPLOAD_MAX_NUMBER_FILES = 20
+
+AD_IMAGES = {
+    'MAX_PER_AD': config('AD_IMAGES_MAX_PER_AD', default=10, cast=int),
+    'MAX_FILE_SIZE': config('AD_IMAGES_MAX_FILE_SIZE', default=10 * 1024 * 1024, cast=int),  # Bytes
+    'UPLOAD_EXPIRY': config('AD_IMAGES_UPLOAD_EXPIRY', default=600, cast=int),  # Seconds a presigned upload stays valid
+}
+
 # =============================================================================
 # AUTH
 # =============================================================================
@@ -148,6 +280,15 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'apps.annonces.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'apps.throttling.throttles.SlidingWindowThrottle',
+    ),
+    # Reverse proxies in front of the API: the client IP is taken from X-Forwarded-For (0 = REMOTE_ADDR)
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -206,3 +347,90 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@sunulek.com')
+
+# =============================================================================
+# REAL-TIME MESSAGES (Server-Sent Events, served by config.asgi)
+# =============================================================================
+REALTIME = {
+    # InMemoryChannelLayer (single process) or PostgresChannelLayer (LISTEN/NOTIFY)
+    'CHANNEL_LAYER': config('REALTIME_CHANNEL_LAYER', default='apps.messages.events.InMemoryChannelLayer'),
+    'KEEPALIVE': config('REALTIME_KEEPALIVE', default=25, cast=int),  # Seconds between keepalive comments
+}
+
+# =============================================================================
+# BACKGROUND TASKS (apps.tasks, worker: `manage.py run_tasks`)
+# =============================================================================
+TASKS = {
+    # Run tasks in-process after commit instead of queueing them (tests, local dev)
+    'ALWAYS_SYNC': config('TASKS_ALWAYS_SYNC', default=DEBUG, cast=bool),
+    'BACKOFF_BASE': 10,  # Seconds before the first retry, doubled on each attempt
+    'BACKOFF_MAX': 3600,
+    'LOCK_TIMEOUT': 600,  # Running jobs older than this are requeued
+    # Functions run by every worker, with the seconds between two runs
+    'PERIODIC': {
+        'apps.annonces.counters.flush_views': config('AD_VIEWS_FLUSH_INTERVAL', default=60, cast=int),
+        'apps.annonces.lifecycle.sweep': config('AD_SWEEP_INTERVAL', default=3600, cast=int),
+    },
+}
+
+# =============================================================================
+# AD LIFECYCLE (expiry and trash purge: run_tasks worker, or `manage.py sweep_ads`)
+# =============================================================================
+AD_LIFECYCLE = {
+    'DURATION_DAYS': config('AD_DURATION_DAYS', default=60, cast=int),  # Days an ad stays online
+    'PURGE_AFTER_DAYS': config('AD_PURGE_AFTER_DAYS', default=30, cast=int),  # Days in the trash before deletion
+    'BATCH_SIZE': 500,
+}
+
+# =============================================================================
+# AD VIEWS COUNTER
+# =============================================================================
+AD_VIEWS = {
+    # DatabaseViewsBackend (flushed by the run_tasks worker, see TASKS['PERIODIC']) or MemoryViewsBackend
+    'BACKEND': config('AD_VIEWS_BACKEND', default='apps.annonces.counters.DatabaseViewsBackend'),
+    'WINDOW': config('AD_VIEWS_WINDOW', default=1800, cast=int),  # Seconds a viewer is counted once
+    'FLUSH_INTERVAL': config('AD_VIEWS_FLUSH_INTERVAL', default=60, cast=int),
+    'MAX_PENDING': config('AD_VIEWS_MAX_PENDING', default=1000, cast=int),
+}
+
+# =============================================================================
+# MONITORING (per-view stats: /api/v1/monitoring/stats/ and /metrics/)
+# =============================================================================
+MONITORING = {
+    'ENABLED': config('MONITORING_ENABLED', default=True, cast=bool),
+    'NPLUSONE_THRESHOLD': config('MONITORING_NPLUSONE_THRESHOLD', default=5, cast=int),
+    'PROFILE_SAMPLE_RATE': config('MONITORING_PROFILE_SAMPLE_RATE', default=0.0, cast=float),  # e.g. 0.001
+    'FLUSH_INTERVAL': 10,  # Seconds between publications of a worker's stats to the cache
+    'METRICS_TOKEN': config('METRICS_TOKEN', default=''),  # Bearer token for the Prometheus scraper
+}
+
+# =============================================================================
+# THROTTLING (sliding-window limits per view scope, see apps/throttling)
+# =============================================================================
+THROTTLING = {
+    'ENABLED': config('THROTTLING_ENABLED', default=True, cast=bool),
+    # CacheStore (shared through CACHES), DatabaseStore or MemoryStore (per process)
+    'STORE': config('THROTTLING_STORE', default='apps.throttling.stores.CacheStore'),
+    # Used when the store raises (cache server down...)
+    'FALLBACK_STORE': 'apps.throttling.stores.MemoryStore',
+    # scope -> {'user' | 'ip' | 'key': rate or [rates]}; rates are 'N/period' (s, min, hour, day, e.g. '5/10min')
+    # Mobile operators put many subscribers behind one public IP (carrier-grade
+    # NAT): per-IP limits only stop floods from one address, guessing is limited
+    # per account ('key') instead
+    'RATES': {
+        # key: IP + email, 10 wrong passwords a minute is already more than a user
+        # mistyping; ip: a whole NAT pool logging in, far above one script's needs
+        'login': {'key': ['10/min', '50/day'], 'ip': ['120/min', '5000/day']},
+        # Each registration sends an email; email addresses are unique, so only
+        # the address matters
+        'register': {'ip': ['30/10min', '500/day']},
+        'verification': {'ip': ['60/hour']},
+        'verification_email': {'key': ['1/min', '10/day']},
+        'verify_email': {'ip': ['120/hour']},
+        'verify_email_account': {'key': ['10/hour']},
+        'contact': {'user': ['10/hour', '50/day'], 'ip': ['30/hour']},
+        'conversation_start': {'user': ['20/hour', '100/day']},
+        'message_send': {'user': ['30/min', '1000/day']},
+        'favorite_toggle': {'user': ['60/min']},
+    },
+}
@@ -7,17 +7,42 @@ while ! nc -z db 5432; do
 done
 echo "✅ Base de données prête!"
 
+# Commande personnalisée (ex. service `events` en ASGI) : pas de migrations ici
+if [ "$#" -gt 0 ]; then
+  exec "$@"
+fi
+
 echo "🔄 Exécution des migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "📁 Collecte des fichiers statiques..."
 python manage.py collectstatic --noinput
 
+WORKERS=${GUNICORN_WORKERS:-3}
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  # Une connexion par requête en cours : DB_POOL=psycopg les plafonne à DB_POOL_MAX_SIZE par worker
+  echo "🔌 Connexions PostgreSQL de l'API : $WORKERS workers × DB_POOL_MAX_SIZE (${DB_POOL_MAX_SIZE:-${GUNICORN_THREADS:-2}}) par base avec DB_POOL=psycopg"
+  echo "🚀 Démarrage de Gunicorn (workers Uvicorn, ASGI)..."
+  exec gunicorn config.asgi:application \
+      --worker-class uvicorn.workers.UvicornWorker \
+      --bind 0.0.0.0:8000 \
+      --workers "$WORKERS" \
+      --timeout 120 \
+      --access-logfile - \
+      --error-logfile -
+fi
+
+# GUNICORN_THREADS est aussi lu par les réglages : une connexion à la base par thread
+THREADS=${GUNICORN_THREADS:-2}
+echo "🔌 Connexions PostgreSQL de l'API : jusqu'à $((WORKERS * THREADS)) par base ($WORKERS workers × $THREADS threads)"
+
 echo "🚀 Démarrage de Gunicorn..."
 exec gunicorn config.wsgi:application \
     --bind 0.0.0.0:8000 \
-    --workers 3 \
-    --threads 2 \
+    --workers "$WORKERS" \
+    --threads "$THREADS" \
     --timeout 120 \
     --access-logfile - \
     --error-logfile -
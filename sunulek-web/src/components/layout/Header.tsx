@@ -7,7 +7,7 @@ import {
 } from 'lucide-react'
 import { useAuthStore } from '@/stores/authStore'
 import { useLogout } from '@/hooks/useAuth'
-import { useUnreadMessagesCount } from '@/hooks/useMessages'
+import { useMessageEvents, useUnreadMessagesCount } from '@/hooks/useMessages'
 import Button from '@/components/ui/Button'
 import { cn } from '@/lib/utils'
 import { getMediaUrl } from '@/lib/constants'
@@ -19,6 +19,7 @@ export default function Header() {
   const logout = useLogout()
   const navigate = useNavigate()
   const { data: unreadCount } = useUnreadMessagesCount()
+  useMessageEvents()
 
   const handleLogout = () => {
     logout.mutate()
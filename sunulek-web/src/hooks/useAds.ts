@@ -1,6 +1,7 @@
 import { useQuery, useMutation, useQueryClient, useInfiniteQuery } from '@tanstack/react-query'
+import axios from 'axios'
 import api from '@/lib/api'
-import type { Ad, PaginatedResponse } from '@/types'
+import type { Ad, AdFacets, MyAdsResponse, PaginatedResponse } from '@/types'
 import { useToastStore } from '@/stores/toastStore'
 
 interface AdsFilters {
@@ -9,6 +10,7 @@ interface AdsFilters {
   region?: string
   min_price?: string
   max_price?: string
+  price_range?: string
   ordering?: string
   user?: string | number
   status?: string
@@ -38,6 +40,20 @@ export function useAds(filters: AdsFilters = {}) {
   })
 }
 
+export function useAdFacets(filters: AdsFilters = {}) {
+  return useQuery({
+    queryKey: ['annonces', 'facets', filters],
+    queryFn: async () => {
+      const params = new URLSearchParams()
+      Object.entries(filters).forEach(([key, value]) => {
+        if (value && key !== 'ordering') params.set(key, String(value))
+      })
+      const { data } = await api.get<AdFacets>(`/annonces/facets/?${params.toString()}`)
+      return data
+    },
+  })
+}
+
 export function useFeaturedAds() {
   return useQuery({
     queryKey: ['annonces', 'featured'],
@@ -81,13 +97,24 @@ export function useAd(slug: string) {
 }
 
 export function useMyAds(status?: 'active' | 'pending' | 'deleted') {
-  return useQuery({
+  return useInfiniteQuery<MyAdsResponse, Error>({
     queryKey: ['annonces', 'mine', status],
-    queryFn: async () => {
-      const params = status ? `?status=${status}` : ''
-      const { data } = await api.get<Ad[]>(`/annonces/my_ads/${params}`)
+    queryFn: async ({ pageParam }) => {
+      const params = new URLSearchParams()
+      params.set('page', String(pageParam))
+      if (status) params.set('status', status)
+      const { data } = await api.get<MyAdsResponse>(`/annonces/my_ads/?${params.toString()}`)
       return data
     },
+    getNextPageParam: (lastPage) => {
+      if (lastPage.next) {
+        const url = new URL(lastPage.next)
+        const page = url.searchParams.get('page')
+        return page ? parseInt(page) : undefined
+      }
+      return undefined
+    },
+    initialPageParam: 1,
   })
 }
 
@@ -134,6 +161,47 @@ export function useUpdateAd() {
   })
 }
 
+interface DirectUpload {
+  key: string
+  url: string
+  fields: Record<string, string>
+  expires_in: number
+}
+
+// Envoie les photos directement au stockage (S3 ou substitut local), puis les associe à l'annonce
+export function useUploadAdImages() {
+  const queryClient = useQueryClient()
+  const { addToast } = useToastStore()
+
+  return useMutation({
+    mutationFn: async ({ slug, files }: { slug: string; files: File[] }) => {
+      const { data } = await api.post<{ uploads: DirectUpload[] }>('/annonces/upload_urls/', {
+        content_types: files.map((file) => file.type),
+      })
+      await Promise.all(
+        data.uploads.map((upload, i) => {
+          const form = new FormData()
+          Object.entries(upload.fields).forEach(([key, value]) => form.append(key, value))
+          form.append('file', files[i])
+          // Sans l'en-tête Authorization de l'API
+          return axios.post(upload.url, form)
+        })
+      )
+      await api.post(`/annonces/${slug}/register_images/`, {
+        keys: data.uploads.map((upload) => upload.key),
+      })
+      return slug
+    },
+    onSuccess: (slug) => {
+      queryClient.invalidateQueries({ queryKey: ['annonces'] })
+      queryClient.invalidateQueries({ queryKey: ['annonces', slug] })
+    },
+    onError: () => {
+      addToast({ type: 'error', message: 'Erreur lors de l\'envoi des photos' })
+    },
+  })
+}
+
 export function useDeleteAd() {
   const queryClient = useQueryClient()
   const { addToast } = useToastStore()
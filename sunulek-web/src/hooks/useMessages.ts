@@ -1,7 +1,10 @@
+import { useEffect } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import api from '@/lib/api'
+import { API_URL } from '@/lib/constants'
 import type { Conversation, Message } from '@/types'
 import { useToastStore } from '@/stores/toastStore'
+import { useAuthStore } from '@/stores/authStore'
 
 // Get all conversations
 export function useConversations() {
@@ -35,10 +38,40 @@ export function useUnreadMessagesCount() {
       return data.count
     },
     staleTime: 30 * 1000,
-    refetchInterval: 60 * 1000, // Refresh every minute
+    refetchInterval: 5 * 60 * 1000, // Fallback only, updates are pushed by useMessageEvents
   })
 }
 
+// Listen to pushed message events (Server-Sent Events) instead of polling
+export function useMessageEvents() {
+  const queryClient = useQueryClient()
+  const accessToken = useAuthStore((state) => state.tokens?.access)
+
+  useEffect(() => {
+    if (!accessToken || typeof EventSource === 'undefined') return
+
+    const source = new EventSource(
+      `${API_URL}/conversations/events/?token=${encodeURIComponent(accessToken)}`
+    )
+    const refresh = (event: MessageEvent) => {
+      const { conversation_id } = JSON.parse(event.data)
+      queryClient.invalidateQueries({ queryKey: ['conversations', 'unread-count'] })
+      queryClient.invalidateQueries({ queryKey: ['conversations', conversation_id] })
+      queryClient.invalidateQueries({ queryKey: ['conversations'], exact: true })
+    }
+    source.addEventListener('message', refresh)
+    source.addEventListener('read', refresh)
+    // The server ends the stream when events may have been lost: refetch on reconnection
+    let connected = false
+    source.addEventListener('open', () => {
+      if (connected) queryClient.invalidateQueries({ queryKey: ['conversations'] })
+      connected = true
+    })
+
+    return () => source.close()
+  }, [accessToken, queryClient])
+}
+
 // Start a new conversation (or get existing one)
 export function useStartConversation() {
   const queryClient = useQueryClient()
@@ -181,20 +181,21 @@ function AdCard({
 export default function MyAnnonces() {
   const [activeTab, setActiveTab] = useState<TabType>('active')
   
-  // Fetch all ads for counts
-  const { data: allAds } = useMyAds()
-  const { data: ads, isLoading } = useMyAds(activeTab)
+  const {
+    data,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+    isLoading,
+  } = useMyAds(activeTab)
+  const ads = data?.pages.flatMap(page => page.results)
   
   const deleteAd = useDeleteAd()
   const restoreAd = useRestoreAd()
   const permanentDeleteAd = usePermanentDeleteAd()
 
-  // Calculate counts
-  const counts = {
-    active: allAds?.filter(ad => ad.status === 'active' && !ad.deleted_at).length || 0,
-    pending: allAds?.filter(ad => ad.status === 'pending' && !ad.deleted_at).length || 0,
-    deleted: allAds?.filter(ad => ad.deleted_at).length || 0,
-  }
+  // Tab counts, computed by the API
+  const counts = data?.pages[0]?.counts || { active: 0, pending: 0, deleted: 0 }
 
   const currentTab = TABS.find(t => t.key === activeTab)!
 
@@ -294,6 +295,19 @@ export default function MyAnnonces() {
                   />
                 </motion.div>
               ))}
+
+              {/* Load More */}
+              {hasNextPage && (
+                <div className="text-center pt-4">
+                  <Button
+                    variant="outline"
+                    onClick={() => fetchNextPage()}
+                    isLoading={isFetchingNextPage}
+                  >
+                    Voir plus d'annonces
+                  </Button>
+                </div>
+              )}
             </motion.div>
           </AnimatePresence>
         )}
@@ -52,6 +52,9 @@ export interface Ad {
   region: string
   department?: string
   neighborhood?: string
+  latitude?: number | null
+  longitude?: number | null
+  distance_km?: number | null
   address?: string
   category?: Category
   category_name?: string
@@ -84,6 +87,33 @@ export interface PaginatedResponse<T> {
   results: T[]
 }
 
+export interface MyAdsResponse extends PaginatedResponse<Ad> {
+  counts: {
+    total: number
+    active: number
+    pending: number
+    deleted: number
+  }
+}
+
+export interface FacetValue {
+  value: string
+  id?: number
+  label?: string
+  region?: string
+  min?: number | null
+  max?: number | null
+  count: number
+}
+
+export interface AdFacets {
+  total: number
+  category: FacetValue[]
+  region: FacetValue[]
+  department: FacetValue[]
+  price: FacetValue[]
+}
+
 // Messaging types
 export interface MessageUser {
   id: number